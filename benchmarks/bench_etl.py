@@ -0,0 +1,227 @@
+# Benchmark: vazão do ETL e tempo das consultas do dashboard em várias escalas de dados (padrão 1x/10x/100x)
+# Para cada escala, com logs sintéticos (benchmarks/gerar_logs.py) em uma pasta de trabalho temporária:
+#   - process_file: um log com 'escala' vezes a duração base (melhor de N repetições)
+#   - pipeline: 'escala' logs da duração base em data/raw (uma execução, pois os arquivos são movidos)
+#   - carga: load_data_to_db no PostgreSQL (--postgres) ou, sem ele, to_sql em um SQLite local como substituto
+#   - consultas: cada consulta de queries.py (PostgreSQL) ou de queries_parquet.py (sem PostgreSQL), sem o cache
+# O resultado é gravado em JSON; com --comparar, etapas mais lentas que a referência além da tolerância
+# são listadas e o processo termina com código 1 (útil para detectar regressões).
+#
+# Uso:
+#   python benchmarks/bench_etl.py [--escalas 1 10 100] [--horas 1] [--nucleos 4] [--saida bench_etl.json]
+#                                  [--comparar referencia.json --tolerancia 0.25] [--postgres]
+# ATENÇÃO: com --postgres o esquema coretemp do banco configurado (ver scripts/db.py) é APAGADO a cada escala.
+# Use um banco exclusivo para o benchmark (ex.: CORETEMP_DB_BANCO=coretemp_bench).
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+# Permite importar os módulos de scripts/ e do dashboard (mesmo esquema de bench_parser.py)
+raiz_projeto = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(raiz_projeto, "scripts"))
+sys.path.append(os.path.join(raiz_projeto, "dashboard"))
+import gerar_logs  # noqa: E402
+
+# Consultas medidas (mesmos nomes em queries.py e queries_parquet.py)
+consultas = ["resumo_temp", "temp_vs_speed", "time_vs_temp", "time_vs_power", "temp_vs_power",
+             "faixas_temp", "distribuicao_temp"]
+
+# Pastas de trabalho do ETL (relativas à pasta de cada escala, como em main.py)
+pastas_trabalho = ["data/raw", "data/loaded_raw", "data/processed", "data/loaded_processed"]
+
+
+def cronometrar(funcao, repeticoes=1):
+    # Melhor tempo (s) entre as repetições e o resultado da última; as mensagens da função são descartadas
+    melhor = float("inf")
+    resultado = None
+    for _ in range(repeticoes):
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            resultado = funcao()
+            melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def medida(segundos, linhas, **extras):
+    # Registro de uma etapa no JSON
+    vazao = round(linhas / segundos, 1) if segundos > 0 else None
+    return {"segundos": round(segundos, 6), "linhas": int(linhas), "linhas_por_segundo": vazao, **extras}
+
+
+def carregar_sqlite(arquivos, caminho_db, batch_size):
+    # Substituto da carga sem PostgreSQL: lê cada processado e insere com to_sql em uma única transação
+    engine = create_engine(f"sqlite:///{caminho_db}")
+    linhas = 0
+    with engine.begin() as conn:
+        for arquivo in arquivos:
+            dados = pd.read_csv(arquivo, parse_dates=["time"])
+            dados.to_sql("raw_data", conn, if_exists="append", index=False, chunksize=batch_size)
+            linhas += len(dados)
+    engine.dispose()
+    return linhas
+
+
+def limpar_postgres(load):
+    # Recomeça cada escala com o esquema vazio (tabela, partições, rollups e tabela por núcleo)
+    with load.Session() as session:
+        session.execute(text(f"DROP SCHEMA IF EXISTS {load.schema} CASCADE"))
+        session.commit()
+
+
+def executar_escala(escala, args, pipeline, load):
+    # Mede todas as etapas para uma escala; deve ser chamada com a pasta da escala como diretório atual
+    for pasta in pastas_trabalho:
+        os.makedirs(pasta, exist_ok=True)
+    etapas = {}
+
+    # process_file: um único log 'escala' vezes maior
+    caminhos, linhas = gerar_logs.gerar_logs("entrada", 1, args.nucleos, args.horas * escala, args.intervalo)
+    tamanho_mb = os.path.getsize(caminhos[0]) / 1024 ** 2
+    segundos, _ = cronometrar(lambda: pipeline.process_file(caminhos[0], "saida_process_file.csv"), args.repeticoes)
+    etapas["process_file"] = medida(segundos, linhas, mb=round(tamanho_mb, 3))
+    print(f"  process_file   {segundos:8.3f}s  {linhas / segundos:>12,.0f} linhas/s")
+
+    # pipeline(): 'escala' logs da duração base
+    _, linhas = gerar_logs.gerar_logs(pipeline.raw_data_path, escala, args.nucleos, args.horas, args.intervalo)
+    segundos, _ = cronometrar(lambda: pipeline.pipeline(workers=args.workers))
+    etapas["pipeline"] = medida(segundos, linhas, workers=args.workers)
+    print(f"  pipeline       {segundos:8.3f}s  {linhas / segundos:>12,.0f} linhas/s")
+
+    # Carga: PostgreSQL (load_data_to_db) ou SQLite (to_sql) como substituto
+    processados = sorted(glob.glob(os.path.join(load.data_processed_path, "*.csv")))
+    if args.postgres:
+        limpar_postgres(load)
+        segundos, _ = cronometrar(lambda: load.load_data_to_db(modo=args.modo_carga, batch_size=args.batch_size))
+        etapas["carga"] = medida(segundos, linhas, destino="postgres", modo=args.modo_carga)
+    else:
+        segundos, linhas = cronometrar(lambda: carregar_sqlite(processados, "bench.sqlite", args.batch_size))
+        etapas["carga"] = medida(segundos, linhas, destino="sqlite", modo="to_sql")
+    print(f"  carga ({etapas['carga']['destino']:<8}) {segundos:6.3f}s  {linhas / segundos:>12,.0f} linhas/s")
+
+    # Consultas: sem PostgreSQL, sobre o dataset Parquet gerado a partir dos mesmos logs
+    if args.postgres:
+        from src.queries import queries as backend
+    else:
+        from src.queries import queries_parquet as backend
+        with contextlib.redirect_stdout(io.StringIO()):
+            for caminho in sorted(glob.glob(os.path.join(pipeline.loaded_data_path, "*.csv"))):
+                pipeline.process_file(caminho, os.path.basename(caminho), formato="parquet")
+        backend.raiz_parquet = os.path.abspath(pipeline.parquet_data_path)
+
+    etapas["consultas"] = {}
+    for nome in consultas:
+        # __wrapped__: a função original, sem o cache em memória do dashboard
+        funcao = getattr(backend, nome).__wrapped__
+        segundos, resultado = cronometrar(funcao, args.repeticoes)
+        if resultado is None:
+            print(f"  {nome:<18} falhou")
+            continue
+        etapas["consultas"][nome] = {"segundos": round(segundos, 6), "linhas_resultado": len(resultado)}
+        print(f"  {nome:<18} {segundos * 1000:10.1f} ms")
+    return etapas
+
+
+def comparar(atual, referencia, tolerancia):
+    # Lista as etapas/consultas mais lentas que a referência (mesma escala) além da tolerância relativa
+    regressoes = []
+    anteriores = {item["escala"]: item["etapas"] for item in referencia.get("escalas", [])}
+    for item in atual["escalas"]:
+        base = anteriores.get(item["escala"])
+        if base is None:
+            continue
+        pares = [(nome, item["etapas"][nome], base.get(nome)) for nome in item["etapas"] if nome != "consultas"]
+        pares += [(f"consulta {nome}", valor, base.get("consultas", {}).get(nome))
+                  for nome, valor in item["etapas"]["consultas"].items()]
+        for nome, valor, anterior in pares:
+            if anterior and valor["segundos"] > anterior["segundos"] * (1 + tolerancia):
+                regressoes.append(
+                    f"{item['escala']}x {nome}: {anterior['segundos']:.4f}s -> {valor['segundos']:.4f}s "
+                    f"({valor['segundos'] / anterior['segundos']:.2f}x)"
+                )
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do ETL e das consultas com logs sintéticos.")
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1, 10, 100], help="Multiplicadores da base.")
+    parser.add_argument("--horas", type=float, default=1, help="Duração (h) da base: um log na escala 1x.")
+    parser.add_argument("--nucleos", type=int, default=4, help="Núcleos dos logs sintéticos.")
+    parser.add_argument("--intervalo", type=int, default=1, help="Segundos entre as linhas dos logs.")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Repetições de process_file e das consultas.")
+    parser.add_argument("--workers", type=int, default=1, help="Processos do pipeline().")
+    parser.add_argument("--batch-size", type=int, default=50000, help="Linhas por lote na carga.")
+    parser.add_argument("--modo-carga", choices=["copy", "to_sql"], default="copy", help="Modo do load_data_to_db.")
+    parser.add_argument("--postgres", action="store_true",
+                        help="Carga e consultas no PostgreSQL configurado (APAGA o esquema coretemp).")
+    parser.add_argument("--saida", default="bench_etl.json", help="Arquivo JSON com os resultados.")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior, usado como referência.")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Piora relativa aceita na comparação.")
+    parser.add_argument("--manter", action="store_true", help="Não apaga a pasta de trabalho ao final.")
+    args = parser.parse_args()
+
+    saida = os.path.abspath(args.saida)
+    referencia = None
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as arquivo:
+            referencia = json.load(arquivo)
+
+    # Os módulos do ETL usam caminhos relativos (data/raw, ...) e load.py cria sua pasta de destino ao ser
+    # importado; por isso são importados já dentro da pasta de trabalho
+    diretorio_original = os.getcwd()
+    trabalho = tempfile.mkdtemp(prefix="coretemp_bench_")
+    os.chdir(trabalho)
+    import pipeline
+    import load
+
+    resultado = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "plataforma": platform.platform(),
+        "parametros": {
+            "horas": args.horas, "nucleos": args.nucleos, "intervalo": args.intervalo,
+            "repeticoes": args.repeticoes, "workers": args.workers, "batch_size": args.batch_size,
+            "postgres": args.postgres,
+        },
+        "escalas": [],
+    }
+    try:
+        for escala in args.escalas:
+            print(f"\n--- Escala {escala}x ---")
+            pasta = os.path.join(trabalho, f"escala_{escala}")
+            os.makedirs(pasta)
+            os.chdir(pasta)
+            resultado["escalas"].append({"escala": escala, "etapas": executar_escala(escala, args, pipeline, load)})
+    finally:
+        os.chdir(diretorio_original)
+        if not args.manter:
+            shutil.rmtree(trabalho, ignore_errors=True)
+
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados gravados em {saida}")
+
+    if referencia is not None:
+        regressoes = comparar(resultado, referencia, args.tolerancia)
+        if regressoes:
+            print(f"\nRegressões (acima de {args.tolerancia:.0%} em relação a {args.comparar}):")
+            for linha in regressoes:
+                print(f"  {linha}")
+            sys.exit(1)
+        print("\nNenhuma regressão em relação à referência.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# Conferência e benchmark do armazenamento em memória (dashboard/src/queries/queries_memoria.py)
+# Com logs sintéticos (benchmarks/gerar_logs.py) processados em uma pasta de trabalho temporária:
+#   - Referência: todos os processados em um único DataFrame, filtrado por máscaras (.dt.year == ano, ...),
+#     com os mesmos cálculos de queries_parquet.py. Os resultados de queries_memoria precisam ser idênticos
+#     (mesmas linhas, mesmos valores) para cada consulta, filtro de data e núcleo. Como os cálculos são os
+#     mesmos dos dois lados, isso confere a leitura (fatias por dia, atualização incremental), não os cálculos:
+#     a exatidão em relação ao SQL é conferida em tests/test_queries_memoria.py.
+#   - Atualização incremental: metade dos arquivos é carregada, a outra metade chega depois, e a conferência
+#     é repetida após cada etapa.
+#   - Tempo de cada consulta: memória x dataset Parquet (queries_parquet), sem o cache do dashboard.
+# Termina com código 1 se algum resultado divergir.
+#
+# Uso:
+#   python benchmarks/bench_memoria.py [--arquivos 6] [--horas 24] [--nucleos 4] [--intervalo 10] [--repeticoes 3]
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+import pandas as pd
+
+raiz_projeto = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(raiz_projeto, "scripts"))
+sys.path.append(os.path.join(raiz_projeto, "dashboard"))
+import gerar_logs  # noqa: E402
+
+# Consultas conferidas (mesmos nomes em queries.py, queries_parquet.py e queries_memoria.py)
+consultas = {
+    "resumo_temp": (["time", "core_temp_0"], "calcular_resumo_temp"),
+    "temp_vs_speed": (["core_temp_0", "core_speed_0"], "calcular_temp_vs_speed"),
+    "time_vs_temp": (["time", "core_temp_0"], "calcular_time_vs_temp"),
+    "time_vs_power": (["time", "cpu_power"], "calcular_time_vs_power"),
+    "temp_vs_power": (["core_temp_0", "cpu_power"], "calcular_temp_vs_power"),
+    "faixas_temp": (["time", "core_temp_0"], "calcular_faixas_temp"),
+    "distribuicao_temp": (["core_temp_0"], "calcular_distribuicao_temp"),
+}
+
+
+def filtros_teste(inicio, arquivos):
+    # Combinações de ano/mês/dia: período todo, ano, mês, dia, e filtros sem ano (caminho da máscara)
+    ultimo = pd.Timestamp(inicio) + pd.Timedelta(days=arquivos - 1)
+    primeiro = pd.Timestamp(inicio)
+    return [
+        (None, None, None),
+        (primeiro.year, None, None),
+        (primeiro.year, primeiro.month, None),
+        (ultimo.year, ultimo.month, None),
+        (ultimo.year, ultimo.month, ultimo.day),
+        (primeiro.year, None, primeiro.day),
+        (None, ultimo.month, None),
+        (None, None, ultimo.day),
+        (primeiro.year + 1, None, None),
+    ]
+
+
+def referencia(queries_parquet, dados, nome, year, month, day, core, nucleos):
+    # Resultado esperado: varredura completa com máscaras de data sobre o DataFrame de todos os processados
+    def ler_varredura(colunas, y=None, m=None, d=None):
+        mascara = pd.Series(True, index=dados.index)
+        for parte, valor in (("year", y), ("month", m), ("day", d)):
+            if valor is not None:
+                mascara &= getattr(dados["time"].dt, parte) == int(valor)
+        return dados.loc[mascara, colunas].reset_index(drop=True)
+
+    colunas, calculo = consultas[nome]
+    if nome == "faixas_temp" and core == "todos":
+        # Núcleo de cada amostra: cada dia é dividido pelos núcleos que registrou
+        colunas = colunas + ["core"]
+    calcular = getattr(queries_parquet, calculo)
+    if nome == "time_vs_power":
+        df = ler_varredura(colunas, year, month, day)
+    else:
+        df = queries_parquet.ler_nucleo(colunas, year, month, day, core, ler=ler_varredura, disponiveis=lambda: nucleos)
+    return calcular(df)
+
+
+def iguais(esperado, obtido):
+    # Mesmo conteúdo, independentemente da ordem das linhas e dos tipos inteiros (int16 x int64)
+    if esperado is None or obtido is None:
+        return False
+    if list(esperado.columns) != list(obtido.columns) or len(esperado) != len(obtido):
+        return False
+    ordenar = list(esperado.columns)
+    a = esperado.sort_values(ordenar).reset_index(drop=True)
+    b = obtido.sort_values(ordenar).reset_index(drop=True)
+    return all((a[c].astype("float64").to_numpy() == b[c].astype("float64").to_numpy()).all()
+               if pd.api.types.is_numeric_dtype(a[c]) else (a[c] == b[c]).all() for c in ordenar)
+
+
+def conferir(queries_memoria, queries_parquet, processados, filtros, nucleos):
+    # Compara todas as consultas em todos os filtros/núcleos; devolve a lista de divergências
+    dados = pd.concat([pd.read_csv(c, parse_dates=["time"]) for c in processados], ignore_index=True)
+    divergencias = []
+    for year, month, day in filtros:
+        for core in (None, "1", "todos", "mais_quente"):
+            for nome in consultas:
+                esperado = referencia(queries_parquet, dados, nome, year, month, day, core, nucleos)
+                obtido = getattr(queries_memoria, nome).__wrapped__(year, month, day, core)
+                if not iguais(esperado, obtido):
+                    divergencias.append(f"{nome} year={year} month={month} day={day} core={core}")
+    return divergencias
+
+
+def cronometrar(funcao, repeticoes):
+    # Melhor tempo (s) entre as repetições
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Confere e mede as consultas do armazenamento em memória.")
+    parser.add_argument("--arquivos", type=int, default=6, help="Logs sintéticos (um por dia).")
+    parser.add_argument("--horas", type=float, default=24, help="Duração de cada log, em horas.")
+    parser.add_argument("--nucleos", type=int, default=4, help="Núcleos dos logs sintéticos.")
+    parser.add_argument("--intervalo", type=int, default=10, help="Segundos entre as linhas dos logs.")
+    parser.add_argument("--inicio", default="2023-12-29 00:00:00", help="Primeiro dia (padrão: atravessa um ano).")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Repetições na medição de tempo.")
+    args = parser.parse_args()
+
+    diretorio_original = os.getcwd()
+    trabalho = tempfile.mkdtemp(prefix="coretemp_memoria_")
+    os.chdir(trabalho)
+    # As pastas lidas pelo armazenamento são definidas antes de importar o módulo
+    os.environ["CORETEMP_MEMORIA_PASTAS"] = os.path.abspath("data/processed")
+    import pipeline
+    from src.queries import queries_memoria, queries_parquet
+
+    try:
+        for pasta in ("data/raw", "data/loaded_raw", "data/processed", "data/loaded_processed"):
+            os.makedirs(pasta, exist_ok=True)
+        caminhos, linhas = gerar_logs.gerar_logs("entrada", args.arquivos, args.nucleos, args.horas, args.intervalo,
+                                                 args.inicio)
+        print(f"{len(caminhos)} log(s), {linhas:,} linhas")
+        nucleos = list(range(args.nucleos))
+        filtros = filtros_teste(args.inicio, args.arquivos)
+
+        # Atualização incremental: primeira metade, depois o restante (chegando como arquivos novos)
+        metade = max(1, len(caminhos) // 2)
+        divergencias = []
+        for etapa, lote in (("primeira metade", caminhos[:metade]), ("restante", caminhos[metade:])):
+            with contextlib.redirect_stdout(io.StringIO()):
+                for caminho in lote:
+                    pipeline.process_file(caminho, os.path.join("data/processed", os.path.basename(caminho)))
+            inicio = time.perf_counter()
+            queries_memoria.sincronizar(forcar=True)
+            print(f"Sincronização ({etapa}): {time.perf_counter() - inicio:.3f}s")
+            processados = sorted(glob.glob("data/processed/*.csv"))
+            encontradas = conferir(queries_memoria, queries_parquet, processados, filtros, nucleos)
+            print(f"  {len(filtros) * 4 * len(consultas)} resultados conferidos, {len(encontradas)} divergência(s)")
+            divergencias += encontradas
+
+        # Tempo das consultas: memória x Parquet (o dataset é gerado a partir dos mesmos logs)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for caminho in caminhos:
+                pipeline.process_file(caminho, os.path.basename(caminho), formato="parquet")
+        queries_parquet.raiz_parquet = os.path.abspath(pipeline.parquet_data_path)
+        ano = pd.Timestamp(args.inicio).year
+        print(f"\n{'consulta':<20}{'filtro':<12}{'memória (ms)':>14}{'parquet (ms)':>14}")
+        for rotulo, filtro in (("tudo", (None, None, None)), ("ano", (ano, None, None))):
+            for nome in consultas:
+                tempos = [cronometrar(lambda: getattr(modulo, nome).__wrapped__(*filtro), args.repeticoes)
+                          for modulo in (queries_memoria, queries_parquet)]
+                print(f"{nome:<20}{rotulo:<12}{tempos[0] * 1000:>14.1f}{tempos[1] * 1000:>14.1f}")
+    finally:
+        os.chdir(diretorio_original)
+        shutil.rmtree(trabalho, ignore_errors=True)
+
+    if divergencias:
+        print("\nResultados divergentes da referência:")
+        for linha in divergencias:
+            print(f"  {linha}")
+        sys.exit(1)
+    print("\nTodos os resultados conferem com a referência.")
+
+
+if __name__ == "__main__":
+    main()
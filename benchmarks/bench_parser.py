@@ -0,0 +1,88 @@
+# Benchmark: leitura dos logs brutos do Core Temp
+# Compara a vazão (linhas/s) do parser dedicado (scripts/parser_coretemp.py) com o tratamento anterior
+# (read_csv com skiprows=7, seleção, to_datetime com errors="coerce", dropna e rename), reproduzido abaixo.
+#
+# Uso:
+#   python benchmarks/bench_parser.py [arquivos...] [--repeticoes N]
+# Sem arquivos, usa os logs de data/raw.
+
+import argparse
+import glob
+import os
+import sys
+import time
+import pandas as pd
+
+# Permite importar os módulos de scripts/ (mesmo esquema de imports usado por main.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+import parser_coretemp  # noqa: E402
+
+
+def ler_log_anterior(file_path):
+    # Tratamento anterior do process_file, mantido aqui apenas como referência de desempenho
+    dados = pd.read_csv(file_path, encoding="latin1", skiprows=7)
+    linhas_iniciais = len(dados)
+    mapa = parser_coretemp.mapear_colunas(tuple(dados.columns))
+    dados = dados[list(mapa)]
+    dados = dados.dropna(axis=1, how='all')
+    dados["Time"] = pd.to_datetime(dados["Time"], format="%H:%M:%S %m/%d/%y", errors="coerce")
+    dados = dados.dropna(axis=0, how='all')
+    dados = dados.dropna(axis=0, how='any')
+    return dados.rename(columns=mapa), linhas_iniciais
+
+
+def medir(funcao, arquivos, repeticoes):
+    # Melhor tempo (s) entre as repetições para ler todos os arquivos e o total de linhas resultantes
+    melhor = float("inf")
+    linhas = 0
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        linhas = sum(len(funcao(arquivo)[0]) for arquivo in arquivos)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, linhas
+
+
+def conferir(arquivos):
+    # Os dois caminhos devem produzir os mesmos dados (valores numéricos comparados como float)
+    for arquivo in arquivos:
+        novo, _ = parser_coretemp.ler_log(arquivo)
+        anterior, _ = ler_log_anterior(arquivo)
+        anterior = anterior.reset_index(drop=True)
+        iguais = (
+            list(novo.columns) == list(anterior.columns)
+            and novo["time"].equals(anterior["time"])
+            and novo.drop(columns="time").astype("float64").equals(
+                anterior.drop(columns="time").apply(pd.to_numeric, errors="coerce").astype("float64")
+            )
+        )
+        if not iguais:
+            print(f"  AVISO: resultados diferentes em {os.path.basename(arquivo)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara o parser dedicado com a leitura anterior via pandas.")
+    parser.add_argument("arquivos", nargs="*", help="Logs brutos do Core Temp (padrão: data/raw/*.csv).")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Repetições; vale o melhor tempo.")
+    args = parser.parse_args()
+
+    arquivos = args.arquivos or sorted(glob.glob(os.path.join("data", "raw", "*.csv")))
+    if not arquivos:
+        print("Nenhum log encontrado. Informe os arquivos ou coloque-os em data/raw.")
+        return
+
+    tamanho = sum(os.path.getsize(arquivo) for arquivo in arquivos) / 1024 ** 2
+    print(f"{len(arquivos)} arquivo(s), {tamanho:,.1f} MB, melhor de {args.repeticoes} repetição(ões)")
+    conferir(arquivos)
+
+    resultados = {}
+    for nome, funcao in (("anterior (pandas)", ler_log_anterior), ("parser_coretemp", parser_coretemp.ler_log)):
+        duracao, linhas = medir(funcao, arquivos, args.repeticoes)
+        resultados[nome] = duracao
+        print(f"  {nome:<18} {duracao:8.3f}s  {linhas / duracao:>14,.0f} linhas/s")
+
+    ganho = resultados["anterior (pandas)"] / resultados["parser_coretemp"]
+    print(f"  Ganho: {ganho:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# Gerador de logs sintéticos do Core Temp, no mesmo layout lido por pipeline.process_file:
+#   - 7 linhas de preâmbulo (modelo e velocidade da CPU, Tj. Max, início da sessão, linhas em branco) antes do cabeçalho
+#   - Cabeçalho em latin1 com "(°)", grupos repetidos por núcleo (Low/High temp., Core load, Core speed),
+#     colunas "Core N" vazias e vírgula final (que o pandas lê como "Unnamed: N")
+#   - Uma linha por 'intervalo' segundos, com horário "HH:MM:SS mm/dd/yy"
+#
+# Uso:
+#   python benchmarks/gerar_logs.py [--destino data/raw] [--arquivos 1] [--nucleos 4] [--horas 24] [--intervalo 1]
+# Cada arquivo cobre 'horas' horas e começa um dia depois do anterior (um log por dia, como o Core Temp).
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+# Início padrão do primeiro log
+inicio_padrao = "2024-01-01 00:00:00"
+
+
+def preambulo(inicio):
+    # 7 linhas antes do cabeçalho (a posição que a leitura anterior, com skiprows=7, esperava)
+    return [
+        "CPU Model:,Intel Core i7",
+        "CPU Speed:,3600",
+        "",
+        "Tj. Max:,100",
+        f"Session start:,{pd.Timestamp(inicio):%H:%M:%S %m/%d/%y}",
+        "",
+        "",
+    ]
+
+
+def cabecalho(nucleos):
+    # Colunas na ordem do Core Temp: temperaturas, um grupo por núcleo, "Core N" vazias, energia e vírgula final
+    colunas = ["Time"] + [f"Core {n} Temp. (°)" for n in range(nucleos)]
+    colunas += ["Low temp. (°)", "High temp. (°)", "Core load (%)", "Core speed (MHz)"] * nucleos
+    colunas += [f"Core {n}" for n in range(nucleos)] + ["CPU 0 Power", ""]
+    return ",".join(colunas)
+
+
+def gerar_linhas(inicio, linhas, nucleos, intervalo=1, semente=0):
+    # DataFrame com as linhas de dados, nas posições das colunas do cabeçalho, gerado de forma vetorizada
+    aleatorio = np.random.default_rng(semente)
+    tempos = pd.date_range(inicio, periods=linhas, freq=f"{intervalo}s")
+    # Carga oscilando ao longo do dia; a temperatura acompanha a carga
+    base = 50 + 20 * np.sin(np.arange(linhas) * 2 * np.pi / (86400 / intervalo))
+
+    dados = {"Time": tempos.strftime("%H:%M:%S %m/%d/%y")}
+    temperaturas = []
+    for n in range(nucleos):
+        temp = np.clip(base + aleatorio.normal(0, 6, linhas), 30, 100).astype(np.int64)
+        temperaturas.append(temp)
+        dados[f"temp_{n}"] = temp
+    for n, temp in enumerate(temperaturas):
+        dados[f"low_{n}"] = np.maximum(temp - aleatorio.integers(0, 15, linhas), 25)
+        dados[f"high_{n}"] = np.minimum(temp + aleatorio.integers(0, 15, linhas), 105)
+        dados[f"load_{n}"] = aleatorio.integers(0, 101, linhas)
+        dados[f"speed_{n}"] = np.round(aleatorio.uniform(800, 4500, linhas), 1)
+    for n in range(nucleos):
+        dados[f"core_{n}"] = ""
+    dados["power"] = np.round(aleatorio.uniform(5, 65, linhas), 2)
+    dados["fim"] = ""
+    return pd.DataFrame(dados)
+
+
+def gerar_log(caminho, nucleos=4, horas=24, intervalo=1, inicio=inicio_padrao, semente=0):
+    # Grava um log sintético em 'caminho' (latin1, como o Core Temp); retorna o número de linhas de dados
+    linhas = int(horas * 3600 / intervalo)
+    dados = gerar_linhas(inicio, linhas, nucleos, intervalo, semente)
+    with open(caminho, "w", encoding="latin1", newline="") as arquivo:
+        arquivo.write("\n".join(preambulo(inicio) + [cabecalho(nucleos)]) + "\n")
+        dados.to_csv(arquivo, header=False, index=False, lineterminator="\n")
+    return linhas
+
+
+def gerar_logs(destino, arquivos=1, nucleos=4, horas=24, intervalo=1, inicio=inicio_padrao, prefixo="CT-Log"):
+    # Gera 'arquivos' logs em 'destino', um por dia a partir de 'inicio'; retorna (caminhos, total de linhas)
+    os.makedirs(destino, exist_ok=True)
+    caminhos = []
+    total = 0
+    for i in range(arquivos):
+        dia = pd.Timestamp(inicio) + pd.Timedelta(days=i)
+        caminho = os.path.join(destino, f"{prefixo} {dia:%Y-%m-%d %H-%M-%S}.csv")
+        total += gerar_log(caminho, nucleos, horas, intervalo, dia, semente=i)
+        caminhos.append(caminho)
+    return caminhos, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera logs sintéticos do Core Temp.")
+    parser.add_argument("--destino", default=os.path.join("data", "raw"), help="Pasta de saída (padrão: data/raw).")
+    parser.add_argument("--arquivos", type=int, default=1, help="Quantidade de logs (um por dia).")
+    parser.add_argument("--nucleos", type=int, default=4, help="Número de núcleos.")
+    parser.add_argument("--horas", type=float, default=24, help="Duração de cada log, em horas.")
+    parser.add_argument("--intervalo", type=int, default=1, help="Segundos entre as linhas.")
+    parser.add_argument("--inicio", default=inicio_padrao, help="Data/hora do primeiro log.")
+    args = parser.parse_args()
+
+    caminhos, total = gerar_logs(args.destino, args.arquivos, args.nucleos, args.horas, args.intervalo, args.inicio)
+    print(f"{len(caminhos)} log(s) gerado(s) em {args.destino} ({total:,} linhas).")
+
+
+if __name__ == "__main__":
+    main()
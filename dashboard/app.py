@@ -1,13 +1,38 @@
 # App Streamlit: Monitoramento do Processador
 # Construção do Dashboard com filtros (ano/mês/dia), séries temporais e relações
 
+import os
+import time
+import pandas as pd
 import streamlit as st
 from src.charts.charts import grafico_linhas, grafico_colunas
-from src.queries.queries import time_vs_temp, temp_vs_speed, time_vs_power, temp_vs_power, faixas_temp, anos_disponiveis, meses_disponiveis, dias_disponiveis, resumo_temp
+
+# Fonte dos dados: PostgreSQL (padrão), dataset Parquet local (CORETEMP_FONTE=parquet)
+# ou processados em memória (CORETEMP_FONTE=memoria)
+fonte_dados = os.environ.get("CORETEMP_FONTE", "postgres")
+if fonte_dados == "memoria":
+    from src.queries.queries_memoria import carregar_painel, anos_disponiveis, meses_disponiveis, dias_disponiveis, nucleos_disponiveis, estatisticas_temp
+elif fonte_dados == "parquet":
+    from src.queries.queries_parquet import carregar_painel, anos_disponiveis, meses_disponiveis, dias_disponiveis, nucleos_disponiveis, estatisticas_temp
+else:
+    from src.queries.queries import carregar_painel, anos_disponiveis, meses_disponiveis, dias_disponiveis, nucleos_disponiveis, estatisticas_temp
+from src.queries.painel import NUCLEO_TODOS, NUCLEO_MAIS_QUENTE
+from src.queries import diagnostico
+from src.queries.cache import invalidar
 
 # Configuração da página (título e layout)
 st.set_page_config(page_title="Meu Processador", layout="wide")
 
+# Diagnóstico (CORETEMP_DIAGNOSTICO=1): registra as consultas desta renderização no estado da sessão;
+# o EXPLAIN é ligado no painel
+if "diagnostico" not in st.session_state:
+    st.session_state["diagnostico"] = diagnostico.novo_estado()
+estado_diagnostico = diagnostico.nova_renderizacao(
+    st.session_state["diagnostico"],
+    explain=st.session_state.get("diagnostico_explain", diagnostico.EXPLAIN_PADRAO),
+)
+inicio_renderizacao = time.perf_counter()
+
 # Título da aplicação (HTML simples)
 st.markdown("<h1 style='text-align: center; color: black;'>Meu Processador</h1>", unsafe_allow_html=True)
 
@@ -53,14 +78,47 @@ with st.sidebar:
     # Normaliza dia selecionado
     day_val = None if sel_day == "Todos" else int(sel_day)
 
+    st.header("Núcleo")
+
+    # Núcleos disponíveis (além do 0, exigem a tabela por núcleo ou o dataset Parquet)
+    nucleos = nucleos_disponiveis()
+    # Com mais de um núcleo: também todos juntos e o mais quente a cada instante
+    opcoes_nucleo = nucleos + ([NUCLEO_TODOS, NUCLEO_MAIS_QUENTE] if len(nucleos) > 1 else [])
+    rotulos_nucleo = {NUCLEO_TODOS: "Todos", NUCLEO_MAIS_QUENTE: "Mais quente"}
+    # Seletor de núcleo usado nas temperaturas e velocidades
+    core_val = st.selectbox(
+        "Núcleo",
+        options=opcoes_nucleo,
+        index=0,
+        format_func=lambda opcao: rotulos_nucleo.get(opcao, f"Núcleo {opcao}"),
+        help="Núcleo usado nos gráficos de temperatura e velocidade (a energia é do processador inteiro)."
+    )
+
+
+# Período selecionado [início, fim) para o nível de detalhe dos gráficos de datas; sem ano => todo o histórico
+if year_val is None:
+    periodo = None
+else:
+    inicio_periodo = pd.Timestamp(year_val, month_val or 1, day_val or 1)
+    if day_val is not None:
+        periodo = (inicio_periodo, inicio_periodo + pd.DateOffset(days=1))
+    elif month_val is not None:
+        periodo = (inicio_periodo, inicio_periodo + pd.DateOffset(months=1))
+    else:
+        periodo = (inicio_periodo, inicio_periodo + pd.DateOffset(years=1))
 
-# Carregando dataframes
-df_faixas_temp = faixas_temp(year=year_val, month=month_val, day=day_val)
-df_temp_vs_speed = temp_vs_speed(year=year_val, month=month_val, day=day_val)
-df_time_vs_temp = time_vs_temp(year=year_val, month=month_val, day=day_val)
-df_time_vs_power = time_vs_power(year=year_val, month=month_val, day=day_val)
-df_temp_vs_power = temp_vs_power(year=year_val, month=month_val, day=day_val)
-df_resumo_temp = resumo_temp(year=year_val, month=month_val, day=day_val)
+# Carregando dataframes (consultas independentes executadas em paralelo)
+inicio_painel = time.perf_counter()
+paineis = carregar_painel(year=year_val, month=month_val, day=day_val, core=core_val)
+tempo_painel = time.perf_counter() - inicio_painel
+df_faixas_temp = paineis["faixas_temp"]
+df_temp_vs_speed = paineis["temp_vs_speed"]
+df_time_vs_temp = paineis["time_vs_temp"]
+df_time_vs_power = paineis["time_vs_power"]
+df_temp_vs_power = paineis["temp_vs_power"]
+df_resumo_temp = paineis["resumo_temp"]
+# Estatísticas das amostras (percentis exatos), a partir da distribuição consultada junto com o painel
+stats = estatisticas_temp(year=year_val, month=month_val, day=day_val, core=core_val)
 
 # Layout principal: abas (Resumo, Séries por Hora, Relações)
 aba_resumo, aba_series, aba_relacoes = st.tabs(["Resumo", "Séries por Hora", "Relações"])
@@ -74,16 +132,20 @@ with aba_resumo:
     # Coluna 1: cartões de métricas
     with col1: 
         st.subheader("Visão geral de temperaturas")
-        # Estatísticas básicas de temperatura
-        max_val = df_resumo_temp["core temp"].max()
-        min_val = df_resumo_temp["core temp"].min()
-        media_val = df_resumo_temp["core temp"].mean()
-        mediana_val = df_resumo_temp["core temp"].median()
+        # Estatísticas sobre todas as amostras do período (não sobre os MIN/AVG/MAX diários)
+        # None => a consulta da distribuição falhou (o erro já foi registrado por ela)
+        if stats is None:
+            st.warning("Não foi possível calcular as estatísticas de temperatura do período.")
+        else:
+            c1, c2 = st.columns(2)
 
-        st.metric(label="🌡️ Máxima", value=f"{max_val:.2f} ºC") # Aqui descobri que dava pra usar emoticon dentro de código, LOL
-        st.metric(label="❄️ Mínima", value=f"{min_val:.2f} ºC")
-        st.metric(label="📊 Média", value=f"{media_val:.2f} ºC")
-        st.metric(label="⚖️ Mediana", value=f"{mediana_val:.2f} ºC")
+            c1.metric(label="🌡️ Máxima", value=f"{stats['maxima']:.2f} ºC") # Aqui descobri que dava pra usar emoticon dentro de código, LOL
+            c2.metric(label="❄️ Mínima", value=f"{stats['minima']:.2f} ºC")
+            c1.metric(label="📊 Média", value=f"{stats['media']:.2f} ºC")
+            c2.metric(label="⚖️ Mediana", value=f"{stats['p50']:.2f} ºC")
+            c1.metric(label="🔥 P95", value=f"{stats['p95']:.2f} ºC")
+            c2.metric(label="🚨 P99", value=f"{stats['p99']:.2f} ºC")
+            st.caption(f"{stats['amostras']:,} amostras no período.")
 
     # Coluna 2: gráfico de linhas com nível de detalhe (Dia/Mês/Ano)
     with col2:
@@ -93,10 +155,11 @@ with aba_resumo:
         # Controle de granularidade do gráfico
         nivel = st.selectbox("Nível de detalhe", ["Dia", "Mês", "Ano"])
 
-        # Agrega máximo por dia e tipo
+        # Uma linha por dia e tipo, no eixo de datas (série longa => nível de detalhe pelo período selecionado)
         if nivel == "Dia":
-            df_plot = df_resumo_temp.groupby(["dia", "type"], as_index=False)["core temp"].max()
-            x_col = "dia"
+            datas = pd.to_datetime(df_resumo_temp[["ano", "mes", "dia"]].set_axis(["year", "month", "day"], axis=1))
+            df_plot = df_resumo_temp.assign(data=datas)[["data", "type", "core temp"]]
+            x_col = "data"
         # Agrega máximo por mês e tipo
         elif nivel == "Mês":
             df_plot = df_resumo_temp.groupby(["mes", "type"], as_index=False)["core temp"].max()
@@ -112,7 +175,8 @@ with aba_resumo:
             coluna_x=x_col,
             coluna_y="core temp",
             coluna_categoria="type",
-            titulo="Temperatura do Núcleo(ºC) ao Longo do Tempo"
+            titulo="Temperatura do Núcleo(ºC) ao Longo do Tempo",
+            periodo=periodo
         )
         st.altair_chart(grafico, use_container_width=True)
 
@@ -132,6 +196,27 @@ with aba_resumo:
 
     st.caption("Quanto tempo, em média por dia, o processador ficou em cada faixa de temperatura.")
 
+    st.markdown("---")
+    # Histograma: largura das faixas escolhida pelo usuário (calculado sobre a distribuição já consultada)
+    largura_faixa = st.slider("Largura da faixa (ºC)", min_value=1, max_value=20, value=5)
+    stats_hist = estatisticas_temp(year=year_val, month=month_val, day=day_val, core=core_val, largura=largura_faixa)
+    if stats_hist is None:
+        st.warning("Não foi possível montar a distribuição das temperaturas do período.")
+    else:
+        grafico_hist = grafico_colunas(
+            stats_hist["histograma"],
+            coluna_x="faixa",
+            coluna_y="percentual",
+            titulo="Distribuição das Temperaturas(ºC)",
+            formato_rotulo=".1f",
+            mostrar_rotulos=True,
+            posicao_rotulo="fora",
+            cor_rotulo="black"
+        )
+        st.altair_chart(grafico_hist, use_container_width=True)
+
+        st.caption("Percentual das amostras do período em cada faixa de temperatura.")
+
 # Aba "Séries por Hora": padrões ao longo do dia
 with aba_series:
     st.subheader("Padrões ao longo do dia")
@@ -196,4 +281,52 @@ with aba_relacoes:
         )
         st.altair_chart(grafico, use_container_width=True)
 
-    st.caption("Variações da velocidade e energia do CPU em relação à temperatura.")
\ No newline at end of file
+    st.caption("Variações da velocidade e energia do CPU em relação à temperatura.")
+
+# Painel de diagnóstico na barra lateral (apenas com CORETEMP_DIAGNOSTICO=1)
+if diagnostico.ATIVO:
+    with st.sidebar:
+        with st.expander("Diagnóstico das consultas", expanded=False):
+            st.checkbox(
+                "Capturar EXPLAIN (ANALYZE, BUFFERS)",
+                key="diagnostico_explain",
+                value=diagnostico.EXPLAIN_PADRAO,
+                help="Executa cada consulta uma segunda vez para obter o plano. Vale a partir da próxima consulta ao banco."
+            )
+            # Resultados em cache não chegam ao banco: limpar o cache força todas as consultas a rodarem de novo
+            if st.button("Limpar cache e consultar de novo"):
+                invalidar()
+                st.rerun()
+
+            totais = diagnostico.totais(estado_diagnostico)
+            st.caption(
+                f"Renderização: {(time.perf_counter() - inicio_renderizacao) * 1000:,.0f} ms "
+                f"(painel em paralelo: {tempo_painel * 1000:,.0f} ms)"
+            )
+            c1, c2 = st.columns(2)
+            c1.metric("Consultas ao banco", totais["consultas"], help="As demais vieram do cache.")
+            c2.metric("Linhas", f"{totais['linhas']:,}")
+            c1.metric("Execução (soma)", f"{totais['execucao_ms']:,.0f} ms")
+            c2.metric("Transferência (soma)", f"{totais['transferencia_ms']:,.0f} ms")
+            if totais["falhas"]:
+                st.error(f"{totais['falhas']} consulta(s) falharam.")
+
+            registros = diagnostico.registros(estado_diagnostico)
+            if not registros:
+                st.caption("Nenhuma consulta ao banco nesta renderização (resultados do cache ou fonte Parquet).")
+            else:
+                st.dataframe(
+                    pd.DataFrame(registros)[["consulta", "linhas", "execucao_ms", "transferencia_ms", "total_ms"]],
+                    hide_index=True,
+                    use_container_width=True,
+                )
+                # Detalhes de cada consulta: SQL, parâmetros, erro e plano
+                for registro in registros:
+                    st.markdown(f"**{registro['consulta']}** ({registro['total_ms']:,.1f} ms)")
+                    st.code(registro["sql"], language="sql")
+                    if registro["params"]:
+                        st.json(registro["params"], expanded=False)
+                    if registro["erro"]:
+                        st.error(registro["erro"])
+                    if registro["plano"]:
+                        st.code(registro["plano"], language="text")
@@ -2,15 +2,31 @@
 # Descrição: funções utilitárias para gráficos de linhas e colunas.
 
 import altair as alt
+import pandas as pd
+from src.charts import lod
+
+# Acima deste número de pontos, as linhas são desenhadas sem o marcador de cada ponto
+MAX_MARCADORES = 500
 
 # Gráfico de linhas: séries com ponto e tooltip
-def grafico_linhas(df, coluna_x, coluna_y, coluna_categoria, titulo=None):
+# max_pontos: orçamento de pontos enviados ao navegador (ver lod.reduzir); None => sem redução
+# periodo: (início, fim) selecionado nos filtros, para o tamanho dos baldes de um eixo de datas
+def grafico_linhas(df, coluna_x, coluna_y, coluna_categoria, titulo=None, max_pontos=lod.MAX_PONTOS, periodo=None):
+
+    # Nível de detalhe: reduz a série antes de embuti-la na especificação do gráfico
+    razao = 1.0
+    if max_pontos is not None:
+        df, razao = lod.reduzir(df, coluna_x, coluna_y, coluna_categoria, max_pontos=max_pontos, periodo=periodo)
+    # Com redução, o subtítulo informa quantos pontos foram enviados
+    subtitulo = f"{len(df):,} pontos exibidos (redução de {razao:.1f}x)" if razao > 1 else ""
+    # Datas como eixo temporal; demais valores como categorias ordenadas
+    tipo_x = "T" if pd.api.types.is_datetime64_any_dtype(df[coluna_x]) else "O"
 
     # Constrói o gráfico com Altair
-    chart = (alt.Chart(df).mark_line(point=True).encode(
-            # Eixo X: categórico/ordinal (O) e rótulo
+    chart = (alt.Chart(df).mark_line(point=len(df) <= MAX_MARCADORES).encode(
+            # Eixo X: categórico/ordinal (O) ou temporal (T) e rótulo
             # X ordinal (categorias)
-            x=alt.X(f'{coluna_x}:O', title=coluna_x),
+            x=alt.X(f'{coluna_x}:{tipo_x}', title=coluna_x),
             # Eixo Y: quantitativo (Q) e rótulo
             # Y quantitativo com título
             y=alt.Y(f'{coluna_y}:Q', title=coluna_y),
@@ -20,7 +36,7 @@ def grafico_linhas(df, coluna_x, coluna_y, coluna_categoria, titulo=None):
             # Tooltip: título customizado e formatação numérica
             tooltip=[coluna_x, coluna_y])
             # Título e dimensões padrão do gráfico
-            .properties(title=titulo, width=700, height=400)
+            .properties(title=alt.TitleParams(text=titulo or "", subtitle=subtitulo), width=700, height=400)
             # Estilo do título (tamanho, alinhamento, cor)
             .configure_title(fontSize=20, anchor='start', color='gray')
             # Estilo dos eixos (tamanhos das fontes)
@@ -0,0 +1,105 @@
+# Nível de detalhe (LOD) das séries enviadas aos gráficos
+# Descrição: reduz um DataFrame a um orçamento de pontos antes de ele ser embutido na especificação do Vega-Lite.
+# Eixo X de datas: agrega em baldes de tempo, com o tamanho do balde escolhido pelo período selecionado nos filtros
+# (ou, sem ele, pelo período dos dados); cada série é agregada pela sua estatística (MIN => min, MAX => max).
+# Demais eixos: LTTB (Largest-Triangle-Three-Buckets), que mantém picos e vales da série.
+
+import numpy as np
+import pandas as pd
+
+# Orçamento padrão de pontos por gráfico
+MAX_PONTOS = 2000
+
+# Baldes de tempo candidatos, do mais fino ao mais grosso
+baldes_tempo = ["10s", "30s", "1min", "5min", "15min", "30min", "1h", "3h", "6h", "12h", "1D", "7D", "30D"]
+
+# Agregação de cada série no balde de tempo pela categoria (coluna "type" das consultas): o MIN do balde é o menor
+# MIN e o MAX o maior MAX, para não achatar os extremos; as demais séries usam a média
+agregacoes_tipo = {"MIN": "min", "AVG": "mean", "MAX": "max"}
+
+
+# Menor balde de tempo que mantém o período [inicio, fim] dentro de 'max_pontos' pontos
+def escolher_balde(inicio, fim, max_pontos=MAX_PONTOS):
+    duracao = pd.Timestamp(fim) - pd.Timestamp(inicio)
+    for balde in baldes_tempo:
+        if duracao / pd.Timedelta(balde) < max_pontos:
+            return balde
+    return baldes_tempo[-1]
+
+
+# Índices dos pontos escolhidos pelo LTTB (sempre inclui o primeiro e o último)
+def lttb(x, y, limite):
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    n = len(x)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+
+    # limite - 2 baldes entre o primeiro e o último ponto
+    bordas = np.linspace(1, n - 1, limite - 1).astype(np.int64)
+    indices = np.empty(limite, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    anterior = 0
+    for i in range(limite - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        # Média do balde seguinte (no último balde, o próprio último ponto)
+        proximo_fim = bordas[i + 2] if i + 2 < len(bordas) else n
+        media_x = x[fim:proximo_fim].mean()
+        media_y = y[fim:proximo_fim].mean()
+        # Ponto do balde atual que forma o maior triângulo com o escolhido anterior e a média seguinte
+        area = np.abs(
+            (x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior])
+        )
+        anterior = inicio + int(area.argmax())
+        indices[i + 1] = anterior
+    return indices
+
+
+# Reduz uma série (ou várias, uma por categoria) ao orçamento de pontos.
+# Retorna (DataFrame reduzido, razão de redução = linhas originais / linhas enviadas).
+# metodo: "auto" (datas => baldes de tempo; demais => LTTB), "balde" ou "lttb"
+# periodo: (início, fim) selecionado nos filtros; define o tamanho do balde de tempo (None => período dos dados)
+# agregacao: agregação no balde de tempo; None => pela categoria de cada série (agregacoes_tipo)
+def reduzir(df, coluna_x, coluna_y, coluna_categoria=None, max_pontos=MAX_PONTOS, metodo="auto", agregacao=None,
+            periodo=None):
+    total = len(df)
+    if total <= max_pontos:
+        return df, 1.0
+
+    grupos = [df] if coluna_categoria is None else [g for _, g in df.groupby(coluna_categoria, sort=False)]
+    # O orçamento é dividido entre as séries
+    por_serie = max(max_pontos // len(grupos), 3)
+    eixo_tempo = pd.api.types.is_datetime64_any_dtype(df[coluna_x])
+    if metodo == "auto":
+        metodo = "balde" if eixo_tempo else "lttb"
+
+    partes = []
+    for grupo in grupos:
+        grupo = grupo.sort_values(coluna_x)
+        if len(grupo) <= por_serie:
+            partes.append(grupo)
+        elif metodo == "balde" and eixo_tempo:
+            # Agregação por balde de tempo (as demais colunas da série, como a categoria, são mantidas)
+            inicio, fim = periodo if periodo is not None else (grupo[coluna_x].iloc[0], grupo[coluna_x].iloc[-1])
+            balde = escolher_balde(inicio, fim, por_serie)
+            funcao = agregacao
+            if funcao is None:
+                categoria = grupo[coluna_categoria].iloc[0] if coluna_categoria is not None else None
+                funcao = agregacoes_tipo.get(categoria, "mean")
+            agregado = grupo.groupby(pd.Grouper(key=coluna_x, freq=balde))[coluna_y].agg(funcao).dropna().reset_index()
+            if coluna_categoria is not None:
+                agregado[coluna_categoria] = grupo[coluna_categoria].iloc[0]
+            partes.append(agregado)
+        else:
+            # Eixo não numérico (ex.: texto): usa a posição do ponto como X
+            x = grupo[coluna_x]
+            if eixo_tempo:
+                x = x.astype("int64")
+            elif not pd.api.types.is_numeric_dtype(x):
+                x = np.arange(len(grupo))
+            partes.append(grupo.iloc[lttb(x, grupo[coluna_y], por_serie)])
+
+    reduzido = pd.concat(partes, ignore_index=True)
+    return reduzido, total / max(len(reduzido), 1)
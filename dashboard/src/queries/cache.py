@@ -0,0 +1,98 @@
+# Cache de resultados das consultas do dashboard
+# Descrição: cache em memória (por processo) com validade (TTL) e limite de itens (remove o menos usado).
+# É invalidado quando a carga confirma novos dados (o loader atualiza o arquivo data/ultima_carga.txt).
+
+import os
+import time
+import inspect
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+# Validade de cada resultado (segundos) e quantidade máxima de resultados guardados
+TTL_PADRAO = float(os.environ.get("CORETEMP_CACHE_TTL", 600))
+MAX_ITENS = int(os.environ.get("CORETEMP_CACHE_ITENS", 256))
+
+# Arquivo atualizado pelo loader a cada commit (padrão: <projeto>/data/ultima_carga.txt)
+marcador_carga = os.environ.get(
+    "CORETEMP_MARCADOR_CARGA",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "data", "ultima_carga.txt"),
+)
+
+# Estado do cache: chave -> (instante de gravação, resultado), em ordem de uso
+_itens = OrderedDict()
+_lock = threading.Lock()
+_versao_vista = None
+_geracao = 0  # incrementada a cada descarte do cache (nova carga ou invalidar())
+
+
+# Versão dos dados: instante da última modificação do marcador (None se ainda não houve carga)
+def versao_dados():
+    try:
+        return os.path.getmtime(marcador_carga)
+    except OSError:
+        return None
+
+
+# Descarta todos os resultados guardados
+def invalidar():
+    global _geracao
+    with _lock:
+        _itens.clear()
+        _geracao += 1
+
+
+# Cópia defensiva: quem chama pode alterar o DataFrame/lista sem afetar o cache
+def _copia(valor):
+    return valor.copy() if hasattr(valor, "copy") else valor
+
+
+# Decorador: guarda o resultado por (consulta, argumentos), ex.: ("resumo_temp", year, month, day)
+def em_cache(funcao=None, ttl=None):
+    def decorar(funcao):
+        assinatura = inspect.signature(funcao)
+        validade = TTL_PADRAO if ttl is None else ttl
+
+        @wraps(funcao)
+        def consultar(*args, **kwargs):
+            global _versao_vista, _geracao
+            # Chave normalizada (argumentos posicionais, nomeados e padrões resultam na mesma chave)
+            argumentos = assinatura.bind(*args, **kwargs)
+            argumentos.apply_defaults()
+            chave = (funcao.__name__,) + tuple(argumentos.arguments.items())
+
+            agora = time.monotonic()
+            with _lock:
+                # Nova carga confirmada desde a última verificação => tudo que está guardado ficou velho
+                versao = versao_dados()
+                if versao != _versao_vista:
+                    _itens.clear()
+                    _versao_vista = versao
+                    _geracao += 1
+                geracao = _geracao
+
+                item = _itens.get(chave)
+                if item is not None and agora - item[0] < validade:
+                    _itens.move_to_end(chave)
+                    return _copia(item[1])
+
+            # Fora do lock: a consulta pode demorar e outras threads podem usar o cache enquanto isso
+            resultado = funcao(*args, **kwargs)
+
+            # Falhas (None) não são guardadas, para que a próxima renderização tente de novo. Se o cache foi
+            # descartado durante a consulta (outra thread já viu o marcador de uma nova carga, ou invalidar()),
+            # o resultado pode ser dos dados antigos e também não é guardado.
+            if resultado is not None:
+                with _lock:
+                    if _versao_vista != versao or _geracao != geracao:
+                        return _copia(resultado)
+                    _itens[chave] = (agora, resultado)
+                    _itens.move_to_end(chave)
+                    while len(_itens) > MAX_ITENS:
+                        _itens.popitem(last=False)
+            return _copia(resultado)
+
+        return consultar
+
+    # Permite usar tanto @em_cache quanto @em_cache(ttl=...)
+    return decorar(funcao) if funcao is not None else decorar
@@ -0,0 +1,80 @@
+# Diagnóstico das consultas do dashboard (opcional: CORETEMP_DIAGNOSTICO=1)
+# Descrição: registra, para cada consulta executada no banco, o SQL, os parâmetros, as linhas devolvidas,
+# o tempo de execução no banco e o tempo de transferência/montagem do DataFrame. Com o EXPLAIN ligado
+# (CORETEMP_DIAGNOSTICO_EXPLAIN=1 ou pelo painel), guarda também o plano de EXPLAIN (ANALYZE, BUFFERS),
+# o que executa cada consulta uma segunda vez. Os registros ficam num estado por sessão do app (guardado
+# em st.session_state), ativado no início de cada renderização: cada sessão do Streamlit roda no seu próprio
+# thread e as consultas do painel herdam o contexto desse thread (painel.executar_em_paralelo), então uma
+# sessão não vê nem apaga os registros de outra.
+
+import contextvars
+import os
+import threading
+import time
+
+# Modo diagnóstico e captura do plano
+ATIVO = os.environ.get("CORETEMP_DIAGNOSTICO", "0") == "1"
+EXPLAIN_PADRAO = os.environ.get("CORETEMP_DIAGNOSTICO_EXPLAIN", "0") == "1"
+
+# Estado da renderização em curso no contexto atual (None fora do app: consultas não são registradas)
+_estado_atual = contextvars.ContextVar("diagnostico_estado", default=None)
+
+
+# Estado de diagnóstico de uma sessão: registros da renderização atual e opção de EXPLAIN
+def novo_estado():
+    return {"registros": [], "lock": threading.Lock(), "explain": EXPLAIN_PADRAO}
+
+
+# Início de uma renderização do app: descarta os registros anteriores da sessão, define se o plano será
+# capturado e torna o estado o atual para as consultas desta renderização
+def nova_renderizacao(estado, explain=EXPLAIN_PADRAO):
+    with estado["lock"]:
+        estado["registros"].clear()
+        estado["explain"] = explain
+    _estado_atual.set(estado)
+    return estado
+
+
+# Indica se o plano (EXPLAIN ANALYZE) deve ser capturado nas próximas consultas
+def capturar_explain():
+    estado = _estado_atual.get()
+    return ATIVO and estado is not None and estado["explain"]
+
+
+# Guarda o registro de uma consulta (erro: texto da exceção, se ela falhou)
+def registrar(nome, query, params, linhas, execucao, transferencia, plano=None, erro=None):
+    estado = _estado_atual.get()
+    if not ATIVO or estado is None:
+        return
+    with estado["lock"]:
+        estado["registros"].append({
+            "consulta": nome,
+            "instante": time.strftime("%H:%M:%S"),
+            "linhas": linhas,
+            "execucao_ms": round(execucao * 1000, 1),
+            "transferencia_ms": round(transferencia * 1000, 1),
+            "total_ms": round((execucao + transferencia) * 1000, 1),
+            "sql": " ".join(query.split()),
+            "params": dict(params or {}),
+            "plano": plano,
+            "erro": erro,
+        })
+
+
+# Cópia dos registros da renderização atual da sessão, na ordem de execução
+def registros(estado):
+    with estado["lock"]:
+        return list(estado["registros"])
+
+
+# Totais da renderização: consultas, falhas, linhas e tempos somados (as consultas do painel rodam em paralelo,
+# então a soma pode passar do tempo de parede da página)
+def totais(estado):
+    atuais = registros(estado)
+    return {
+        "consultas": len(atuais),
+        "falhas": sum(1 for r in atuais if r["erro"]),
+        "linhas": sum(r["linhas"] for r in atuais),
+        "execucao_ms": round(sum(r["execucao_ms"] for r in atuais), 1),
+        "transferencia_ms": round(sum(r["transferencia_ms"] for r in atuais), 1),
+    }
@@ -0,0 +1,57 @@
+# Estatísticas de temperatura a partir da distribuição (temperatura, quantidade de amostras)
+# Descrição: o banco (ou o Parquet) devolve apenas a contagem de amostras por valor de temperatura, em uma passada;
+# percentis exatos, média e histogramas de qualquer largura são calculados aqui sobre essa tabela pequena.
+
+import numpy as np
+import pandas as pd
+
+# Percentis exibidos no Resumo
+PERCENTIS = (50, 95, 99)
+
+# Largura padrão das faixas do histograma (ºC)
+LARGURA_FAIXA = 5
+
+
+# Percentil exato no sentido de percentile_disc do PostgreSQL: menor valor cuja frequência acumulada atinge p%
+# (sem amostras: NaN, como o NULL do banco)
+def percentil(valores, contagens, p):
+    acumulado = np.cumsum(contagens)
+    if len(acumulado) == 0 or acumulado[-1] == 0:
+        return np.nan
+    posicao = np.searchsorted(acumulado, p / 100.0 * acumulado[-1], side="left")
+    return valores[min(posicao, len(valores) - 1)]
+
+
+# Histograma com faixas de 'largura' graus: [inicio, inicio + largura)
+def histograma(valores, contagens, largura=LARGURA_FAIXA):
+    inicio = np.floor(valores / largura) * largura
+    hist = pd.DataFrame({"inicio": inicio, "amostras": contagens}).groupby("inicio", as_index=False)["amostras"].sum()
+    hist["faixa"] = [f"{a:g}-{a + largura:g}" for a in hist["inicio"]]
+    hist["percentual"] = 100.0 * hist["amostras"] / hist["amostras"].sum()
+    return hist[["faixa", "inicio", "amostras", "percentual"]]
+
+
+# Resumo da distribuição: amostras, mínima, máxima, média, percentis e histograma
+# distribuicao: DataFrame com as colunas "temp" e "n" (amostras por valor)
+def resumir(distribuicao, largura=LARGURA_FAIXA):
+    dados = distribuicao.dropna().sort_values("temp")
+    dados = dados[dados["n"] > 0]
+    valores = dados["temp"].to_numpy(dtype="float64")
+    contagens = dados["n"].to_numpy(dtype="float64")
+
+    # Sem amostras no período: valores ausentes e histograma vazio
+    if len(valores) == 0:
+        resumo = {"amostras": 0, "minima": np.nan, "maxima": np.nan, "media": np.nan}
+        resumo.update({f"p{p}": np.nan for p in PERCENTIS})
+        resumo["histograma"] = pd.DataFrame(columns=["faixa", "inicio", "amostras", "percentual"])
+        return resumo
+
+    resumo = {
+        "amostras": int(contagens.sum()),
+        "minima": valores[0],
+        "maxima": valores[-1],
+        "media": float(np.average(valores, weights=contagens)),
+    }
+    resumo.update({f"p{p}": percentil(valores, contagens, p) for p in PERCENTIS})
+    resumo["histograma"] = histograma(valores, contagens, largura)
+    return resumo
@@ -0,0 +1,28 @@
+# Execução concorrente das consultas do painel
+# Descrição: dispara consultas independentes em paralelo (threads) e devolve todos os resultados juntos,
+# de modo que o tempo de carregamento da página seja o da consulta mais lenta, e não a soma de todas.
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+# Seleção de núcleo aceita pelas consultas (parâmetro core): número do núcleo, todos os núcleos juntos
+# ou, a cada instante, o núcleo mais quente
+NUCLEO_TODOS = "todos"
+NUCLEO_MAIS_QUENTE = "mais_quente"
+
+
+# None ou 0 => núcleo 0, lido das colunas core_temp_0/core_speed_0 (e dos rollups)
+def nucleo_padrao(core):
+    return core is None or (core not in (NUCLEO_TODOS, NUCLEO_MAIS_QUENTE) and int(core) == 0)
+
+
+# consultas: dicionário nome -> função; filtros: argumentos repassados a todas (ex.: year, month, day, core).
+# Cada consulta roda numa cópia do contexto de quem chamou (ex.: o diagnóstico da sessão atual)
+def executar_em_paralelo(consultas, max_workers=None, **filtros):
+    with ThreadPoolExecutor(max_workers=max_workers or len(consultas)) as executor:
+        futuros = {
+            nome: executor.submit(contextvars.copy_context().run, funcao, **filtros)
+            for nome, funcao in consultas.items()
+        }
+        # Cada consulta já trata seus erros (retorna None); aqui apenas recolhe os resultados
+        return {nome: futuro.result() for nome, futuro in futuros.items()}
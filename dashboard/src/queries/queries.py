@@ -1,41 +1,137 @@
 # Consultas ao banco (PostgreSQL) para o app
 # Descrição: funções de conexão, montagem de filtros e consultas agregadas.
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 import pandas as pd
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from src.queries.cache import em_cache
+from src.queries import diagnostico, estatisticas
+from src.queries.painel import executar_em_paralelo, nucleo_padrao, NUCLEO_TODOS, NUCLEO_MAIS_QUENTE
 
-# Conexão: constrói SQLAlchemy Engine (PostgreSQL + psycopg)
-def get_engine():
-    # ATENÇÃO: substitua por credenciais/host/porta/banco reais conforme seu ambiente
-    user = "postgres"
-    password = "postgres"
-    host = "localhost"
-    port = 5432
-    db = "pessoal"
-    # Monta a URL de conexão no formato SQLAlchemy + driver (psycopg)
-    url = f"postgresql+psycopg://{user}:{password}@{host}:{port}/{db}"
-    # Retorna o Engine para reuso nas consultas
-    return create_engine(url)
+# Camada de acesso ao banco compartilhada com a carga (scripts/db.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "scripts"))
+import db  # noqa: E402
+
+# Consultas interativas: por padrão, nenhuma passa de 30s no servidor (CORETEMP_DB_STATEMENT_TIMEOUT ajusta)
+db.definir_padroes(statement_timeout_ms=30000)
+
+# Conexão: Engine compartilhado (pool de conexões), criado na primeira consulta
+get_engine = db.get_engine
+
+
+# Executa uma consulta no banco e devolve o DataFrame. Mede separadamente a execução (até o banco devolver o
+# resultado) e a transferência (leitura das linhas e montagem do DataFrame) e, com o diagnóstico ativo,
+# registra SQL, parâmetros, tempos, linhas e, se pedido, o plano de EXPLAIN (ANALYZE, BUFFERS).
+# Erros são registrados no diagnóstico e repassados a quem chamou.
+def executar_consulta(nome, engine, query, params=None):
+    params = params or {}
+    inicio = time.perf_counter()
+    execucao = 0.0
+    try:
+        with engine.connect() as conn:
+            resultado = conn.execute(text(query), params)
+            execucao = time.perf_counter() - inicio
+            # Mesma conversão do pd.read_sql_query (NUMERIC -> float)
+            df = pd.DataFrame.from_records(resultado.fetchall(), columns=list(resultado.keys()), coerce_float=True)
+            transferencia = time.perf_counter() - inicio - execucao
+            plano = None
+            if diagnostico.capturar_explain():
+                linhas_plano = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {query}"), params).scalars().all()
+                plano = "\n".join(linhas_plano)
+    except Exception as e:
+        diagnostico.registrar(nome, query, params, 0, execucao, time.perf_counter() - inicio - execucao, erro=str(e))
+        raise
+    diagnostico.registrar(nome, query, params, len(df), execucao, transferencia, plano)
+    return df
+
+
+# Uso dos rollups (tabelas agregadas mantidas pela carga); CORETEMP_ROLLUPS=0 força a leitura da tabela bruta
+USAR_ROLLUPS = os.environ.get("CORETEMP_ROLLUPS", "1") != "0"
+_rollups_existem = False
+_calendario_existe = False
+
+
+# Verifica (uma vez por processo, após a primeira confirmação) se as tabelas de rollup existem
+def usar_rollups(engine):
+    global _rollups_existem
+    if not USAR_ROLLUPS:
+        return False
+    if not _rollups_existem:
+        query = """
+            SELECT to_regclass('coretemp.rollup_hora') IS NOT NULL
+               AND to_regclass('coretemp.rollup_dia') IS NOT NULL
+               AND to_regclass('coretemp.rollup_temp_dia') IS NOT NULL
+        """
+        try:
+            with engine.connect() as conn:
+                _rollups_existem = bool(conn.execute(text(query)).scalar())
+        except Exception as e:
+            print(f"Erro ao verificar os rollups: {e}")
+    return _rollups_existem
+
+
+# Verifica (uma vez por processo, após a primeira confirmação) se a dimensão de calendário existe
+def usar_calendario(engine):
+    global _calendario_existe
+    if not _calendario_existe:
+        try:
+            with engine.connect() as conn:
+                _calendario_existe = bool(
+                    conn.execute(text("SELECT to_regclass('coretemp.calendario') IS NOT NULL")).scalar()
+                )
+        except Exception as e:
+            print(f"Erro ao verificar o calendário: {e}")
+    return _calendario_existe
+
+
+# Origem dos filtros de data: o calendário (um registro por dia, mantido pela carga) ou, sem ele, a tabela bruta
+def fonte_calendario(engine):
+    if usar_calendario(engine):
+        return "coretemp.calendario", "dia"
+    return "coretemp.raw_data", "time"
+
+
+# Intervalo semiaberto [inicio, fim) coberto por uma seleção de ano (e opcionalmente mês/dia)
+def intervalo_data(year, month=None, day=None):
+    year = int(year)
+    if month is None:
+        return datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    month = int(month)
+    if day is None:
+        fim = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+        return datetime(year, month, 1), fim
+    inicio = datetime(year, month, int(day))
+    return inicio, inicio + timedelta(days=1)
 
 
 # Montagem dinâmica de WHERE e parâmetros para ano/mês/dia
-def filtro_data(year=None, month=None, day=None):
+# coluna: coluna de tempo filtrada ("time" na tabela bruta; "hora"/"dia" nos rollups)
+# Com ano informado, o filtro vira um intervalo "coluna >= :inicio AND coluna < :fim", que usa o índice em time.
+# Na tabela particionada por mês, o mesmo intervalo limita a leitura às partições do período selecionado.
+def filtro_data(year=None, month=None, day=None, coluna="time"):
     # Lista de condições textuais (usada para juntar com AND)
     conds = []
     # Parâmetros para passar ao SQLAlchemy
     params = {}
-    # Se informado, filtra por ano (EXTRACT YEAR)
     if year is not None:
-        conds.append("EXTRACT(YEAR FROM time) = :year")
-        params["year"] = int(year)
-    # Se informado, filtra por mês (EXTRACT MONTH)
-    if month is not None:
-        conds.append("EXTRACT(MONTH FROM time) = :month")
-        params["month"] = int(month)
-    # Se informado, filtra por dia (EXTRACT DAY)
-    if day is not None:
-        conds.append("EXTRACT(DAY FROM time) = :day")
-        params["day"] = int(day)
+        # Ano (+ mês, + dia) => intervalo contínuo de tempo
+        params["inicio"], params["fim"] = intervalo_data(year, month, day)
+        conds.append(f"{coluna} >= :inicio AND {coluna} < :fim")
+        # Dia sem mês não forma intervalo contínuo: complementa com EXTRACT
+        if month is None and day is not None:
+            conds.append(f"EXTRACT(DAY FROM {coluna}) = :day")
+            params["day"] = int(day)
+    else:
+        # Sem ano, mês/dia se repetem ao longo dos anos: mantém EXTRACT
+        if month is not None:
+            conds.append(f"EXTRACT(MONTH FROM {coluna}) = :month")
+            params["month"] = int(month)
+        if day is not None:
+            conds.append(f"EXTRACT(DAY FROM {coluna}) = :day")
+            params["day"] = int(day)
 
     # Gera WHERE ... AND ... quando existirem condições; caso contrário vazio
     where_sql = f"WHERE {' AND '.join(conds)}" if conds else ""
@@ -43,109 +139,97 @@ def filtro_data(year=None, month=None, day=None):
 
 
 # Dimensão de tempo: anos disponíveis nos dados
+@em_cache
 def anos_disponiveis():
     # Obtém Engine compartilhado para executar a consulta
     engine = get_engine()
-    query = """
-        SELECT DISTINCT EXTRACT(YEAR FROM time)::INT AS year
-        FROM coretemp.raw_data
+    # Calendário: algumas centenas de linhas por ano, em vez de uma leitura completa da tabela bruta
+    tabela, coluna = fonte_calendario(engine)
+    query = f"""
+        SELECT DISTINCT EXTRACT(YEAR FROM {coluna})::INT AS year
+        FROM {tabela}
         ORDER BY year
     """
-        # Abre conexão temporária e traz resultado em DataFrame
-    with engine.connect() as conn:
-        df = pd.read_sql_query(text(query), conn)
+    # Executa a consulta e traz o resultado em DataFrame (com registro no diagnóstico, se ativo)
+    df = executar_consulta("anos_disponiveis", engine, query, None)
     # Retorna a lista simples (anos/meses/dias) para popular selects no app
     return df["year"].tolist()
 
 
 # Dimensão de tempo: meses disponíveis (opcionalmente filtrados por ano)
+@em_cache
 def meses_disponiveis(year=None):
     # Obtém Engine compartilhado para executar a consulta
     engine = get_engine()
+    tabela, coluna = fonte_calendario(engine)
     # Consulta base para DISTINCT; WHERE será anexado conforme filtros
-    base = "SELECT DISTINCT EXTRACT(MONTH FROM time)::INT AS month FROM coretemp.raw_data"
+    base = f"SELECT DISTINCT EXTRACT(MONTH FROM {coluna})::INT AS month FROM {tabela}"
     # Monta WHERE/params de acordo com os filtros (None => ignora)
-    where_sql, params = filtro_data(year=year)
+    where_sql, params = filtro_data(year=year, coluna=coluna)
     query = f"""
         {base}
         {where_sql}
         ORDER BY month
     """
-        # Abre conexão temporária e traz resultado em DataFrame
-    with engine.connect() as conn:
-        df = pd.read_sql_query(text(query), conn, params=params)
+    # Executa a consulta e traz o resultado em DataFrame (com registro no diagnóstico, se ativo)
+    df = executar_consulta("meses_disponiveis", engine, query, params)
     # Retorna a lista simples (anos/meses/dias) para popular selects no app
     return df["month"].tolist()
 
 
 # Dimensão de tempo: dias disponíveis (opcionalmente filtrados por ano/mês)
+@em_cache
 def dias_disponiveis(year=None, month=None):
     # Obtém Engine compartilhado para executar a consulta
     engine = get_engine()
+    tabela, coluna = fonte_calendario(engine)
     # Consulta base para DISTINCT; WHERE será anexado conforme filtros
-    base = "SELECT DISTINCT EXTRACT(DAY FROM time)::INT AS day FROM coretemp.raw_data"
+    base = f"SELECT DISTINCT EXTRACT(DAY FROM {coluna})::INT AS day FROM {tabela}"
     # Monta WHERE/params de acordo com os filtros (None => ignora)
-    where_sql, params = filtro_data(year=year, month=month)
+    where_sql, params = filtro_data(year=year, month=month, coluna=coluna)
     query = f"""
         {base}
         {where_sql}
         ORDER BY day
     """
-        # Abre conexão temporária e traz resultado em DataFrame
-    with engine.connect() as conn:
-        df = pd.read_sql_query(text(query), conn, params=params)
+    # Executa a consulta e traz o resultado em DataFrame (com registro no diagnóstico, se ativo)
+    df = executar_consulta("dias_disponiveis", engine, query, params)
     # Retorna a lista simples (anos/meses/dias) para popular selects no app
     return df["day"].tolist()
 
-# Resumo diário (MIN/AVG/MAX) da temperatura por dia
-def resumo_temp(year=None, month=None, day=None):
+
+# Núcleos disponíveis para as consultas: 0 sempre; os demais apenas quando coretemp.core_data existe
+@em_cache
+def nucleos_disponiveis():
     # Obtém Engine compartilhado para executar a consulta
     engine = get_engine()
-    # Monta WHERE/params de acordo com os filtros (None => ignora)
-    where_sql, params = filtro_data(year, month, day)
+    # Os núcleos vêm dos nomes das colunas core_temp_N da tabela bruta (sem ler os dados)
+    query = r"""
+        SELECT substring(column_name FROM '^core_temp_(\d+)$')::INT AS core
+        FROM information_schema.columns
+        WHERE table_schema = 'coretemp' AND table_name = 'raw_data'
+          AND column_name ~ '^core_temp_\d+$'
+          AND to_regclass('coretemp.core_data') IS NOT NULL
+        ORDER BY core
+    """
+    # Executa a consulta e traz o resultado em DataFrame (com registro no diagnóstico, se ativo)
+    df = executar_consulta("nucleos_disponiveis", engine, query, None)
+    return df["core"].tolist() or [0]
 
-    query = f"""
-    WITH filtrado AS(
-    SELECT DATE(time) AS time, core_temp_0
-    FROM coretemp.raw_data
-    {where_sql}
-    )
 
-    SELECT 
-        EXTRACT(YEAR FROM time)::INTEGER AS "ano",
-        EXTRACT(MONTH FROM time)::INTEGER AS "mes",
-        EXTRACT(DAY FROM time)::INTEGER AS "dia",
-        MIN(core_temp_0) AS "core temp",
-        'MIN' AS "type"
-    FROM filtrado
-    GROUP BY 1,2,3
-
-    UNION ALL
-
-    SELECT 
-        EXTRACT(YEAR FROM time)::INTEGER AS "ano",
-        EXTRACT(MONTH FROM time)::INTEGER AS "mes",
-        EXTRACT(DAY FROM time)::INTEGER AS "dia",
-        AVG(core_temp_0)::INTEGER AS "core temp",
-        'AVG' AS "type"
-    FROM filtrado
-    GROUP BY 1,2,3
-
-    UNION ALL
-
-    SELECT 
-        EXTRACT(YEAR FROM time)::INTEGER AS "ano",
-        EXTRACT(MONTH FROM time)::INTEGER AS "mes",
-        EXTRACT(DAY FROM time)::INTEGER AS "dia",
-        MAX(core_temp_0) AS "core temp",
-        'MAX' AS "type"
-    FROM filtrado
-    GROUP BY 1,2,3
-    """
+# Resumo diário (MIN/AVG/MAX) da temperatura por dia
+@em_cache
+def resumo_temp(year=None, month=None, day=None, core=None):
+    # Obtém Engine compartilhado para executar a consulta
+    engine = get_engine()
+    # Com rollups disponíveis, lê os agregados (custo independente do tamanho do histórico)
+    if nucleo_padrao(core) and usar_rollups(engine):
+        query, params = rollup_resumo_temp(year, month, day)
+    else:
+        query, params = bruto_resumo_temp(year, month, day, core)
     try:
-        # Abre conexão temporária e traz resultado em DataFrame
-        with engine.connect() as conn:
-            df = pd.read_sql_query(text(query), conn, params=params)
+        # Executa a consulta e traz o resultado em DataFrame (com registro no diagnóstico, se ativo)
+        df = executar_consulta("resumo_temp", engine, query, params)
         return df
     # Em caso de falha
     except Exception as e:
@@ -154,43 +238,18 @@ def resumo_temp(year=None, month=None, day=None):
 
 
 # Relaciona temperatura (X) vs velocidade do núcleo (Y) por faixa (MIN/AVG/MAX)
-def temp_vs_speed(year=None, month=None, day=None):
+@em_cache
+def temp_vs_speed(year=None, month=None, day=None, core=None):
     # Obtém Engine compartilhado para executar a consulta
     engine = get_engine()
-    # Monta WHERE/params de acordo com os filtros (None => ignora)
-    where_sql, params = filtro_data(year, month, day)
-    # SQL com CTE "filtrado" seguido de três agregações unidas por UNION ALL
-    query = f"""
-    WITH filtrado AS (
-        SELECT time, core_temp_0, core_speed_0
-        FROM coretemp.raw_data
-        {where_sql}
-    )
-    SELECT
-        core_temp_0 AS "core temp",
-        MIN(core_speed_0)::INTEGER AS "core speed",
-        'MIN' AS "type"
-    FROM filtrado
-    GROUP BY 1
-    UNION ALL
-    SELECT
-        core_temp_0 as "core temp",
-        AVG(core_speed_0)::INTEGER AS "core speed",
-        'AVG' AS "type"
-    FROM filtrado
-    GROUP BY 1
-    UNION ALL
-    SELECT
-        core_temp_0 AS "core temp",
-        MAX(core_speed_0)::INTEGER AS "core speed",
-        'MAX' AS "type"
-    FROM filtrado
-    GROUP BY 1
-    """
+    # Com rollups disponíveis, lê os agregados (custo independente do tamanho do histórico)
+    if nucleo_padrao(core) and usar_rollups(engine):
+        query, params = rollup_temp_vs_speed(year, month, day)
+    else:
+        query, params = bruto_temp_vs_speed(year, month, day, core)
     try:
-        # Abre conexão temporária e traz resultado em DataFrame
-        with engine.connect() as conn:
-            df = pd.read_sql_query(text(query), conn, params=params)
+        # Executa a consulta e traz o resultado em DataFrame (com registro no diagnóstico, se ativo)
+        df = executar_consulta("temp_vs_speed", engine, query, params)
         return df
     # Em caso de falha
     except Exception as e:
@@ -199,42 +258,18 @@ def temp_vs_speed(year=None, month=None, day=None):
 
 
 # Temperatura por hora do dia (MIN/AVG/MAX)
-def time_vs_temp(year=None, month=None, day=None):
+@em_cache
+def time_vs_temp(year=None, month=None, day=None, core=None):
     # Obtém Engine compartilhado para executar a consulta
     engine = get_engine()
-    # Monta WHERE/params de acordo com os filtros (None => ignora)
-    where_sql, params = filtro_data(year, month, day)
-    query = f"""
-    WITH filtrado AS (
-        SELECT time, core_temp_0
-        FROM coretemp.raw_data
-        {where_sql}
-    )
-    SELECT
-        EXTRACT(HOUR FROM time) AS "time of day",
-        MIN(core_temp_0) AS "core temp",
-        'MIN' AS "type"
-    FROM filtrado
-    GROUP BY 1
-    UNION ALL
-    SELECT
-        EXTRACT(HOUR FROM time) AS "time of day",
-        AVG(core_temp_0)::INTEGER AS "core temp",
-        'AVG' AS "type"
-    FROM filtrado
-    GROUP BY 1
-    UNION ALL
-    SELECT
-        EXTRACT(HOUR FROM time) AS "time of day",
-        MAX(core_temp_0) AS "core temp",
-        'MAX' AS "type"
-    FROM filtrado
-    GROUP BY 1
-    """
+    # Com rollups disponíveis, lê os agregados (custo independente do tamanho do histórico)
+    if nucleo_padrao(core) and usar_rollups(engine):
+        query, params = rollup_time_vs_temp(year, month, day)
+    else:
+        query, params = bruto_time_vs_temp(year, month, day, core)
     try:
-        # Abre conexão temporária e traz resultado em DataFrame
-        with engine.connect() as conn:
-            df = pd.read_sql_query(text(query), conn, params=params)
+        # Executa a consulta e traz o resultado em DataFrame (com registro no diagnóstico, se ativo)
+        df = executar_consulta("time_vs_temp", engine, query, params)
         return df
     # Em caso de falha
     except Exception as e:
@@ -242,43 +277,20 @@ def time_vs_temp(year=None, month=None, day=None):
         return None
 
 
-# Energia do CPU por hora do dia (MIN/AVG/MAX)
-def time_vs_power(year=None, month=None, day=None):
+# Energia do CPU por hora do dia (MIN/AVG/MAX); core é aceito apenas para uniformidade com as demais consultas
+@em_cache
+def time_vs_power(year=None, month=None, day=None, core=None):
     # Obtém Engine compartilhado para executar a consulta
     engine = get_engine()
-    # Monta WHERE/params de acordo com os filtros (None => ignora)
-    where_sql, params = filtro_data(year, month, day)
-    query = f"""
-    WITH filtrado AS (
-        SELECT time, cpu_power
-        FROM coretemp.raw_data
-        {where_sql}
-    )
-    SELECT
-        EXTRACT(HOUR FROM time) AS "time of day",
-        MIN(cpu_power)::INTEGER AS "cpu power",
-        'MIN' AS "type"
-    FROM filtrado
-    GROUP BY 1
-    UNION ALL
-    SELECT
-        EXTRACT(HOUR FROM time) AS "time of day",
-        AVG(cpu_power)::INTEGER AS "cpu power",
-        'AVG' AS "type"
-    FROM filtrado
-    GROUP BY 1
-    UNION ALL
-    SELECT
-        EXTRACT(HOUR FROM time) AS "time of day",
-        MAX(cpu_power)::INTEGER AS "cpu power",
-        'MAX' AS "type"
-    FROM filtrado
-    GROUP BY 1
-    """
+    # Com rollups disponíveis, lê os agregados (custo independente do tamanho do histórico)
+    # A energia é medida para o processador inteiro: o núcleo escolhido não altera esta consulta
+    if usar_rollups(engine):
+        query, params = rollup_time_vs_power(year, month, day)
+    else:
+        query, params = bruto_time_vs_power(year, month, day)
     try:
-        # Abre conexão temporária e traz resultado em DataFrame
-        with engine.connect() as conn:
-            df = pd.read_sql_query(text(query), conn, params=params)
+        # Executa a consulta e traz o resultado em DataFrame (com registro no diagnóstico, se ativo)
+        df = executar_consulta("time_vs_power", engine, query, params)
         return df
     # Em caso de falha
     except Exception as e:
@@ -287,42 +299,18 @@ def time_vs_power(year=None, month=None, day=None):
 
 
 # Relaciona temperatura (X) vs energia do CPU (Y) por faixa (MIN/AVG/MAX)
-def temp_vs_power(year=None, month=None, day=None):
+@em_cache
+def temp_vs_power(year=None, month=None, day=None, core=None):
     # Obtém Engine compartilhado para executar a consulta
     engine = get_engine()
-    # Monta WHERE/params de acordo com os filtros (None => ignora)
-    where_sql, params = filtro_data(year, month, day)
-    query = f"""
-    WITH filtrado AS (
-        SELECT time, core_temp_0, cpu_power
-        FROM coretemp.raw_data
-        {where_sql}
-    )
-    SELECT
-        core_temp_0 AS "core temp",
-        MIN(cpu_power)::INTEGER AS "cpu power",
-        'MIN' AS "type"
-    FROM filtrado
-    GROUP BY 1
-    UNION ALL
-    SELECT
-        core_temp_0 AS "core temp",
-        AVG(cpu_power)::INTEGER AS "cpu power",
-        'AVG' AS "type"
-    FROM filtrado
-    GROUP BY 1
-    UNION ALL
-    SELECT
-        core_temp_0 AS "core temp",
-        MAX(cpu_power)::INTEGER AS "cpu power",
-        'MAX' AS "type"
-    FROM filtrado
-    GROUP BY 1
-    """
+    # Com rollups disponíveis, lê os agregados (custo independente do tamanho do histórico)
+    if nucleo_padrao(core) and usar_rollups(engine):
+        query, params = rollup_temp_vs_power(year, month, day)
+    else:
+        query, params = bruto_temp_vs_power(year, month, day, core)
     try:
-        # Abre conexão temporária e traz resultado em DataFrame
-        with engine.connect() as conn:
-            df = pd.read_sql_query(text(query), conn, params=params)  # type: ignore
+        # Executa a consulta e traz o resultado em DataFrame (com registro no diagnóstico, se ativo)
+        df = executar_consulta("temp_vs_power", engine, query, params)
         return df
     # Em caso de falha
     except Exception as e:
@@ -331,63 +319,434 @@ def temp_vs_power(year=None, month=None, day=None):
 
 
 # Média diária de minutos por faixa de temperatura
-def faixas_temp(year=None, month=None, day=None):
+@em_cache
+def faixas_temp(year=None, month=None, day=None, core=None):
     # Obtém Engine compartilhado para executar a consulta
     engine = get_engine()
+    # Com rollups disponíveis, lê os agregados (custo independente do tamanho do histórico)
+    if nucleo_padrao(core) and usar_rollups(engine):
+        query, params = rollup_faixas_temp(year, month, day)
+    else:
+        query, params = bruto_faixas_temp(year, month, day, core)
+    try:
+        # Executa a consulta e traz o resultado em DataFrame (com registro no diagnóstico, se ativo)
+        df = executar_consulta("faixas_temp", engine, query, params)
+        return df
+    # Em caso de falha
+    except Exception as e:
+        print(f"Erro ao executar a consulta faixas_temp: {e}")
+        return None
+
+
+# Distribuição das temperaturas: quantidade de amostras por valor de temperatura (uma passada sobre os dados)
+@em_cache
+def distribuicao_temp(year=None, month=None, day=None, core=None):
+    # Obtém Engine compartilhado para executar a consulta
+    engine = get_engine()
+    # Com rollups disponíveis, lê os agregados (custo independente do tamanho do histórico)
+    if nucleo_padrao(core) and usar_rollups(engine):
+        query, params = rollup_distribuicao_temp(year, month, day)
+    else:
+        query, params = bruto_distribuicao_temp(year, month, day, core)
+    try:
+        # Executa a consulta e traz o resultado em DataFrame (com registro no diagnóstico, se ativo)
+        df = executar_consulta("distribuicao_temp", engine, query, params)
+        return df
+    # Em caso de falha
+    except Exception as e:
+        print(f"Erro ao executar a consulta distribuicao_temp: {e}")
+        return None
+
+
+# Estatísticas das amostras de temperatura (mínima, máxima, média, p50/p95/p99 e histograma de 'largura' ºC).
+# Apenas a distribuição (algumas dezenas de linhas) sai do banco; trocar a largura não gera nova consulta.
+def estatisticas_temp(year=None, month=None, day=None, core=None, largura=estatisticas.LARGURA_FAIXA):
+    distribuicao = distribuicao_temp(year=year, month=month, day=day, core=core)
+    if distribuicao is None:
+        return None
+    return estatisticas.resumir(distribuicao, largura)
+
+
+# Consultas do painel principal em paralelo; devolve {nome da consulta: DataFrame}
+def carregar_painel(year=None, month=None, day=None, core=None):
+    consultas = {
+        "faixas_temp": faixas_temp,
+        "temp_vs_speed": temp_vs_speed,
+        "time_vs_temp": time_vs_temp,
+        "time_vs_power": time_vs_power,
+        "temp_vs_power": temp_vs_power,
+        "resumo_temp": resumo_temp,
+        "distribuicao_temp": distribuicao_temp,
+    }
+    return executar_em_paralelo(consultas, year=year, month=month, day=day, core=core)
+
+
+# Consultas sobre a tabela bruta (coretemp.raw_data) ou, para outros núcleos, sobre coretemp.core_data.
+# Cada uma lê os dados filtrados uma única vez: MIN/AVG/MAX (ou as faixas) saem do mesmo GROUP BY
+# e o CROSS JOIN LATERAL (VALUES ...) apenas reorganiza o resultado no formato longo (coluna "type").
+
+# FROM já filtrado com as colunas time, core_temp_0 e core_speed_0 (e cpu_power, se com_energia=True).
+# Para outros núcleos, core_data é lida com os nomes das colunas do núcleo 0, e as consultas não mudam.
+def fonte_dados(year=None, month=None, day=None, core=None, com_energia=False):
+    where_sql, params = filtro_data(year, month, day)
+    if nucleo_padrao(core):
+        return f"coretemp.raw_data {where_sql}", params
+
+    conds = [where_sql[len("WHERE "):]] if where_sql else []
+    colunas = "time, temp AS core_temp_0, speed AS core_speed_0"
+    if core == NUCLEO_TODOS:
+        # Cada (instante, núcleo) é uma amostra; o núcleo vai junto (núcleos por dia em bruto_faixas_temp)
+        dados = f"SELECT {colunas}, core FROM coretemp.core_data {'WHERE ' + ' AND '.join(conds) if conds else ''}"
+    elif core == NUCLEO_MAIS_QUENTE:
+        # A cada instante, apenas o núcleo de maior temperatura (empate => menor número de núcleo)
+        dados = f"""
+            SELECT DISTINCT ON (time) {colunas}
+            FROM coretemp.core_data {'WHERE ' + ' AND '.join(conds) if conds else ''}
+            ORDER BY time, temp DESC, core
+        """
+    else:
+        # Um núcleo: usa o índice (core, time)
+        params["core"] = int(core)
+        dados = f"SELECT {colunas} FROM coretemp.core_data WHERE {' AND '.join(['core = :core'] + conds)}"
+
+    if com_energia:
+        # A energia só existe na tabela bruta (uma medida por instante): junta pelo time, no mesmo período
+        where_bruto, _ = filtro_data(year, month, day, coluna="r.time")
+        dados = f"""
+            SELECT d.time, d.core_temp_0, d.core_speed_0, r.cpu_power
+            FROM ({dados}) AS d
+            JOIN coretemp.raw_data r ON r.time = d.time
+            {where_bruto}
+        """
+    return f"({dados}) AS dados", params
+
+
+# Resumo diário a partir da tabela bruta
+def bruto_resumo_temp(year=None, month=None, day=None, core=None):
+    # Dados filtrados do núcleo escolhido (None => núcleo 0 da tabela bruta)
+    fonte, params = fonte_dados(year, month, day, core)
+    query = f"""
+    WITH agregado AS (
+        SELECT
+            DATE(time) AS dia,
+            MIN(core_temp_0) AS mn,
+            AVG(core_temp_0)::INTEGER AS av,
+            MAX(core_temp_0) AS mx
+        FROM {fonte}
+        GROUP BY 1
+    )
+    SELECT
+        EXTRACT(YEAR FROM dia)::INTEGER AS "ano",
+        EXTRACT(MONTH FROM dia)::INTEGER AS "mes",
+        EXTRACT(DAY FROM dia)::INTEGER AS "dia",
+        v."core temp",
+        v."type"
+    FROM agregado
+    CROSS JOIN LATERAL (VALUES (mn, 'MIN'), (av, 'AVG'), (mx, 'MAX')) AS v("core temp", "type")
+    """
+    return query, params
+
+
+# Temperatura x velocidade a partir da tabela bruta
+def bruto_temp_vs_speed(year=None, month=None, day=None, core=None):
+    # Dados filtrados do núcleo escolhido (None => núcleo 0 da tabela bruta)
+    fonte, params = fonte_dados(year, month, day, core)
+    query = f"""
+    WITH agregado AS (
+        SELECT
+            core_temp_0,
+            MIN(core_speed_0)::INTEGER AS mn,
+            AVG(core_speed_0)::INTEGER AS av,
+            MAX(core_speed_0)::INTEGER AS mx
+        FROM {fonte}
+        GROUP BY 1
+    )
+    SELECT core_temp_0 AS "core temp", v."core speed", v."type"
+    FROM agregado
+    CROSS JOIN LATERAL (VALUES (mn, 'MIN'), (av, 'AVG'), (mx, 'MAX')) AS v("core speed", "type")
+    """
+    return query, params
+
+
+# Temperatura por hora do dia a partir da tabela bruta
+def bruto_time_vs_temp(year=None, month=None, day=None, core=None):
+    # Dados filtrados do núcleo escolhido (None => núcleo 0 da tabela bruta)
+    fonte, params = fonte_dados(year, month, day, core)
+    query = f"""
+    WITH agregado AS (
+        SELECT
+            EXTRACT(HOUR FROM time) AS hora_do_dia,
+            MIN(core_temp_0) AS mn,
+            AVG(core_temp_0)::INTEGER AS av,
+            MAX(core_temp_0) AS mx
+        FROM {fonte}
+        GROUP BY 1
+    )
+    SELECT hora_do_dia AS "time of day", v."core temp", v."type"
+    FROM agregado
+    CROSS JOIN LATERAL (VALUES (mn, 'MIN'), (av, 'AVG'), (mx, 'MAX')) AS v("core temp", "type")
+    """
+    return query, params
+
+
+# Energia por hora do dia a partir da tabela bruta
+def bruto_time_vs_power(year=None, month=None, day=None):
     # Monta WHERE/params de acordo com os filtros (None => ignora)
     where_sql, params = filtro_data(year, month, day)
     query = f"""
-    WITH filtrado AS (
-        SELECT time, core_temp_0
+    WITH agregado AS (
+        SELECT
+            EXTRACT(HOUR FROM time) AS hora_do_dia,
+            MIN(cpu_power)::INTEGER AS mn,
+            AVG(cpu_power)::INTEGER AS av,
+            MAX(cpu_power)::INTEGER AS mx
         FROM coretemp.raw_data
         {where_sql}
+        GROUP BY 1
+    )
+    SELECT hora_do_dia AS "time of day", v."cpu power", v."type"
+    FROM agregado
+    CROSS JOIN LATERAL (VALUES (mn, 'MIN'), (av, 'AVG'), (mx, 'MAX')) AS v("cpu power", "type")
+    """
+    return query, params
+
+
+# Temperatura x energia a partir da tabela bruta
+def bruto_temp_vs_power(year=None, month=None, day=None, core=None):
+    # Dados filtrados do núcleo escolhido (None => núcleo 0 da tabela bruta)
+    fonte, params = fonte_dados(year, month, day, core, com_energia=True)
+    query = f"""
+    WITH agregado AS (
+        SELECT
+            core_temp_0,
+            MIN(cpu_power)::INTEGER AS mn,
+            AVG(cpu_power)::INTEGER AS av,
+            MAX(cpu_power)::INTEGER AS mx
+        FROM {fonte}
+        GROUP BY 1
+    )
+    SELECT core_temp_0 AS "core temp", v."cpu power", v."type"
+    FROM agregado
+    CROSS JOIN LATERAL (VALUES (mn, 'MIN'), (av, 'AVG'), (mx, 'MAX')) AS v("cpu power", "type")
+    """
+    return query, params
+
+
+# Média diária de minutos por faixa a partir da tabela bruta: a faixa de cada amostra vem de um CASE
+# (mesmas condições de antes; 90 ºC exatos não entram em nenhuma faixa)
+def bruto_faixas_temp(year=None, month=None, day=None, core=None):
+    # Dados filtrados do núcleo escolhido (None => núcleo 0 da tabela bruta)
+    fonte, params = fonte_dados(year, month, day, core)
+    faixa_sql = """
+            CASE
+                WHEN core_temp_0 < 60 THEN 1
+                WHEN core_temp_0 < 70 THEN 2
+                WHEN core_temp_0 < 80 THEN 3
+                WHEN core_temp_0 < 90 THEN 4
+                WHEN core_temp_0 > 90 THEN 5
+            END"""
+    # Uma amostra a cada 10 s => 6 por minuto
+    if core == NUCLEO_TODOS:
+        # Com todos os núcleos juntos, cada instante tem uma amostra por núcleo e o resultado é a média de
+        # minutos por núcleo: cada dia é dividido pelos núcleos que registrou (não pelo maior número de núcleos
+        # do histórico), para não subestimar dias de uma máquina/configuração com menos núcleos
+        minutos_sql = f"""
+    WITH amostras AS (
+        SELECT DATE(time) AS dia, {faixa_sql} AS ordernar, core
+        FROM {fonte}
+    ),
+    nucleos_por_dia AS (
+        SELECT dia, COUNT(DISTINCT core) AS nucleos
+        FROM amostras
+        GROUP BY dia
     ),
     minutos_por_dia AS (
-        SELECT DATE(time) AS dia, COUNT(time) / 6.0 AS minutos, '<60' AS categoria
-        FROM filtrado
-        WHERE core_temp_0 < 60
-        GROUP BY DATE(time)
-        UNION ALL
-        SELECT DATE(time) AS dia, COUNT(time) / 6.0 AS minutos, '>=60 & <70' AS categoria
-        FROM filtrado
-        WHERE core_temp_0 >= 60 AND core_temp_0 < 70
-        GROUP BY DATE(time)
-        UNION ALL
-        SELECT DATE(time) AS dia, COUNT(time) / 6.0 AS minutos, '>=70 & <80' AS categoria
-        FROM filtrado
-        WHERE core_temp_0 >= 70 AND core_temp_0 < 80
-        GROUP BY DATE(time)
-        UNION ALL
-        SELECT DATE(time) AS dia, COUNT(time) / 6.0 AS minutos, '>=80 & <90' AS categoria
-        FROM filtrado
-        WHERE core_temp_0 >= 80 AND core_temp_0 < 90
-        GROUP BY DATE(time)
-        UNION ALL
-        SELECT DATE(time) AS dia, COUNT(time) / 6.0 AS minutos, '>=90' AS categoria
-        FROM filtrado
-        WHERE core_temp_0 > 90
-        GROUP BY DATE(time)
-    )
+        SELECT a.dia, a.ordernar, COUNT(*) / (6.0 * n.nucleos) AS minutos
+        FROM amostras a
+        JOIN nucleos_por_dia n USING (dia)
+        GROUP BY a.dia, a.ordernar, n.nucleos
+    )"""
+    else:
+        minutos_sql = f"""
+    WITH minutos_por_dia AS (
+        SELECT
+            DATE(time) AS dia,{faixa_sql} AS ordernar,
+            COUNT(time) / 6.0 AS minutos
+        FROM {fonte}
+        GROUP BY 1, 2
+    )"""
+    query = f"""{minutos_sql}
     SELECT
         ROUND(AVG(minutos)) AS "media diaria",
-        categoria,
-        CASE
-            WHEN categoria = '<60' THEN 1
-            WHEN categoria = '>=60 & <70' THEN 2
-            WHEN categoria = '>=70 & <80' THEN 3
-            WHEN categoria = '>=80 & <90' THEN 4
-            WHEN categoria = '>=90' THEN 5
-        END AS ordernar
+        (ARRAY['<60', '>=60 & <70', '>=70 & <80', '>=80 & <90', '>=90'])[ordernar] AS categoria,
+        ordernar
     FROM minutos_por_dia
-    GROUP BY categoria
+    WHERE ordernar IS NOT NULL
+    GROUP BY ordernar
     ORDER BY ordernar
     """
-    try:
-        # Abre conexão temporária e traz resultado em DataFrame
-        with engine.connect() as conn:
-            df = pd.read_sql_query(text(query), conn, params=params)
-        return df
-    # Em caso de falha
-    except Exception as e:
-        print(f"Erro ao executar a consulta faixas_temp: {e}")
-        return None
\ No newline at end of file
+    return query, params
+
+
+# Amostras por valor de temperatura a partir da tabela bruta
+def bruto_distribuicao_temp(year=None, month=None, day=None, core=None):
+    # Dados filtrados do núcleo escolhido (None => núcleo 0 da tabela bruta)
+    fonte, params = fonte_dados(year, month, day, core)
+    query = f"""
+    SELECT core_temp_0 AS temp, COUNT(*) AS n
+    FROM {fonte}
+    GROUP BY 1
+    ORDER BY 1
+    """
+    return query, params
+
+
+# Consultas equivalentes sobre os rollups (coretemp.rollup_hora / rollup_dia / rollup_temp_dia).
+# A média é recomposta como SOMA / contagem, no mesmo tipo do AVG original para manter o arredondamento do
+# ::INTEGER: NUMERIC para as temperaturas (inteiras; 0,5 longe do zero) e DOUBLE PRECISION para velocidade e
+# energia (0,5 para o par mais próximo).
+
+# Resumo diário a partir de rollup_dia
+def rollup_resumo_temp(year=None, month=None, day=None):
+    where_sql, params = filtro_data(year, month, day, coluna="dia")
+    query = f"""
+    WITH agregado AS (
+        SELECT dia, temp_min, (temp_soma::NUMERIC / n)::INTEGER AS temp_avg, temp_max
+        FROM coretemp.rollup_dia
+        {where_sql}
+    )
+    SELECT
+        EXTRACT(YEAR FROM dia)::INTEGER AS "ano",
+        EXTRACT(MONTH FROM dia)::INTEGER AS "mes",
+        EXTRACT(DAY FROM dia)::INTEGER AS "dia",
+        v."core temp",
+        v."type"
+    FROM agregado
+    CROSS JOIN LATERAL (VALUES (temp_min, 'MIN'), (temp_avg, 'AVG'), (temp_max, 'MAX')) AS v("core temp", "type")
+    """
+    return query, params
+
+
+# Temperatura x velocidade a partir de rollup_temp_dia
+def rollup_temp_vs_speed(year=None, month=None, day=None):
+    where_sql, params = filtro_data(year, month, day, coluna="dia")
+    query = f"""
+    WITH agregado AS (
+        SELECT
+            core_temp,
+            MIN(speed_min)::INTEGER AS mn,
+            (SUM(speed_soma)::DOUBLE PRECISION / SUM(n))::INTEGER AS av,
+            MAX(speed_max)::INTEGER AS mx
+        FROM coretemp.rollup_temp_dia
+        {where_sql}
+        GROUP BY core_temp
+    )
+    SELECT core_temp AS "core temp", v."core speed", v."type"
+    FROM agregado
+    CROSS JOIN LATERAL (VALUES (mn, 'MIN'), (av, 'AVG'), (mx, 'MAX')) AS v("core speed", "type")
+    """
+    return query, params
+
+
+# Temperatura por hora do dia a partir de rollup_hora
+def rollup_time_vs_temp(year=None, month=None, day=None):
+    where_sql, params = filtro_data(year, month, day, coluna="hora")
+    query = f"""
+    WITH agregado AS (
+        SELECT
+            EXTRACT(HOUR FROM hora) AS hora_do_dia,
+            MIN(temp_min) AS mn,
+            (SUM(temp_soma)::NUMERIC / SUM(n))::INTEGER AS av,
+            MAX(temp_max) AS mx
+        FROM coretemp.rollup_hora
+        {where_sql}
+        GROUP BY 1
+    )
+    SELECT hora_do_dia AS "time of day", v."core temp", v."type"
+    FROM agregado
+    CROSS JOIN LATERAL (VALUES (mn, 'MIN'), (av, 'AVG'), (mx, 'MAX')) AS v("core temp", "type")
+    """
+    return query, params
+
+
+# Energia por hora do dia a partir de rollup_hora
+def rollup_time_vs_power(year=None, month=None, day=None):
+    where_sql, params = filtro_data(year, month, day, coluna="hora")
+    query = f"""
+    WITH agregado AS (
+        SELECT
+            EXTRACT(HOUR FROM hora) AS hora_do_dia,
+            MIN(power_min)::INTEGER AS mn,
+            (SUM(power_soma)::DOUBLE PRECISION / SUM(n))::INTEGER AS av,
+            MAX(power_max)::INTEGER AS mx
+        FROM coretemp.rollup_hora
+        {where_sql}
+        GROUP BY 1
+    )
+    SELECT hora_do_dia AS "time of day", v."cpu power", v."type"
+    FROM agregado
+    CROSS JOIN LATERAL (VALUES (mn, 'MIN'), (av, 'AVG'), (mx, 'MAX')) AS v("cpu power", "type")
+    """
+    return query, params
+
+
+# Temperatura x energia a partir de rollup_temp_dia
+def rollup_temp_vs_power(year=None, month=None, day=None):
+    where_sql, params = filtro_data(year, month, day, coluna="dia")
+    query = f"""
+    WITH agregado AS (
+        SELECT
+            core_temp,
+            MIN(power_min)::INTEGER AS mn,
+            (SUM(power_soma)::DOUBLE PRECISION / SUM(n))::INTEGER AS av,
+            MAX(power_max)::INTEGER AS mx
+        FROM coretemp.rollup_temp_dia
+        {where_sql}
+        GROUP BY core_temp
+    )
+    SELECT core_temp AS "core temp", v."cpu power", v."type"
+    FROM agregado
+    CROSS JOIN LATERAL (VALUES (mn, 'MIN'), (av, 'AVG'), (mx, 'MAX')) AS v("cpu power", "type")
+    """
+    return query, params
+
+
+# Média diária de minutos por faixa a partir de rollup_dia (dias sem amostras na faixa não entram na média)
+def rollup_faixas_temp(year=None, month=None, day=None):
+    where_sql, params = filtro_data(year, month, day, coluna="dia")
+    query = f"""
+    WITH dias AS (
+        SELECT dia, n_faixa_1, n_faixa_2, n_faixa_3, n_faixa_4, n_faixa_5
+        FROM coretemp.rollup_dia
+        {where_sql}
+    )
+    SELECT
+        ROUND(AVG(v.n / 6.0)) AS "media diaria",
+        v.categoria,
+        v.ordernar
+    FROM dias
+    CROSS JOIN LATERAL (VALUES
+        (n_faixa_1, '<60', 1),
+        (n_faixa_2, '>=60 & <70', 2),
+        (n_faixa_3, '>=70 & <80', 3),
+        (n_faixa_4, '>=80 & <90', 4),
+        (n_faixa_5, '>=90', 5)
+    ) AS v(n, categoria, ordernar)
+    WHERE v.n > 0
+    GROUP BY v.categoria, v.ordernar
+    ORDER BY v.ordernar
+    """
+    return query, params
+
+
+# Amostras por valor de temperatura a partir de rollup_temp_dia
+def rollup_distribuicao_temp(year=None, month=None, day=None):
+    where_sql, params = filtro_data(year, month, day, coluna="dia")
+    query = f"""
+    SELECT core_temp AS temp, SUM(n) AS n
+    FROM coretemp.rollup_temp_dia
+    {where_sql}
+    GROUP BY 1
+    ORDER BY 1
+    """
+    return query, params
@@ -0,0 +1,335 @@
+# Consultas a partir de um armazenamento analítico em memória (sem PostgreSQL) para o app
+# Descrição: os processados (CSV de data/processed e data/loaded_processed) são lidos uma vez para arrays NumPy
+# por coluna, ordenados pelo horário, com um índice dia -> posição inicial. Cada filtro de data vira uma fatia
+# contígua por busca binária no índice (sem varrer as linhas); os cálculos são os mesmos de queries_parquet.py.
+# Arquivos novos são acrescentados de forma incremental; arquivo alterado ou removido refaz o armazenamento.
+
+import os
+import glob
+import time
+import threading
+import numpy as np
+import pandas as pd
+from src.queries.cache import em_cache, invalidar
+from src.queries import estatisticas
+from src.queries.painel import executar_em_paralelo, NUCLEO_TODOS
+from src.queries.queries_parquet import (
+    ler_nucleo, calcular_resumo_temp, calcular_temp_vs_speed, calcular_time_vs_temp, calcular_time_vs_power,
+    calcular_temp_vs_power, calcular_faixas_temp, calcular_distribuicao_temp,
+)
+
+# Pastas dos processados (padrão: <projeto>/data/processed e data/loaded_processed; separadas por os.pathsep)
+raiz_projeto = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..")
+pastas_memoria = os.environ.get(
+    "CORETEMP_MEMORIA_PASTAS",
+    os.pathsep.join(os.path.join(raiz_projeto, "data", pasta) for pasta in ("processed", "loaded_processed")),
+).split(os.pathsep)
+
+# Intervalo mínimo (s) entre duas verificações de arquivos novos nas pastas
+INTERVALO_VERIFICACAO = float(os.environ.get("CORETEMP_MEMORIA_INTERVALO", 5))
+
+NS_DIA = 86_400 * 1_000_000_000
+
+# Armazenamento atual. É substituído por inteiro a cada atualização, então uma consulta em andamento
+# continua usando a versão que leu no início (sem lock nas leituras).
+_vazio = {
+    "arquivos": set(),      # (nome, tamanho, mtime) de cada arquivo já lido
+    "colunas": {},          # nome -> array NumPy; "time" em int64 (ns), ordenado
+    "inteiras": set(),      # colunas inteiras na origem (com lacunas, ficam em float64 com NaN)
+    "dias": np.empty(0, dtype="int64"),      # dias presentes (dias desde 1970-01-01), ordenados
+    "inicios": np.zeros(1, dtype="int64"),   # posição da primeira linha de cada dia (+ total de linhas no fim)
+    "calendario": pd.DataFrame(columns=["ano", "mes", "dia"], dtype="int64"),  # ano/mês/dia de cada dia do índice
+}
+_estado = _vazio
+_lock = threading.Lock()
+_ultima_verificacao = None
+
+
+# Processados presentes nas pastas: {(nome, tamanho, mtime): caminho}. O nome (sem a pasta) permite que um
+# arquivo movido de data/processed para data/loaded_processed continue sendo o mesmo.
+def listar_arquivos():
+    arquivos = {}
+    for pasta in pastas_memoria:
+        for caminho in glob.glob(os.path.join(pasta, "*.csv")):
+            info = os.stat(caminho)
+            arquivos[(os.path.basename(caminho), info.st_size, info.st_mtime_ns)] = caminho
+    return arquivos
+
+
+# Lê um processado como {coluna: array}, com o horário em int64 (ns) e inteiros no menor tipo que os comporta
+def ler_arquivo(caminho):
+    dados = pd.read_csv(caminho, parse_dates=["time"])
+    colunas = {"time": dados["time"].to_numpy(dtype="datetime64[ns]").view("int64")}
+    for nome in dados.columns.drop("time"):
+        serie = dados[nome]
+        if pd.api.types.is_integer_dtype(serie):
+            serie = pd.to_numeric(serie, downcast="integer")
+        colunas[nome] = serie.to_numpy()
+    return colunas
+
+
+# Junta as colunas já carregadas com as de novos arquivos; colunas ausentes em uma parte (outro número de
+# núcleos) ficam NaN. Só reordena se as novas linhas não vierem todas depois das anteriores.
+def mesclar(partes):
+    partes = [p for p in partes if len(p.get("time", ()))]
+    if not partes:
+        return {}
+    nomes = list(dict.fromkeys(nome for parte in partes for nome in parte))
+    colunas = {
+        nome: np.concatenate([p[nome] if nome in p else np.full(len(p["time"]), np.nan) for p in partes])
+        for nome in nomes
+    }
+    tempo = colunas["time"]
+    if np.any(tempo[1:] < tempo[:-1]):
+        ordem = np.argsort(tempo, kind="stable")
+        colunas = {nome: valores[ordem] for nome, valores in colunas.items()}
+    return colunas
+
+
+# Monta um novo estado a partir das colunas: índice dia -> posição e calendário dos dias presentes
+def montar_estado(arquivos, colunas, inteiras):
+    if not colunas:
+        return {**_vazio, "arquivos": set(arquivos)}
+    dia_linha = colunas["time"] // NS_DIA
+    # Posições onde o dia muda (o horário está ordenado, então cada dia é um trecho contíguo)
+    inicios = np.concatenate(([0], np.flatnonzero(np.diff(dia_linha)) + 1, [len(dia_linha)]))
+    dias = dia_linha[inicios[:-1]]
+    datas = pd.DatetimeIndex(dias.astype("datetime64[D]"))
+    return {
+        "arquivos": set(arquivos),
+        "colunas": colunas,
+        "inteiras": inteiras,
+        "dias": dias,
+        "inicios": inicios,
+        "calendario": pd.DataFrame({"ano": datas.year, "mes": datas.month, "dia": datas.day}),
+    }
+
+
+# Verifica as pastas e incorpora arquivos novos; devolve True se o armazenamento mudou.
+# forcar=True ignora o intervalo mínimo entre verificações.
+def sincronizar(forcar=False):
+    global _estado, _ultima_verificacao
+    with _lock:
+        agora = time.monotonic()
+        if not forcar and _ultima_verificacao is not None and agora - _ultima_verificacao < INTERVALO_VERIFICACAO:
+            return False
+        _ultima_verificacao = agora
+
+        atuais = listar_arquivos()
+        if set(atuais) == _estado["arquivos"]:
+            return False
+
+        inicio = time.perf_counter()
+        if _estado["arquivos"] - set(atuais):
+            # Arquivo alterado ou removido: as linhas antigas não têm como ser separadas, então tudo é relido
+            base, inteiras, novos = {}, None, sorted(atuais)
+        else:
+            base, inteiras = _estado["colunas"], (_estado["inteiras"] if _estado["colunas"] else None)
+            novos = sorted(set(atuais) - _estado["arquivos"])
+
+        partes = [ler_arquivo(atuais[chave]) for chave in novos]
+        for parte in partes:
+            inteiras_parte = {nome for nome, valores in parte.items() if valores.dtype.kind in "iu"}
+            inteiras = inteiras_parte if inteiras is None else inteiras & inteiras_parte
+        _estado = montar_estado(atuais, mesclar([base] + partes), inteiras or set())
+        print(f"Armazenamento em memória: {len(novos)} arquivo(s) lido(s), "
+              f"{len(_estado['colunas'].get('time', ()))} linhas, {time.perf_counter() - inicio:.2f}s")
+
+    # Resultados guardados pelo cache são da versão anterior dos dados
+    invalidar()
+    return True
+
+
+# Fatias [início, fim) de linhas para o filtro de data (None => ignora)
+def fatias(estado, year=None, month=None, day=None):
+    dias, inicios = estado["dias"], estado["inicios"]
+    if year is not None and (day is None or month is not None):
+        # Intervalo contíguo de datas: duas buscas binárias no índice de dias
+        primeiro = pd.Timestamp(int(year), int(month or 1), int(day or 1))
+        if day is not None:
+            ultimo = primeiro + pd.DateOffset(days=1)
+        elif month is not None:
+            ultimo = primeiro + pd.DateOffset(months=1)
+        else:
+            ultimo = primeiro + pd.DateOffset(years=1)
+        limites = np.array([primeiro.value, ultimo.value]) // NS_DIA
+        i, j = np.searchsorted(dias, limites)
+        return [(inicios[i], inicios[j])]
+
+    # Filtros sem ano (ex.: todo dia 15, ou o mesmo mês de anos diferentes): máscara sobre os dias do índice
+    calendario = estado["calendario"]
+    mascara = np.ones(len(dias), dtype=bool)
+    for nome, valor in (("ano", year), ("mes", month), ("dia", day)):
+        if valor is not None:
+            mascara &= calendario[nome].to_numpy() == int(valor)
+    escolhidos = np.flatnonzero(mascara)
+    # Dias consecutivos no índice formam uma única fatia
+    grupos = np.split(escolhidos, np.flatnonzero(np.diff(escolhidos) != 1) + 1) if len(escolhidos) else []
+    return [(inicios[g[0]], inicios[g[-1] + 1]) for g in grupos]
+
+
+# Leitura das colunas necessárias no filtro de data (mesma interface de queries_parquet.ler_dados)
+def ler_dados(colunas, year=None, month=None, day=None):
+    estado = _estado
+    if not estado["colunas"]:
+        return pd.DataFrame(columns=colunas)
+    partes = fatias(estado, year, month, day)
+    dados = {}
+    for nome in colunas:
+        valores = estado["colunas"][nome]
+        # Uma fatia só é uma visão do array (sem cópia); várias são concatenadas
+        valores = valores[partes[0][0]:partes[0][1]] if len(partes) == 1 else np.concatenate(
+            [valores[a:b] for a, b in partes] or [valores[:0]])
+        if nome == "time":
+            valores = valores.view("datetime64[ns]")
+        elif nome in estado["inteiras"] and valores.dtype.kind == "f" and not np.isnan(valores).any():
+            # Coluna inteira com lacunas em outro trecho: sem lacunas aqui, volta a ser inteira (arredondamento do AVG)
+            valores = valores.astype("int64")
+        dados[nome] = valores
+    return pd.DataFrame(dados)
+
+
+# Leitura de um núcleo (core): mesma regra de queries_parquet.ler_nucleo sobre o armazenamento em memória
+def ler_memoria(colunas, year=None, month=None, day=None, core=None):
+    return ler_nucleo(colunas, year, month, day, core, ler=ler_dados, disponiveis=nucleos_disponiveis)
+
+
+# Valores de ano/mês/dia presentes no índice de dias, filtrados pelos níveis acima
+def valores_calendario(nome, **filtros):
+    sincronizar()
+    calendario = _estado["calendario"]
+    for coluna, valor in filtros.items():
+        if valor is not None:
+            calendario = calendario[calendario[coluna] == int(valor)]
+    return sorted(int(v) for v in calendario[nome].unique())
+
+
+# Dimensão de tempo: anos disponíveis nos dados (lidos do índice de dias, sem cache)
+def anos_disponiveis():
+    return valores_calendario("ano")
+
+
+# Dimensão de tempo: meses disponíveis (opcionalmente filtrados por ano)
+def meses_disponiveis(year=None):
+    return valores_calendario("mes", ano=year)
+
+
+# Dimensão de tempo: dias disponíveis (opcionalmente filtrados por ano/mês)
+def dias_disponiveis(year=None, month=None):
+    return valores_calendario("dia", ano=year, mes=month)
+
+
+# Núcleos presentes nos processados (colunas core_temp_N)
+def nucleos_disponiveis():
+    sincronizar()
+    nomes = _estado["colunas"]
+    return sorted(int(nome[len("core_temp_"):]) for nome in nomes if nome.startswith("core_temp_")) or [0]
+
+
+# Resumo diário (MIN/AVG/MAX) da temperatura por dia
+@em_cache
+def resumo_temp(year=None, month=None, day=None, core=None):
+    try:
+        sincronizar()
+        return calcular_resumo_temp(ler_memoria(["time", "core_temp_0"], year, month, day, core))
+    # Em caso de falha
+    except Exception as e:
+        print(f"Erro ao executar a consulta resumo_temp: {e}")
+        return None
+
+
+# Relaciona temperatura (X) vs velocidade do núcleo (Y) por faixa (MIN/AVG/MAX)
+@em_cache
+def temp_vs_speed(year=None, month=None, day=None, core=None):
+    try:
+        sincronizar()
+        return calcular_temp_vs_speed(ler_memoria(["core_temp_0", "core_speed_0"], year, month, day, core))
+    # Em caso de falha
+    except Exception as e:
+        print(f"Erro ao executar a consulta temp_vs_speed: {e}")
+        return None
+
+
+# Temperatura por hora do dia (MIN/AVG/MAX)
+@em_cache
+def time_vs_temp(year=None, month=None, day=None, core=None):
+    try:
+        sincronizar()
+        return calcular_time_vs_temp(ler_memoria(["time", "core_temp_0"], year, month, day, core))
+    # Em caso de falha
+    except Exception as e:
+        print(f"Erro ao executar a consulta time_vs_temp: {e}")
+        return None
+
+
+# Energia do CPU por hora do dia (MIN/AVG/MAX); a energia é do processador inteiro, core não altera o resultado
+@em_cache
+def time_vs_power(year=None, month=None, day=None, core=None):
+    try:
+        sincronizar()
+        return calcular_time_vs_power(ler_dados(["time", "cpu_power"], year, month, day))
+    # Em caso de falha
+    except Exception as e:
+        print(f"Erro ao executar a consulta time_vs_power: {e}")
+        return None
+
+
+# Relaciona temperatura (X) vs energia do CPU (Y) por faixa (MIN/AVG/MAX)
+@em_cache
+def temp_vs_power(year=None, month=None, day=None, core=None):
+    try:
+        sincronizar()
+        return calcular_temp_vs_power(ler_memoria(["core_temp_0", "cpu_power"], year, month, day, core))
+    # Em caso de falha
+    except Exception as e:
+        print(f"Erro ao executar a consulta temp_vs_power: {e}")
+        return None
+
+
+# Média diária de minutos por faixa de temperatura
+@em_cache
+def faixas_temp(year=None, month=None, day=None, core=None):
+    try:
+        sincronizar()
+        colunas = ["time", "core_temp_0"] + (["core"] if core == NUCLEO_TODOS else [])
+        return calcular_faixas_temp(ler_memoria(colunas, year, month, day, core))
+    # Em caso de falha
+    except Exception as e:
+        print(f"Erro ao executar a consulta faixas_temp: {e}")
+        return None
+
+
+# Distribuição das temperaturas: quantidade de amostras por valor de temperatura
+@em_cache
+def distribuicao_temp(year=None, month=None, day=None, core=None):
+    try:
+        sincronizar()
+        return calcular_distribuicao_temp(ler_memoria(["core_temp_0"], year, month, day, core))
+    # Em caso de falha
+    except Exception as e:
+        print(f"Erro ao executar a consulta distribuicao_temp: {e}")
+        return None
+
+
+# Estatísticas das amostras de temperatura (mínima, máxima, média, p50/p95/p99 e histograma de 'largura' ºC)
+def estatisticas_temp(year=None, month=None, day=None, core=None, largura=estatisticas.LARGURA_FAIXA):
+    distribuicao = distribuicao_temp(year=year, month=month, day=day, core=core)
+    if distribuicao is None:
+        return None
+    return estatisticas.resumir(distribuicao, largura)
+
+
+# Consultas do painel principal em paralelo; devolve {nome da consulta: DataFrame}
+def carregar_painel(year=None, month=None, day=None, core=None):
+    # Incorpora arquivos novos antes de consultar (invalida o cache se algo mudou)
+    sincronizar()
+    consultas = {
+        "faixas_temp": faixas_temp,
+        "temp_vs_speed": temp_vs_speed,
+        "time_vs_temp": time_vs_temp,
+        "time_vs_power": time_vs_power,
+        "temp_vs_power": temp_vs_power,
+        "resumo_temp": resumo_temp,
+        "distribuicao_temp": distribuicao_temp,
+    }
+    return executar_em_paralelo(consultas, year=year, month=month, day=day, core=core)
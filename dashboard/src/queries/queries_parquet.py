@@ -0,0 +1,331 @@
+# Consultas a partir do dataset Parquet (sem PostgreSQL) para o app
+# Descrição: mesmas funções de queries.py, calculadas com pandas sobre data/parquet
+# (particionado em ano=/mes=/dia=, gerado por pipeline.py com formato="parquet").
+
+import os
+import re
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+from src.queries.cache import em_cache
+from src.queries import estatisticas
+from src.queries.painel import executar_em_paralelo, nucleo_padrao, NUCLEO_TODOS, NUCLEO_MAIS_QUENTE
+
+# Raiz do dataset (padrão: <projeto>/data/parquet; pode ser sobrescrita por variável de ambiente)
+raiz_parquet = os.environ.get(
+    "CORETEMP_PARQUET",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "data", "parquet"),
+)
+
+
+# Leitura das colunas necessárias, podando as partições pelo filtro de data
+def ler_dados(colunas, year=None, month=None, day=None):
+    # Filtros sobre as colunas de partição (None => ignora)
+    filtros = [(nome, "=", int(valor)) for nome, valor in (("ano", year), ("mes", month), ("dia", day)) if valor is not None]
+    # Dataset ainda inexistente: devolve estrutura vazia
+    if not os.path.isdir(raiz_parquet):
+        return pd.DataFrame(columns=colunas)
+    return pd.read_parquet(raiz_parquet, columns=colunas, filters=filtros or None, engine="pyarrow")
+
+
+# Leitura de um núcleo com os nomes das colunas do núcleo 0 (core_temp_0, core_speed_0), como em queries.py
+# colunas: colunas pedidas; as métricas por núcleo são trocadas pelas do núcleo escolhido
+# ler/disponiveis: leitura das colunas e núcleos existentes (padrão: dataset Parquet; usados também por queries_memoria)
+# A coluna "core" (se pedida) é o núcleo de cada amostra, como em coretemp.core_data
+def ler_nucleo(colunas, year=None, month=None, day=None, core=None, ler=None, disponiveis=None):
+    ler = ler or ler_dados
+    if nucleo_padrao(core):
+        resultado = ler([c for c in colunas if c != "core"], year, month, day)
+        if "core" in colunas:
+            resultado["core"] = 0
+        return resultado[colunas]
+
+    nucleos = (disponiveis or nucleos_disponiveis)() if core in (NUCLEO_TODOS, NUCLEO_MAIS_QUENTE) else [int(core)]
+    # O núcleo mais quente é escolhido pela temperatura, então ela é sempre lida
+    metricas = [c for c in ("core_temp_0", "core_speed_0") if c in colunas or c == "core_temp_0"]
+    outras = [c for c in colunas if c not in metricas and c != "core"]
+    por_nucleo = {m: [f"{m[:-2]}_{k}" for k in nucleos] for m in metricas}
+    df = ler(outras + [c for nomes in por_nucleo.values() for c in nomes], year, month, day)
+
+    # Núcleo sem leitura em um instante (ex.: log de uma máquina com menos núcleos) fica NaN nas colunas largas;
+    # assim como em coretemp.core_data (só linhas com temperatura), essas amostras não existem
+    if core == NUCLEO_TODOS:
+        # Formato longo: cada (instante, núcleo) com temperatura é uma amostra
+        partes = [df[outras].assign(core=k, **{m: df[por_nucleo[m][i]] for m in metricas})
+                  for i, k in enumerate(nucleos)]
+        resultado = pd.concat(partes, ignore_index=True).dropna(subset=["core_temp_0"])
+    elif core == NUCLEO_MAIS_QUENTE:
+        # A cada instante, o núcleo de maior temperatura (empate => menor número de núcleo, como no SQL);
+        # núcleos sem leitura nunca são escolhidos e instantes sem nenhuma leitura são descartados
+        temperaturas = df[por_nucleo["core_temp_0"]].to_numpy(dtype="float64")
+        ausentes = np.isnan(temperaturas)
+        validas = ~ausentes.all(axis=1)
+        escolhido = np.where(ausentes, -np.inf, temperaturas).argmax(axis=1)[validas]
+        linhas = np.flatnonzero(validas)
+        resultado = df.loc[validas, outras].reset_index(drop=True)
+        for m in metricas:
+            resultado[m] = df[por_nucleo[m]].to_numpy()[linhas, escolhido]
+        resultado["core"] = np.asarray(nucleos)[escolhido]
+    else:
+        resultado = df.rename(columns={nomes[0]: m for m, nomes in por_nucleo.items()}).assign(core=nucleos[0])
+        resultado = resultado.dropna(subset=["core_temp_0"]).reset_index(drop=True)
+
+    # Temperaturas são inteiras (SMALLINT/int16); depois de descartar as lacunas (NaN) voltam a ser inteiras,
+    # o que mantém o arredondamento do AVG de coluna inteira
+    if resultado["core_temp_0"].dtype.kind == "f":
+        resultado["core_temp_0"] = resultado["core_temp_0"].astype("int64")
+    return resultado[colunas]
+
+
+# Valores de uma partição (ex.: "ano") a partir dos nomes dos diretórios, sem ler os arquivos
+def valores_particao(*niveis):
+    # niveis: valores já escolhidos nos níveis acima (ex.: ano, mês); None => todos
+    caminhos = [raiz_parquet]
+    for nome, valor in zip(("ano", "mes", "dia"), niveis):
+        proximos = []
+        for caminho in caminhos:
+            if not os.path.isdir(caminho):
+                continue
+            for pasta in os.listdir(caminho):
+                if pasta.startswith(f"{nome}=") and (valor is None or pasta == f"{nome}={int(valor)}"):
+                    proximos.append(os.path.join(caminho, pasta))
+        caminhos = proximos
+
+    # Coleta o nível seguinte (ano, mes ou dia) dos diretórios restantes
+    nome = ("ano", "mes", "dia")[len(niveis)]
+    valores = set()
+    for caminho in caminhos:
+        if not os.path.isdir(caminho):
+            continue
+        for pasta in os.listdir(caminho):
+            if pasta.startswith(f"{nome}="):
+                valores.add(int(pasta.split("=", 1)[1]))
+    return sorted(valores)
+
+
+# Reproduz o "::INTEGER" do PostgreSQL
+def para_inteiro(valores, origem_inteira=False):
+    # AVG de coluna inteira é NUMERIC no PostgreSQL: 0,5 arredonda para longe do zero.
+    # Valores DOUBLE PRECISION usam rint: 0,5 vai para o par mais próximo (mesmo que np.rint).
+    valores = np.asarray(valores, dtype="float64")
+    if origem_inteira:
+        return (np.sign(valores) * np.floor(np.abs(valores) + 0.5)).astype("int64")
+    return np.rint(valores).astype("int64")
+
+
+# Monta o formato longo (MIN/AVG/MAX em linhas, coluna "type") a partir de um agrupamento
+def min_avg_max(df, chaves, coluna, nome_valor, converter_min_max=False):
+    agrupado = df.groupby(chaves)[coluna].agg(["min", "mean", "max"]).reset_index()
+    origem_inteira = pd.api.types.is_integer_dtype(df[coluna])
+    partes = []
+    for tipo, estatistica in (("MIN", "min"), ("AVG", "mean"), ("MAX", "max")):
+        parte = agrupado[chaves].copy()
+        valores = agrupado[estatistica]
+        # AVG sempre é convertido para inteiro; MIN/MAX apenas quando a consulta SQL também converte
+        if estatistica == "mean" or converter_min_max:
+            valores = para_inteiro(valores, origem_inteira=origem_inteira)
+        parte[nome_valor] = valores
+        parte["type"] = tipo
+        partes.append(parte)
+    return pd.concat(partes, ignore_index=True)
+
+
+# Faixas de temperatura na mesma ordem/condições da consulta SQL (o limite superior é "> 90")
+faixas = [
+    ("<60", 1, lambda t: t < 60),
+    (">=60 & <70", 2, lambda t: (t >= 60) & (t < 70)),
+    (">=70 & <80", 3, lambda t: (t >= 70) & (t < 80)),
+    (">=80 & <90", 4, lambda t: (t >= 80) & (t < 90)),
+    (">=90", 5, lambda t: t > 90),
+]
+
+
+# Cálculos de cada consulta a partir das amostras já filtradas (compartilhados com queries_memoria)
+
+# Resumo diário (MIN/AVG/MAX) da temperatura; df: colunas time e core_temp_0
+def calcular_resumo_temp(df):
+    df["ano"] = df["time"].dt.year
+    df["mes"] = df["time"].dt.month
+    df["dia"] = df["time"].dt.day
+    return min_avg_max(df, ["ano", "mes", "dia"], "core_temp_0", "core temp")
+
+
+# Velocidade (MIN/AVG/MAX) por temperatura; df: colunas core_temp_0 e core_speed_0
+def calcular_temp_vs_speed(df):
+    df = df.rename(columns={"core_temp_0": "core temp"})
+    return min_avg_max(df, ["core temp"], "core_speed_0", "core speed", converter_min_max=True)
+
+
+# Temperatura (MIN/AVG/MAX) por hora do dia; df: colunas time e core_temp_0
+def calcular_time_vs_temp(df):
+    df["time of day"] = df["time"].dt.hour
+    return min_avg_max(df, ["time of day"], "core_temp_0", "core temp")
+
+
+# Energia (MIN/AVG/MAX) por hora do dia; df: colunas time e cpu_power
+def calcular_time_vs_power(df):
+    df["time of day"] = df["time"].dt.hour
+    return min_avg_max(df, ["time of day"], "cpu_power", "cpu power", converter_min_max=True)
+
+
+# Energia (MIN/AVG/MAX) por temperatura; df: colunas core_temp_0 e cpu_power
+def calcular_temp_vs_power(df):
+    df = df.rename(columns={"core_temp_0": "core temp"})
+    return min_avg_max(df, ["core temp"], "cpu_power", "cpu power", converter_min_max=True)
+
+
+# Média diária de minutos por faixa; df: colunas time e core_temp_0 (e core, com todos os núcleos juntos)
+def calcular_faixas_temp(df):
+    datas = df["time"].dt.normalize()
+    # Uma amostra a cada 10 s => 6 por minuto. Com todos os núcleos juntos, cada dia é dividido pelos núcleos
+    # que registrou: o resultado é a média de minutos por núcleo, sem subestimar dias com menos núcleos
+    if "core" in df:
+        amostras_por_minuto = 6.0 * df.groupby(datas)["core"].nunique()
+    else:
+        amostras_por_minuto = pd.Series(6.0, index=datas.unique())
+    linhas = []
+    for categoria, ordem, condicao in faixas:
+        # Minutos por dia na faixa
+        contagens = datas[condicao(df["core_temp_0"])].value_counts()
+        minutos = contagens / amostras_por_minuto.reindex(contagens.index)
+        # Dias sem amostras na faixa não entram na média (igual ao GROUP BY do SQL)
+        if len(minutos):
+            linhas.append({
+                "media diaria": float(para_inteiro([minutos.mean()], origem_inteira=True)[0]),
+                "categoria": categoria,
+                "ordernar": ordem,
+            })
+    return pd.DataFrame(linhas, columns=["media diaria", "categoria", "ordernar"])
+
+
+# Amostras por valor de temperatura; df: coluna core_temp_0
+def calcular_distribuicao_temp(df):
+    contagens = df["core_temp_0"].value_counts().sort_index()
+    return pd.DataFrame({"temp": contagens.index, "n": contagens.to_numpy()})
+
+
+# Dimensão de tempo: anos disponíveis nos dados
+@em_cache
+def anos_disponiveis():
+    return valores_particao()
+
+
+# Dimensão de tempo: meses disponíveis (opcionalmente filtrados por ano)
+@em_cache
+def meses_disponiveis(year=None):
+    return valores_particao(year)
+
+
+# Dimensão de tempo: dias disponíveis (opcionalmente filtrados por ano/mês)
+@em_cache
+def dias_disponiveis(year=None, month=None):
+    return valores_particao(year, month)
+
+
+# Núcleos presentes no dataset (colunas core_temp_N do esquema)
+@em_cache
+def nucleos_disponiveis():
+    if not os.path.isdir(raiz_parquet):
+        return [0]
+    nomes = ds.dataset(raiz_parquet, format="parquet", partitioning="hive").schema.names
+    return sorted(int(m.group(1)) for m in map(re.compile(r"^core_temp_(\d+)$").match, nomes) if m) or [0]
+
+
+# Resumo diário (MIN/AVG/MAX) da temperatura por dia
+@em_cache
+def resumo_temp(year=None, month=None, day=None, core=None):
+    try:
+        return calcular_resumo_temp(ler_nucleo(["time", "core_temp_0"], year, month, day, core))
+    # Em caso de falha
+    except Exception as e:
+        print(f"Erro ao executar a consulta resumo_temp: {e}")
+        return None
+
+
+# Relaciona temperatura (X) vs velocidade do núcleo (Y) por faixa (MIN/AVG/MAX)
+@em_cache
+def temp_vs_speed(year=None, month=None, day=None, core=None):
+    try:
+        return calcular_temp_vs_speed(ler_nucleo(["core_temp_0", "core_speed_0"], year, month, day, core))
+    # Em caso de falha
+    except Exception as e:
+        print(f"Erro ao executar a consulta temp_vs_speed: {e}")
+        return None
+
+
+# Temperatura por hora do dia (MIN/AVG/MAX)
+@em_cache
+def time_vs_temp(year=None, month=None, day=None, core=None):
+    try:
+        return calcular_time_vs_temp(ler_nucleo(["time", "core_temp_0"], year, month, day, core))
+    # Em caso de falha
+    except Exception as e:
+        print(f"Erro ao executar a consulta time_vs_temp: {e}")
+        return None
+
+
+# Energia do CPU por hora do dia (MIN/AVG/MAX); a energia é do processador inteiro, core não altera o resultado
+@em_cache
+def time_vs_power(year=None, month=None, day=None, core=None):
+    try:
+        return calcular_time_vs_power(ler_dados(["time", "cpu_power"], year, month, day))
+    # Em caso de falha
+    except Exception as e:
+        print(f"Erro ao executar a consulta time_vs_power: {e}")
+        return None
+
+
+# Relaciona temperatura (X) vs energia do CPU (Y) por faixa (MIN/AVG/MAX)
+@em_cache
+def temp_vs_power(year=None, month=None, day=None, core=None):
+    try:
+        return calcular_temp_vs_power(ler_nucleo(["core_temp_0", "cpu_power"], year, month, day, core))
+    # Em caso de falha
+    except Exception as e:
+        print(f"Erro ao executar a consulta temp_vs_power: {e}")
+        return None
+
+
+# Média diária de minutos por faixa de temperatura
+@em_cache
+def faixas_temp(year=None, month=None, day=None, core=None):
+    try:
+        colunas = ["time", "core_temp_0"] + (["core"] if core == NUCLEO_TODOS else [])
+        return calcular_faixas_temp(ler_nucleo(colunas, year, month, day, core))
+    # Em caso de falha
+    except Exception as e:
+        print(f"Erro ao executar a consulta faixas_temp: {e}")
+        return None
+
+
+# Distribuição das temperaturas: quantidade de amostras por valor de temperatura
+@em_cache
+def distribuicao_temp(year=None, month=None, day=None, core=None):
+    try:
+        return calcular_distribuicao_temp(ler_nucleo(["core_temp_0"], year, month, day, core))
+    # Em caso de falha
+    except Exception as e:
+        print(f"Erro ao executar a consulta distribuicao_temp: {e}")
+        return None
+
+
+# Estatísticas das amostras de temperatura (mínima, máxima, média, p50/p95/p99 e histograma de 'largura' ºC)
+def estatisticas_temp(year=None, month=None, day=None, core=None, largura=estatisticas.LARGURA_FAIXA):
+    distribuicao = distribuicao_temp(year=year, month=month, day=day, core=core)
+    if distribuicao is None:
+        return None
+    return estatisticas.resumir(distribuicao, largura)
+
+
+# Consultas do painel principal em paralelo; devolve {nome da consulta: DataFrame}
+def carregar_painel(year=None, month=None, day=None, core=None):
+    consultas = {
+        "faixas_temp": faixas_temp,
+        "temp_vs_speed": temp_vs_speed,
+        "time_vs_temp": time_vs_temp,
+        "time_vs_power": time_vs_power,
+        "temp_vs_power": temp_vs_power,
+        "resumo_temp": resumo_temp,
+        "distribuicao_temp": distribuicao_temp,
+    }
+    return executar_em_paralelo(consultas, year=year, month=month, day=day, core=core)
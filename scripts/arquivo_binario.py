@@ -0,0 +1,345 @@
+# Objetivo: Arquivo binário de telemetria, de largura fixa, para leitura sem reinterpretar CSV:
+#   - Cabeçalho de 4096 bytes: assinatura + JSON (versão, núcleos, colunas, se está ordenado por horário)
+#   - Registros de largura fixa: 'time' em segundos desde 1970 (int64) + uma coluna float32 por métrica
+#   - Leitura sem cópia com numpy.memmap; intervalos de horário por busca binária na coluna 'time'
+#   - Índice de dias (<arquivo>.idx, JSON): posição do primeiro registro de cada dia, com CRC32 verificado
+#     na leitura; índice ausente, corrompido ou desatualizado é refeito a partir do arquivo
+#   - O pipeline acrescenta as linhas limpas (--arquivo-binario); a compactação ordena e remove horários repetidos
+#
+# Uso:
+#   python scripts/arquivo_binario.py info [--arquivo data/arquivo/telemetria.bin]
+#   python scripts/arquivo_binario.py compactar [--arquivo data/arquivo/telemetria.bin]
+#
+#   registros = arquivo_binario.ler_intervalo(caminho, "2024-01-01", "2024-01-02")   # visão do memmap, sem cópia
+#   dados = arquivo_binario.para_dataframe(registros)
+
+import argparse
+import json
+import os
+import time
+import zlib
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+# Local padrão do arquivo (CORETEMP_ARQUIVO_BINARIO ou --arquivo-binario CAMINHO no main.py)
+caminho_padrao = os.environ.get("CORETEMP_ARQUIVO_BINARIO", "data/arquivo/telemetria.bin")
+
+# Formato
+ASSINATURA = b"CTBIN\x00\x01\x00"
+TAMANHO_CABECALHO = 4096
+VERSAO = 1
+SEGUNDOS_DIA = 86400
+
+# Tempo máximo (s) de espera pelo lock de escrita; um lock mais antigo que isso é considerado abandonado
+espera_lock = 300
+
+
+def tipo_registro(colunas):
+    # Registro de largura fixa: time (int64, segundos) seguido das métricas em float32, sem alinhamento
+    return np.dtype([("time", "<i8")] + [(coluna, "<f4") for coluna in colunas])
+
+
+def montar_cabecalho(colunas, ordenado=True):
+    # Bytes do cabeçalho: assinatura + JSON completado com espaços até TAMANHO_CABECALHO
+    nucleos = len([c for c in colunas if c.startswith("core_temp_")])
+    conteudo = json.dumps({
+        "versao": VERSAO,
+        "nucleos": nucleos,
+        "colunas": list(colunas),
+        "ordenado": ordenado,
+    }).encode("utf-8")
+    if len(ASSINATURA) + len(conteudo) > TAMANHO_CABECALHO:
+        raise ValueError("Colunas demais para o cabeçalho do arquivo binário.")
+    return (ASSINATURA + conteudo).ljust(TAMANHO_CABECALHO, b" ")
+
+
+def ler_cabecalho(caminho):
+    # Cabeçalho como dicionário; arquivo que não é deste formato gera ValueError
+    with open(caminho, "rb") as arquivo:
+        bruto = arquivo.read(TAMANHO_CABECALHO)
+    if len(bruto) < TAMANHO_CABECALHO or not bruto.startswith(ASSINATURA):
+        raise ValueError(f"{caminho} não é um arquivo binário de telemetria.")
+    cabecalho = json.loads(bruto[len(ASSINATURA):].decode("utf-8"))
+    if cabecalho["versao"] != VERSAO:
+        raise ValueError(f"Versão {cabecalho['versao']} do arquivo binário não suportada.")
+    return cabecalho
+
+
+def marcar_ordenado(caminho, cabecalho, ordenado):
+    # Regrava apenas o cabeçalho (tamanho fixo) com o novo valor de 'ordenado'
+    with open(caminho, "r+b") as arquivo:
+        arquivo.write(montar_cabecalho(cabecalho["colunas"], ordenado))
+    cabecalho["ordenado"] = ordenado
+
+
+def abrir(caminho):
+    # (cabeçalho, registros) com os registros mapeados em memória (somente leitura, sem cópia).
+    # Bytes de um registro incompleto no fim (escrita interrompida) são ignorados.
+    cabecalho = ler_cabecalho(caminho)
+    tipo = tipo_registro(cabecalho["colunas"])
+    quantidade = (os.path.getsize(caminho) - TAMANHO_CABECALHO) // tipo.itemsize
+    if quantidade == 0:
+        return cabecalho, np.empty(0, dtype=tipo)
+    registros = np.memmap(caminho, dtype=tipo, mode="r", offset=TAMANHO_CABECALHO, shape=(quantidade,))
+    return cabecalho, registros
+
+
+def para_registros(dados, colunas):
+    # DataFrame processado -> array de registros. O horário do log (sem fuso) é gravado como se fosse UTC.
+    # Colunas do arquivo ausentes no DataFrame (ex.: outro número de núcleos) ficam NaN.
+    registros = np.empty(len(dados), dtype=tipo_registro(colunas))
+    registros["time"] = dados["time"].to_numpy(dtype="datetime64[s]").astype("int64")
+    for coluna in colunas:
+        registros[coluna] = dados[coluna].to_numpy(dtype="float32") if coluna in dados else np.nan
+    return registros
+
+
+def para_dataframe(registros):
+    # Registros (memmap ou array) -> DataFrame com 'time' em datetime64 e métricas em float32 (cópia)
+    dados = pd.DataFrame({nome: np.asarray(registros[nome]) for nome in registros.dtype.names})
+    dados["time"] = dados["time"].to_numpy().astype("datetime64[s]").astype("datetime64[ns]")
+    return dados
+
+
+@contextmanager
+def lock_escrita(caminho):
+    # Lock de escrita entre processos (pipeline paralelo): arquivo <arquivo>.lock criado de forma exclusiva
+    caminho_lock = caminho + ".lock"
+    inicio = time.monotonic()
+    while True:
+        try:
+            os.close(os.open(caminho_lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(caminho_lock) > espera_lock:
+                    os.remove(caminho_lock)  # lock abandonado por um processo interrompido
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() - inicio > espera_lock:
+                raise TimeoutError(f"Lock de escrita ocupado: {caminho_lock}")
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.remove(caminho_lock)
+
+
+def acrescentar(caminho, dados):
+    # Acrescenta as linhas de um DataFrame processado ao fim do arquivo (criado no primeiro uso) e atualiza o
+    # índice de dias. Colunas que o arquivo não tem geram ValueError (use um novo arquivo para outro layout).
+    # Linhas anteriores ao último horário gravado deixam o arquivo "não ordenado" até a próxima compactação.
+    if len(dados) == 0:
+        return 0
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    with lock_escrita(caminho):
+        if not os.path.exists(caminho) or os.path.getsize(caminho) == 0:
+            # Colunas na ordem do processado: métricas de cada núcleo e energia
+            colunas = [c for c in dados.columns if c != "time"]
+            with open(caminho, "wb") as arquivo:
+                arquivo.write(montar_cabecalho(colunas))
+        cabecalho = ler_cabecalho(caminho)
+        novas = set(dados.columns) - set(cabecalho["colunas"]) - {"time"}
+        if novas:
+            raise ValueError(f"Colunas ausentes no arquivo binário {caminho}: {sorted(novas)}")
+
+        tipo = tipo_registro(cabecalho["colunas"])
+        registros = para_registros(dados, cabecalho["colunas"])
+        if not np.all(registros["time"][1:] >= registros["time"][:-1]):
+            registros = registros[np.argsort(registros["time"], kind="stable")]
+
+        _, existentes = abrir(caminho)
+        quantidade = len(existentes)
+        ultimo = int(existentes["time"][-1]) if quantidade else None
+        del existentes  # fecha o mapeamento antes de escrever (necessário no Windows)
+
+        with open(caminho, "r+b") as arquivo:
+            # Descarta um registro incompleto deixado por uma escrita interrompida
+            arquivo.truncate(TAMANHO_CABECALHO + quantidade * tipo.itemsize)
+            arquivo.seek(0, os.SEEK_END)
+            arquivo.write(registros.tobytes())
+
+        if cabecalho["ordenado"] and ultimo is not None and registros["time"][0] < ultimo:
+            marcar_ordenado(caminho, cabecalho, False)
+        if cabecalho["ordenado"]:
+            estender_indice(caminho, quantidade, registros["time"])
+        else:
+            remover_indice(caminho)
+    return len(registros)
+
+
+def caminho_indice(caminho):
+    # Índice de dias ao lado do arquivo: <arquivo>.idx
+    return caminho + ".idx"
+
+
+def calcular_crc(indice):
+    # CRC32 do conteúdo do índice (todos os campos, exceto o próprio CRC), em JSON canônico
+    conteudo = {chave: valor for chave, valor in indice.items() if chave != "crc32"}
+    return zlib.crc32(json.dumps(conteudo, sort_keys=True).encode("utf-8"))
+
+
+def gravar_indice(caminho, dias, inicios, registros):
+    # Grava o índice de forma atômica: dias (desde 1970), posição do primeiro registro de cada dia e o total
+    indice = {"registros": int(registros), "dias": [int(d) for d in dias], "inicios": [int(i) for i in inicios]}
+    indice["crc32"] = calcular_crc(indice)
+    caminho_temp = caminho_indice(caminho) + ".tmp"
+    with open(caminho_temp, "w", encoding="utf-8") as arquivo:
+        json.dump(indice, arquivo)
+    os.replace(caminho_temp, caminho_indice(caminho))
+    return indice
+
+
+def remover_indice(caminho):
+    # Descarta o índice (arquivo deixou de estar ordenado; volta a existir após a compactação)
+    if os.path.exists(caminho_indice(caminho)):
+        os.remove(caminho_indice(caminho))
+
+
+def dias_de(tempos, deslocamento=0):
+    # Dias presentes em 'tempos' (ordenados) e a posição do primeiro registro de cada um
+    dia_linha = np.asarray(tempos) // SEGUNDOS_DIA
+    if len(dia_linha) == 0:
+        return np.empty(0, dtype="int64"), np.empty(0, dtype="int64")
+    inicios = np.concatenate(([0], np.flatnonzero(np.diff(dia_linha)) + 1))
+    return dia_linha[inicios], inicios + deslocamento
+
+
+def ler_indice(caminho, quantidade):
+    # Índice verificado (CRC e total de registros); None se ausente, corrompido ou desatualizado
+    try:
+        with open(caminho_indice(caminho), "r", encoding="utf-8") as arquivo:
+            indice = json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+    if indice.get("crc32") != calcular_crc(indice) or indice.get("registros") != quantidade:
+        return None
+    return indice
+
+
+def reconstruir_indice(caminho):
+    # Refaz o índice a partir da coluna 'time' do arquivo (exige o arquivo ordenado)
+    _, registros = abrir(caminho)
+    dias, inicios = dias_de(registros["time"])
+    return gravar_indice(caminho, dias, inicios, len(registros))
+
+
+def estender_indice(caminho, quantidade, tempos):
+    # Acrescenta ao índice os dias das linhas recém-gravadas (a partir da posição 'quantidade')
+    indice = ler_indice(caminho, quantidade)
+    if indice is None:
+        return reconstruir_indice(caminho)
+    dias, inicios = dias_de(tempos, quantidade)
+    # O primeiro dia novo pode ser a continuação do último dia já indexado
+    if indice["dias"] and len(dias) and dias[0] == indice["dias"][-1]:
+        dias, inicios = dias[1:], inicios[1:]
+    return gravar_indice(caminho, indice["dias"] + list(dias), indice["inicios"] + list(inicios),
+                         quantidade + len(tempos))
+
+
+def indice_dias(caminho):
+    # Índice de dias válido para o arquivo, refeito se necessário; None se o arquivo não estiver ordenado
+    cabecalho, registros = abrir(caminho)
+    if not cabecalho["ordenado"]:
+        return None
+    return ler_indice(caminho, len(registros)) or reconstruir_indice(caminho)
+
+
+def para_segundos(instante):
+    # Texto/Timestamp -> segundos desde 1970 (mesma convenção do arquivo: horário do log tratado como UTC)
+    return int(pd.Timestamp(instante).to_datetime64().astype("datetime64[s]").astype("int64"))
+
+
+def ler_intervalo(caminho, inicio=None, fim=None):
+    # Registros com inicio <= time < fim (None => sem limite). Arquivo ordenado: busca binária na coluna 'time'
+    # e devolve uma visão do memmap (sem cópia). Não ordenado: filtra por máscara (cópia) e avisa.
+    cabecalho, registros = abrir(caminho)
+    limites = [para_segundos(inicio) if inicio is not None else None, para_segundos(fim) if fim is not None else None]
+    if not cabecalho["ordenado"]:
+        print(f"Aviso: {caminho} não está ordenado; execute a compactação para leituras por intervalo sem cópia.")
+        mascara = np.ones(len(registros), dtype=bool)
+        if limites[0] is not None:
+            mascara &= registros["time"] >= limites[0]
+        if limites[1] is not None:
+            mascara &= registros["time"] < limites[1]
+        return registros[mascara]
+    i = 0 if limites[0] is None else np.searchsorted(registros["time"], limites[0])
+    j = len(registros) if limites[1] is None else np.searchsorted(registros["time"], limites[1])
+    return registros[i:j]
+
+
+def ler_dia(caminho, dia):
+    # Registros de um dia (data em texto ou Timestamp) pelas posições do índice de dias (visão sem cópia)
+    indice = indice_dias(caminho)
+    if indice is None:
+        inicio = pd.Timestamp(dia).normalize()
+        return ler_intervalo(caminho, inicio, inicio + pd.Timedelta(days=1))
+    _, registros = abrir(caminho)
+    numero = para_segundos(pd.Timestamp(dia).normalize()) // SEGUNDOS_DIA
+    posicao = np.searchsorted(indice["dias"], numero)
+    if posicao == len(indice["dias"]) or indice["dias"][posicao] != numero:
+        return registros[:0]
+    fim = indice["inicios"][posicao + 1] if posicao + 1 < len(indice["inicios"]) else len(registros)
+    return registros[indice["inicios"][posicao]:fim]
+
+
+def compactar(caminho):
+    # Reescreve o arquivo ordenado por horário, sem horários repetidos (fica o último gravado) e sem bytes
+    # incompletos no fim; o índice de dias é refeito. A troca é atômica (arquivo temporário + rename).
+    with lock_escrita(caminho):
+        cabecalho, registros = abrir(caminho)
+        antes = len(registros)
+        ordem = np.argsort(registros["time"], kind="stable")
+        ordenados = np.asarray(registros[ordem])
+        del registros  # fecha o mapeamento antes de substituir o arquivo (necessário no Windows)
+        # Horário repetido (ex.: log reprocessado): mantém o último registro gravado
+        manter = np.ones(len(ordenados), dtype=bool)
+        manter[:-1] = ordenados["time"][1:] != ordenados["time"][:-1]
+        ordenados = ordenados[manter]
+
+        caminho_temp = caminho + ".tmp"
+        with open(caminho_temp, "wb") as arquivo:
+            arquivo.write(montar_cabecalho(cabecalho["colunas"], ordenado=True))
+            arquivo.write(ordenados.tobytes())
+        os.replace(caminho_temp, caminho)
+        dias, inicios = dias_de(ordenados["time"])
+        gravar_indice(caminho, dias, inicios, len(ordenados))
+    return antes, len(ordenados)
+
+
+def info(caminho):
+    # Resumo do arquivo: colunas, registros, período, tamanho e situação do índice
+    cabecalho, registros = abrir(caminho)
+    valido = ler_indice(caminho, len(registros)) is not None
+    print(f"Arquivo: {caminho} ({os.path.getsize(caminho) / 1024 ** 2:.1f} MB)")
+    print(f"Núcleos: {cabecalho['nucleos']} | colunas: {len(cabecalho['colunas'])} | "
+          f"registro: {registros.dtype.itemsize} bytes")
+    print(f"Registros: {len(registros)} | ordenado: {'sim' if cabecalho['ordenado'] else 'não'} | "
+          f"índice de dias: {'válido' if valido else 'ausente ou desatualizado'}")
+    if len(registros):
+        tempos = registros["time"]
+        primeiro, ultimo = (tempos[0], tempos[-1]) if cabecalho["ordenado"] else (tempos.min(), tempos.max())
+        print(f"Período: {pd.Timestamp(primeiro, unit='s')} a {pd.Timestamp(ultimo, unit='s')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manutenção do arquivo binário de telemetria.")
+    parser.add_argument("comando", choices=["info", "compactar"], help="info: resumo; compactar: ordena e deduplica.")
+    parser.add_argument("--arquivo", default=caminho_padrao, help=f"Arquivo binário (padrão: {caminho_padrao}).")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.arquivo):
+        print(f"Arquivo não encontrado: {args.arquivo}")
+        return
+    if args.comando == "compactar":
+        inicio = time.perf_counter()
+        antes, depois = compactar(args.arquivo)
+        print(f"Compactado em {time.perf_counter() - inicio:.2f}s: {antes} -> {depois} registros "
+              f"({antes - depois} repetidos removidos).")
+    info(args.arquivo)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+# Objetivo: Ingestão contínua dos logs do Core Temp, sem as pausas do fluxo interativo:
+#   - Observa data/raw (watchdog/inotify, se instalado; caso contrário, polling) por logs novos ou que cresceram
+#   - Debounce: espera o arquivo ficar alguns segundos sem escrita (ou um tempo máximo, para logs contínuos)
+#   - Lê apenas os bytes novos de cada arquivo (posição e cabeçalho guardados em data/daemon_estado.json)
+#   - Transforma com o parser_coretemp e carrega via COPY em micro-lotes, atualizando rollups e tabela por núcleo
+#   - Exporta o atraso ponta a ponta (horário da linha mais recente -> commit) em formato Prometheus
+# Os arquivos não são movidos: o Core Temp continua escrevendo neles. O manifesto recebe o checkpoint,
+# então uma execução posterior do pipeline em lote não duplica as linhas já carregadas.
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+import load
+import manifest
+import metricas
+import nucleos
+import parser_coretemp
+import rollups
+
+# watchdog é opcional: sem ele, a pasta é verificada a cada 'intervalo' segundos
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+
+# Pasta observada, estado por arquivo e arquivo de métricas (textfile do node_exporter)
+raw_data_path = "data/raw"
+estado_path = "data/daemon_estado.json"
+metricas_path = "data/metricas/coretemp_daemon.prom"
+
+# Tempos padrão (segundos)
+intervalo_padrao = 5.0       # verificação da pasta (polling) ou espera máxima entre eventos
+debounce_padrao = 2.0        # tempo sem escrita para considerar o trecho novo completo
+espera_maxima_padrao = 30.0  # log que não para de crescer é lido mesmo assim após este tempo
+
+
+def carregar_estado():
+    # Estado por arquivo: {"nome.csv": {"posicao": bytes já lidos, "cabecalho": [colunas]}}; um arquivo cujo
+    # layout não foi reconhecido guarda também "falha": {"tamanho", "mtime", "erro"}
+    if not os.path.exists(estado_path):
+        return {}
+    with open(estado_path, "r", encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def salvar_estado(estado):
+    # Gravação atômica (arquivo temporário + rename), como no manifesto
+    os.makedirs(os.path.dirname(estado_path), exist_ok=True)
+    caminho_temp = estado_path + ".tmp"
+    with open(caminho_temp, "w", encoding="utf-8") as arquivo:
+        json.dump(estado, arquivo, indent=2, ensure_ascii=False)
+    os.replace(caminho_temp, estado_path)
+
+
+def gravar_metricas(atraso, linhas_total, arquivos):
+    # Métricas do daemon no formato de texto do Prometheus (textfile collector do node_exporter), junto com
+    # os totais das etapas medidas neste processo (leitura, conversão, inserção, commit)
+    metricas.gravar_prometheus(metricas_path, [
+        ("coretemp_ingestao_atraso_segundos", "gauge",
+         "Atraso entre o horário da linha mais recente e o commit no banco.", round(atraso, 3)),
+        ("coretemp_ingestao_linhas_total", "counter",
+         "Linhas carregadas pelo daemon desde o início do processo.", linhas_total),
+        ("coretemp_ingestao_arquivos", "gauge", "Arquivos incluídos no último micro-lote.", arquivos),
+        ("coretemp_ingestao_ultimo_lote_timestamp_segundos", "gauge",
+         "Momento (epoch) do último commit.", round(time.time(), 3)),
+    ] + metricas.metricas_etapas(metricas.pico_rss()))
+
+
+def iniciar_observador(evento):
+    # Com watchdog disponível, sinaliza 'evento' a cada criação/alteração em data/raw. Sem ele, retorna None.
+    if Observer is None:
+        return None
+
+    class Notificador(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if not event.is_directory:
+                evento.set()
+
+    observador = Observer()
+    observador.schedule(Notificador(), raw_data_path, recursive=False)
+    observador.start()
+    return observador
+
+
+def verificar_arquivos(estado, pendentes, debounce, espera_maxima):
+    # Arquivos com bytes ainda não lidos e prontos para leitura (debounce cumprido ou espera máxima atingida).
+    # pendentes: nome -> instante em que a mudança foi notada (memória do processo)
+    agora = time.time()
+    prontos = []
+    existentes = set()
+    for nome in sorted(os.listdir(raw_data_path)):
+        if not nome.endswith(".csv"):
+            continue
+        existentes.add(nome)
+        try:
+            info = os.stat(os.path.join(raw_data_path, nome))
+        except OSError:
+            continue  # removido entre o listdir e o stat
+        entrada = estado.get(nome, {})
+        if info.st_size == entrada.get("posicao", 0):
+            pendentes.pop(nome, None)
+            continue
+        # Falha de leitura registrada: o arquivo só é lido de novo depois de mudar (tamanho ou data)
+        falha = entrada.get("falha")
+        if falha and falha["tamanho"] == info.st_size and falha["mtime"] == info.st_mtime:
+            pendentes.pop(nome, None)
+            continue
+        pendentes.setdefault(nome, agora)
+        if agora - info.st_mtime >= debounce or agora - pendentes[nome] >= espera_maxima:
+            prontos.append(nome)
+
+    # Arquivos que saíram da pasta (ex.: arquivados pelo pipeline em lote) deixam de ser acompanhados
+    for nome in set(estado) - existentes:
+        del estado[nome]
+    return prontos
+
+
+def ler_novos_bytes(caminho, entrada):
+    # Trecho novo e completo (até a última quebra de linha) a partir da posição salva.
+    # Retorna (colunas, bytes das linhas, nova posição) ou None se ainda não houver linhas completas.
+    tamanho = os.path.getsize(caminho)
+    posicao = entrada.get("posicao", 0)
+    nomes = entrada.get("cabecalho")
+    if tamanho < posicao:
+        # Arquivo recriado/truncado: recomeça do início
+        posicao = 0
+        nomes = None
+    with open(caminho, "rb") as arquivo:
+        arquivo.seek(posicao)
+        trecho = arquivo.read(tamanho - posicao)
+
+    # Uma linha ainda sendo escrita fica para a próxima leitura
+    fim = trecho.rfind(b"\n")
+    if fim < 0:
+        return None
+    trecho = trecho[:fim + 1]
+
+    inicio = 0
+    if nomes is None:
+        # Início do arquivo: metadados e cabeçalho precisam estar completos
+        try:
+            nomes, inicio = parser_coretemp.ler_cabecalho(trecho)
+        except ValueError:
+            return None
+        if inicio > len(trecho):
+            return None
+    return nomes, trecho[inicio:], posicao + len(trecho)
+
+
+def registrar_falha(estado, nome, erro):
+    # Guarda no estado (e no disco) o tamanho e a data do arquivo que falhou; posição e cabeçalho não mudam
+    try:
+        info = os.stat(os.path.join(raw_data_path, nome))
+    except OSError:
+        return
+    entrada = estado.setdefault(nome, {})
+    entrada["falha"] = {"tamanho": info.st_size, "mtime": info.st_mtime, "erro": str(erro)}
+    salvar_estado(estado)
+
+
+def processar(prontos, estado, pendentes, batch_size):
+    # Um micro-lote: lê e transforma o trecho novo de cada arquivo pronto e carrega tudo em uma transação.
+    # Em caso de erro nada é confirmado e a posição não avança (o mesmo trecho é tentado de novo).
+    # Retorna (linhas carregadas, maior 'time' carregado ou None).
+    manifesto = manifest.carregar_manifesto()
+    lotes = []
+    for nome in prontos:
+        lido = ler_novos_bytes(os.path.join(raw_data_path, nome), estado.get(nome, {}))
+        if lido is None:
+            # Sem linha completa ainda: reinicia a espera deste arquivo
+            pendentes[nome] = time.time()
+            continue
+        colunas, dados_bytes, nova_posicao = lido
+        try:
+            dados, _ = parser_coretemp.ler_linhas(colunas, dados_bytes)
+        except ValueError as e:
+            # Layout não reconhecido: o arquivo fica de fora, sem derrubar o daemon. Tamanho e data ficam no
+            # estado para que ele não seja relido a cada verificação com o mesmo erro, só quando mudar.
+            print(f"!!! ERRO ao ler {nome}: {e}")
+            print("!!! O arquivo será ignorado até ser alterado.")
+            registrar_falha(estado, nome, e)
+            pendentes.pop(nome, None)
+            continue
+
+        # Checkpoint do manifesto: nunca reenvia linhas já carregadas (reinício do daemon, carga em lote)
+        desde = manifesto.get(nome, {}).get("ultimo_time_carregado")
+        if desde:
+            dados = dados[dados["time"] > pd.Timestamp(desde)]
+        lotes.append((nome, colunas, dados, nova_posicao, desde))
+
+    if not lotes:
+        return 0, None
+
+    registros = []
+    intervalos_carga = []
+    carga_max = None
+    with load.Session() as session:
+        try:
+            load.preparar_esquema(session.connection())
+            for nome, _, dados, _, desde in lotes:
+                num_rows, time_min, time_max = load.carregar_dataframe(session, dados, batch_size=batch_size)
+                registros.append((nome, num_rows, time_min, time_max, desde))
+                if num_rows:
+                    intervalos_carga.append((time_min, time_max))
+                    carga_max = manifest.maior_time(carga_max, time_max)
+
+            # Índice na tabela recém-criada e derivados dos dias afetados, na mesma transação
+            load.preparar_esquema(session.connection())
+            if carga_max is not None:
+                with metricas.etapa("derivados", linhas=sum(r[1] for r in registros)):
+                    nucleos.manter_nucleos(session.connection(), intervalos_carga)
+                    rollups.manter_rollups(session.connection(), intervalos_carga)
+            with metricas.etapa("commit", linhas=sum(r[1] for r in registros)):
+                session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"!!! ERRO no micro-lote ({', '.join(nome for nome, *_ in lotes)}): {e}")
+            print("!!! Nada foi confirmado; o trecho será lido de novo na próxima verificação.")
+            return 0, None
+
+    # Após o commit: avança as posições, registra o checkpoint e avisa o dashboard
+    total = 0
+    for (nome, colunas, _, nova_posicao, _), (_, num_rows, time_min, time_max, desde) in zip(lotes, registros):
+        estado[nome] = {
+            "posicao": nova_posicao,
+            "cabecalho": colunas,
+            "atualizado_em": datetime.now().isoformat(timespec="seconds"),
+        }
+        pendentes.pop(nome, None)
+        if num_rows:
+            entrada = manifesto.get(nome, {})
+            manifest.registrar(
+                manifesto, nome,
+                status=manifest.STATUS_CARREGADO,
+                ultimo_time_carregado=manifest.maior_time(desde, time_max),
+                linhas_carregadas=entrada.get("linhas_carregadas", 0) + num_rows,
+                time_min=entrada.get("time_min") or time_min,
+            )
+        total += num_rows
+    salvar_estado(estado)
+    manifest.salvar_manifesto(manifesto)
+    if total:
+        manifest.marcar_atualizacao()  # invalida o cache do dashboard
+    return total, carga_max
+
+
+def executar(intervalo=intervalo_padrao, debounce=debounce_padrao, espera_maxima=espera_maxima_padrao,
+             batch_size=load.batch_size_padrao):
+    # Laço principal do daemon (Ctrl+C encerra)
+    os.makedirs(raw_data_path, exist_ok=True)
+    evento = threading.Event()
+    observador = iniciar_observador(evento)
+    modo = "watchdog" if observador else f"polling a cada {intervalo:g}s"
+    print(f"\n--- Daemon de ingestão observando {raw_data_path} ({modo}); Ctrl+C para encerrar ---")
+
+    estado = carregar_estado()
+    pendentes = {}
+    linhas_total = 0
+    try:
+        while True:
+            # Acorda por evento (watchdog) ou por tempo; com arquivos pendentes, a tempo de cumprir o debounce
+            evento.wait(min(intervalo, debounce) if pendentes else intervalo)
+            evento.clear()
+
+            prontos = verificar_arquivos(estado, pendentes, debounce, espera_maxima)
+            if not prontos:
+                continue
+            # Micro-lote completo também no log estruturado das etapas (data/metricas/etapas.jsonl)
+            with metricas.etapa("micro_lote", arquivos=len(prontos)) as medida:
+                linhas, carga_max = processar(prontos, estado, pendentes, batch_size)
+                medida["linhas"] = linhas
+                if carga_max is not None:
+                    atraso = (datetime.now() - pd.Timestamp(carga_max).to_pydatetime()).total_seconds()
+                    medida["atraso_segundos"] = round(atraso, 3)
+            if carga_max is None:
+                continue
+            linhas_total += linhas
+            gravar_metricas(atraso, linhas_total, len(prontos))
+            print(f"[{datetime.now():%H:%M:%S}] Micro-lote: {linhas} linhas de {len(prontos)} arquivo(s); atraso {atraso:.1f}s")
+    except KeyboardInterrupt:
+        print("\n--- Daemon encerrado ---")
+    finally:
+        if observador is not None:
+            observador.stop()
+            observador.join()
@@ -0,0 +1,125 @@
+# Objetivo: Camada única de acesso ao PostgreSQL, usada pela carga (scripts/) e pelo dashboard:
+#   - Configuração por variáveis de ambiente (CORETEMP_DB_*) ou arquivo JSON (config/db.json); o ambiente prevalece
+#   - Engine criado apenas na primeira consulta: importar os módulos não exige o banco no ar
+#   - Pool de conexões, statement_timeout e reaproveitamento de prepared statements (psycopg) ajustáveis
+
+import json
+import os
+import threading
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Arquivo de configuração opcional (padrão: <projeto>/config/db.json)
+config_path = os.environ.get(
+    "CORETEMP_DB_CONFIG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config", "db.json"),
+)
+
+# Valores padrão de cada opção e a variável de ambiente correspondente
+opcoes_padrao = {
+    "url": None,                   # URL completa (SQLAlchemy); se informada, ignora usuário/senha/host/porta/banco
+    "usuario": "postgres",
+    "senha": "postgres",
+    "host": "localhost",
+    "porta": 5432,
+    "banco": "pessoal",
+    "pool_size": 5,                # conexões mantidas abertas no pool
+    "max_overflow": 5,             # conexões extras em picos (fechadas ao serem devolvidas)
+    "pool_recycle": 1800,          # segundos até uma conexão ser renovada
+    "statement_timeout_ms": 0,     # tempo máximo de cada comando no servidor (0 = sem limite)
+    "prepare_threshold": 5,        # execuções de uma mesma consulta antes de prepará-la no servidor (None = nunca)
+}
+variaveis_ambiente = {
+    "url": "CORETEMP_DB_URL",
+    "usuario": "CORETEMP_DB_USUARIO",
+    "senha": "CORETEMP_DB_SENHA",
+    "host": "CORETEMP_DB_HOST",
+    "porta": "CORETEMP_DB_PORTA",
+    "banco": "CORETEMP_DB_BANCO",
+    "pool_size": "CORETEMP_DB_POOL",
+    "max_overflow": "CORETEMP_DB_POOL_EXTRA",
+    "pool_recycle": "CORETEMP_DB_POOL_RECICLAR",
+    "statement_timeout_ms": "CORETEMP_DB_STATEMENT_TIMEOUT",
+    "prepare_threshold": "CORETEMP_DB_PREPARE_THRESHOLD",
+}
+opcoes_inteiras = ("porta", "pool_size", "max_overflow", "pool_recycle", "statement_timeout_ms")
+
+# Padrões definidos pela aplicação (ex.: o dashboard limita o tempo das consultas), abaixo de arquivo e ambiente
+_padroes_aplicacao = {}
+
+# Engine único do processo, criado na primeira consulta
+_engine = None
+_engine_lock = threading.Lock()
+_fabrica_sessoes = sessionmaker()
+
+
+def definir_padroes(**opcoes):
+    # Ajusta os padrões desta aplicação; vale apenas antes da criação do engine
+    desconhecidas = set(opcoes) - set(opcoes_padrao)
+    if desconhecidas:
+        raise ValueError(f"Opções de banco desconhecidas: {sorted(desconhecidas)}")
+    _padroes_aplicacao.update(opcoes)
+
+
+def ler_configuracao():
+    # Opções efetivas: padrões do módulo < padrões da aplicação < arquivo JSON < variáveis de ambiente
+    opcoes = {**opcoes_padrao, **_padroes_aplicacao}
+    if os.path.exists(config_path):
+        with open(config_path, "r", encoding="utf-8") as arquivo:
+            do_arquivo = json.load(arquivo)
+        desconhecidas = set(do_arquivo) - set(opcoes_padrao)
+        if desconhecidas:
+            raise ValueError(f"Opções desconhecidas em {config_path}: {sorted(desconhecidas)}")
+        opcoes.update(do_arquivo)
+    for opcao, variavel in variaveis_ambiente.items():
+        if os.environ.get(variavel):
+            opcoes[opcao] = os.environ[variavel]
+
+    for opcao in opcoes_inteiras:
+        opcoes[opcao] = int(opcoes[opcao])
+    # prepare_threshold: "none"/vazio desativa os prepared statements (ex.: atrás do PgBouncer em modo transação)
+    limite = opcoes["prepare_threshold"]
+    opcoes["prepare_threshold"] = None if limite is None or str(limite).lower() in ("", "none") else int(limite)
+    return opcoes
+
+
+def montar_url(opcoes):
+    # URL no formato SQLAlchemy para PostgreSQL com driver psycopg
+    if opcoes["url"]:
+        return opcoes["url"]
+    return (
+        f"postgresql+psycopg://{opcoes['usuario']}:{opcoes['senha']}"
+        f"@{opcoes['host']}:{opcoes['porta']}/{opcoes['banco']}"
+    )
+
+
+def criar_engine(opcoes=None):
+    # Constrói um Engine com as opções informadas (ou as efetivas). Nenhuma conexão é aberta aqui.
+    opcoes = opcoes or ler_configuracao()
+    connect_args = {"prepare_threshold": opcoes["prepare_threshold"]}
+    if opcoes["statement_timeout_ms"]:
+        connect_args["options"] = f"-c statement_timeout={opcoes['statement_timeout_ms']}"
+    # pre_ping descarta conexões caídas antes de entregá-las (ex.: banco reiniciado)
+    return create_engine(
+        montar_url(opcoes),
+        pool_size=opcoes["pool_size"],
+        max_overflow=opcoes["max_overflow"],
+        pool_recycle=opcoes["pool_recycle"],
+        pool_pre_ping=True,
+        connect_args=connect_args,
+    )
+
+
+def get_engine():
+    # Engine compartilhado do processo, criado na primeira chamada
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = criar_engine()
+    return _engine
+
+
+def Session():
+    # Sessão transacional ligada ao engine compartilhado (mesmo uso de um sessionmaker: with Session() as session)
+    return _fabrica_sessoes(bind=get_engine())
@@ -0,0 +1,134 @@
+# Objetivo: Transformar e carregar em uma única etapa (modo "fundido"), sem o CSV intermediário:
+#   - Cada bruto de data/raw é lido pelo parser_coretemp e o DataFrame vai direto ao COPY (load.carregar_dataframe)
+#   - Todos os arquivos entram em uma única transação; os brutos só são movidos para data/loaded_raw após o commit
+#   - Opcionalmente, o processado é arquivado em data/loaded_processed (gravado em temporário e publicado após o commit)
+# Evita formatar os dados em CSV no disco e convertê-los de volta (datas e decimais) logo em seguida.
+
+import os
+import time
+import pandas as pd
+import load
+import manifest
+import metricas
+import nucleos
+import parser_coretemp
+import pipeline
+import rollups
+
+
+def transformar_e_carregar(batch_size=load.batch_size_padrao, arquivar=False, formato_longo=False):
+    # Orquestra o modo fundido para todos os arquivos de data/raw.
+    # arquivar: também grava o processado (CSV) em data/loaded_processed, como no fluxo em duas etapas
+    # formato_longo: cria coretemp.core_data se ainda não existir (ver load.load_data_to_db)
+    print("\n--- Iniciando transformação e carga em uma etapa (sem CSV intermediário) ---")
+
+    files_to_process = [f for f in os.listdir(pipeline.raw_data_path) if f.endswith('.csv')]
+    if not files_to_process:
+        print("\nNenhum arquivo .csv encontrado na pasta 'data/raw'.")
+        return
+
+    print(f"Encontrados {len(files_to_process)} arquivos para processar.")
+
+    manifesto = manifest.carregar_manifesto()
+    inicio = time.perf_counter()
+    total_linhas = 0
+
+    a_mover = []       # (origem, destino) dos brutos, movidos somente após o commit
+    a_publicar = []    # (temporário, destino) dos processados arquivados, publicados somente após o commit
+    registros = []     # (arquivo, campos) a gravar no manifesto após o commit
+    intervalos_carga = []  # intervalo de 'time' inserido por arquivo (rollups e tabela por núcleo)
+    vistos = {}        # hash -> nome dos brutos desta carga (cópias com outro nome são apenas movidas)
+
+    with load.Session() as session:
+        try:
+            load.preparar_esquema(session.connection())
+
+            for file_name in files_to_process:
+                source_file_path = os.path.join(pipeline.raw_data_path, file_name)
+                destination_file_path = os.path.join(pipeline.loaded_data_path, file_name)
+                print(f"\n--- Processando e Carregando: {file_name} ---")
+
+                try:
+                    hash_raw, desde = pipeline.verificar_manifesto(manifesto, file_name, source_file_path, vistos)
+                    if desde is False:
+                        print("Arquivo já processado anteriormente (mesmo conteúdo). Será apenas movido.")
+                        a_mover.append((source_file_path, destination_file_path))
+                        continue
+                    if desde:
+                        print(f"Arquivo já conhecido; carregando apenas linhas após {desde}.")
+
+                    # Transformação em memória (etapas registradas em metricas com o nome do arquivo)
+                    with metricas.contexto(arquivo=file_name):
+                        dados, linhas_iniciais = parser_coretemp.ler_log(source_file_path)
+                        if desde:
+                            dados = dados[dados["time"] > pd.Timestamp(desde)]
+
+                        # Carga direta do DataFrame (COPY a partir de um buffer em memória)
+                        num_rows, time_min, time_max = load.carregar_dataframe(session, dados, batch_size=batch_size)
+                    print(f"Linhas: {linhas_iniciais} lidas, {num_rows} adicionadas à transação.")
+
+                    # Arquivo opcional do processado, ainda com nome temporário
+                    if arquivar:
+                        destino_processado = os.path.join(load.data_loaded_processed_path, file_name)
+                        caminho_temp = destino_processado + ".tmp"
+                        dados.to_csv(caminho_temp, index=False)
+                        a_publicar.append((caminho_temp, destino_processado))
+
+                    a_mover.append((source_file_path, destination_file_path))
+                    entrada = manifesto.get(file_name, {})
+                    registros.append((file_name, {
+                        "hash_raw": hash_raw,
+                        "linhas": len(dados),
+                        "time_min": entrada.get("time_min") or time_min,
+                        "time_max": time_max,
+                        "status": manifest.STATUS_CARREGADO,
+                        "ultimo_time_carregado": manifest.maior_time(desde, time_max),
+                        "linhas_carregadas": entrada.get("linhas_carregadas", 0) + num_rows,
+                    }))
+                    if num_rows:
+                        intervalos_carga.append((time_min, time_max))
+                    total_linhas += num_rows
+
+                except Exception as e:
+                    print(f"!!! ERRO ao processar o arquivo {file_name}: {e}")
+                    print("!!! Este arquivo causou uma falha. Toda a transação será revertida.")
+                    raise
+
+            # Índice, tabela por núcleo e rollups na mesma transação dos dados
+            load.preparar_esquema(session.connection())
+            if intervalos_carga:
+                with metricas.etapa("derivados", linhas=total_linhas):
+                    nucleos.manter_nucleos(session.connection(), intervalos_carga, criar=formato_longo)
+                    rollups.manter_rollups(session.connection(), intervalos_carga)
+
+            with metricas.etapa("commit", linhas=total_linhas):
+                session.commit()
+            print("\n--- Todos os dados foram carregados com sucesso no banco de dados! ---")
+
+        except Exception as e:
+            session.rollback()
+            # Nenhum arquivo é movido e os processados temporários são descartados
+            for caminho_temp, _ in a_publicar:
+                if os.path.exists(caminho_temp):
+                    os.remove(caminho_temp)
+            print(f"\n!!! ERRO FATAL no processo de carregamento: {e}")
+            print("!!! O processo foi abortado. Todas as alterações no banco de dados foram revertidas.")
+            print("!!! Nenhum arquivo foi movido.")
+            return
+
+    # Após o commit: manifesto, aviso ao dashboard e arquivamento
+    for nome_arquivo, campos in registros:
+        manifest.registrar(manifesto, nome_arquivo, **campos)
+    manifest.salvar_manifesto(manifesto)
+    manifest.marcar_atualizacao()
+
+    for caminho_temp, destino in a_publicar:
+        # Nome definitivo (com sufixo de data/hora se já houver um homônimo arquivado)
+        destino = manifest.mover(caminho_temp, destino)
+        print(f"Processado arquivado em: {destino}")
+    for origem, destino in a_mover:
+        destino = manifest.mover(origem, destino)
+        print(f"Arquivo original '{os.path.basename(origem)}' movido para: {destino}")
+
+    pipeline.resumo_vazao(len(registros), total_linhas, inicio)
+    print("\n--- Processo finalizado! ---")
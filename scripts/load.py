@@ -1,30 +1,23 @@
 # Objetivo: Carregar arquivos CSV da pasta data/processed para uma tabela no PostgreSQL, de forma transacional.
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import text
 import pandas as pd
 import os
-import shutil
+import time
+import db
+import manifest
+import metricas
+import rollups
+import particoes
+import nucleos
 
+# Conexão: engine e sessões da camada compartilhada (db.py), criados apenas no primeiro uso
+get_engine = db.get_engine
+Session = db.Session
 
-def get_engine():
-    # Configuração de conexão com o banco (ajuste conforme o ambiente)
-    user = "postgres"
-    password = "postgres"
-    host = "localhost"
-    port = 5432
-    db = "pessoal"
-
-    # URL no formato SQLAlchemy para PostgreSQL com driver psycopg
-    url = f"postgresql+psycopg://{user}:{password}@{host}:{port}/{db}"
-
-    return create_engine(url)
-
-# Recursos globais de conexão e configuração
-engine = get_engine()
+# Tabela de destino
 schema = "coretemp"
 nome_tabela = "raw_data"
-Session = sessionmaker(bind=engine)
 
 # Pastas de trabalho
 data_processed_path = "data/processed"  # origem dos CSVs prontos para carga
@@ -33,13 +26,170 @@ data_loaded_processed_path = "data/loaded_processed"  # destino pós-sucesso
 # Garante que a pasta de destino exista
 os.makedirs(data_loaded_processed_path, exist_ok=True)
 
+# Índice em 'time' que atende os filtros por intervalo do dashboard (btree: mais preciso; brin: bem menor)
+tipos_indice = ("btree", "brin")
+tipo_indice_padrao = "btree"
+
+# Modos de carga suportados e tamanho padrão do lote (linhas por escrita no COPY)
+modos_carga = ("copy", "to_sql")
+batch_size_padrao = 50000
+
+
+def preparar_esquema(conn, tipo_indice=tipo_indice_padrao):
+    # Cria o esquema e, se a tabela bruta já existir, o índice em 'time' (idempotente).
+    # Não cria um segundo índice se já houver um dos dois tipos.
+    if tipo_indice not in tipos_indice:
+        raise ValueError(f"Tipo de índice inválido: {tipo_indice}. Use um de {tipos_indice}.")
+
+    conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+
+    tabela_existe = conn.execute(text(f"SELECT to_regclass('{schema}.{nome_tabela}') IS NOT NULL")).scalar()
+    if not tabela_existe:
+        return
+
+    indice_existe = conn.execute(text("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_indexes
+            WHERE schemaname = :schema AND tablename = :tabela
+              AND indexname IN (:btree, :brin)
+        )
+    """), {
+        "schema": schema, "tabela": nome_tabela,
+        "btree": f"{nome_tabela}_time_idx", "brin": f"{nome_tabela}_time_brin",
+    }).scalar()
+    if indice_existe:
+        return
+
+    if tipo_indice == "brin":
+        conn.execute(text(f"CREATE INDEX {nome_tabela}_time_brin ON {schema}.{nome_tabela} USING BRIN (time)"))
+    else:
+        conn.execute(text(f"CREATE INDEX {nome_tabela}_time_idx ON {schema}.{nome_tabela} (time)"))
+    print(f"Índice {tipo_indice} criado em {schema}.{nome_tabela}(time).")
+
+
+def garantir_tabela(session, file_path=None, amostra=None):
+    # Cria a tabela alvo (se ainda não existir), já particionada por mês, com as colunas do CSV/DataFrame.
+    # Se ela já existir, acrescenta as colunas que o arquivo traz e a tabela ainda não tem
+    # (ex.: log de uma máquina com mais núcleos). Arquivos com menos colunas não exigem ajuste:
+    # a carga informa a lista de colunas e as ausentes ficam NULL.
+    conn = session.connection()
+    if amostra is None:
+        amostra = pd.read_csv(file_path, parse_dates=['time'], nrows=1000)  # type: ignore
+    if not particoes.tabela_existe(conn):
+        particoes.criar_tabela_particionada(conn, amostra.head(0))
+        return
+    particoes.garantir_colunas(conn, amostra.head(0))
+
+
+def intervalo_time_csv(file_path, desde=None):
+    # Menor e maior 'time' (texto) de um CSV processado, lendo apenas o primeiro campo de cada linha.
+    # Usado para criar as partições antes do COPY.
+    time_min = None
+    time_max = None
+    with open(file_path, "r", encoding="utf-8") as arquivo:
+        arquivo.readline()  # cabeçalho
+        for linha in arquivo:
+            if not linha.strip():
+                continue
+            valor_time = linha.split(",", 1)[0]
+            if desde is not None and valor_time <= desde:
+                continue
+            time_min = valor_time if time_min is None else min(time_min, valor_time)
+            time_max = valor_time if time_max is None else max(time_max, valor_time)
+    return time_min, time_max
 
-def load_data_to_db():
+
+def copiar_arquivo(session, file_path, batch_size=batch_size_padrao, desde=None):
+    # Envia um CSV processado ao PostgreSQL via COPY ... FROM STDIN, dentro da transação da sessão.
+    # O arquivo é lido linha a linha e enviado em lotes de 'batch_size' linhas (memória constante).
+    # desde: checkpoint (texto ISO); linhas com 'time' menor ou igual são descartadas.
+    # Como 'time' é a primeira coluna no formato "YYYY-MM-DD HH:MM:SS", a comparação é feita no próprio texto.
+    # Retorna (linhas enviadas, menor 'time', maior 'time').
+    garantir_tabela(session, file_path)
+
+    # Partições mensais que cobrem as linhas deste arquivo
+    particoes.garantir_particoes(session.connection(), *intervalo_time_csv(file_path, desde))
+
+    # Conexão psycopg "crua" por trás da sessão (mesma transação do SQLAlchemy)
+    conn = session.connection().connection.driver_connection
+
+    num_rows = 0
+    time_min = None
+    time_max = None
+    with open(file_path, "r", encoding="utf-8") as arquivo:
+        # A primeira linha do CSV processado traz os nomes das colunas da tabela
+        colunas = [c.strip() for c in arquivo.readline().split(",")]
+        lista_colunas = ", ".join(f'"{c}"' for c in colunas)
+        comando = f"COPY {schema}.{nome_tabela} ({lista_colunas}) FROM STDIN WITH (FORMAT csv)"
+
+        with conn.cursor() as cur:
+            with cur.copy(comando) as copy:
+                lote = []
+                for linha in arquivo:
+                    # Ignora linhas em branco (ex.: quebra de linha final)
+                    if not linha.strip():
+                        continue
+                    valor_time = linha.split(",", 1)[0]
+                    if desde is not None and valor_time <= desde:
+                        continue
+                    time_min = valor_time if time_min is None else min(time_min, valor_time)
+                    time_max = valor_time if time_max is None else max(time_max, valor_time)
+                    lote.append(linha)
+                    if len(lote) >= batch_size:
+                        copy.write("".join(lote))
+                        num_rows += len(lote)
+                        lote = []
+                # Envia o restante do último lote
+                if lote:
+                    copy.write("".join(lote))
+                    num_rows += len(lote)
+
+    return num_rows, time_min, time_max
+
+
+def carregar_dataframe(session, dados, batch_size=batch_size_padrao):
+    # Envia um DataFrame já processado ao PostgreSQL via COPY ... FROM STDIN, dentro da transação da sessão,
+    # sem passar por um CSV em disco: cada lote de 'batch_size' linhas é formatado em memória.
+    # Retorna (linhas enviadas, menor 'time', maior 'time'), com os tempos em texto ISO (como no manifesto).
+    if dados.empty:
+        return 0, None, None
+    time_min = str(dados["time"].min())
+    time_max = str(dados["time"].max())
+
+    # Tabela/colunas e partições mensais que cobrem estas linhas
+    garantir_tabela(session, amostra=dados)
+    particoes.garantir_particoes(session.connection(), time_min, time_max)
+
+    conn = session.connection().connection.driver_connection
+    lista_colunas = ", ".join(f'"{c}"' for c in dados.columns)
+    comando = f"COPY {schema}.{nome_tabela} ({lista_colunas}) FROM STDIN WITH (FORMAT csv)"
+    with metricas.etapa("insercao", linhas=len(dados), modo="copy") as medida:
+        with conn.cursor() as cur:
+            with cur.copy(comando) as copy:
+                for inicio in range(0, len(dados), batch_size):
+                    lote = dados.iloc[inicio:inicio + batch_size].to_csv(
+                        index=False, header=False, date_format="%Y-%m-%d %H:%M:%S"
+                    )
+                    copy.write(lote)
+                    medida["bytes"] += len(lote)
+
+    return len(dados), time_min, time_max
+
+
+def load_data_to_db(modo="copy", batch_size=batch_size_padrao, formato_longo=False):
     # Carrega todos os CSVs de data/processed para o PostgreSQL de forma transacional. 
     # Em caso de sucesso, move cada arquivo para data/loaded_processed.
     # Em caso de erro em qualquer arquivo, faz rollback e não move nenhum arquivo.
+    # modo: "copy" (COPY ... FROM STDIN em lotes de batch_size linhas) ou "to_sql" (INSERTs via pandas)
+    # formato_longo: cria coretemp.core_data (uma linha por núcleo) se ela ainda não existir;
+    # se já existir, ela é sempre mantida em dia, com ou sem esta opção.
+
+    if modo not in modos_carga:
+        raise ValueError(f"Modo de carga inválido: {modo}. Use um de {modos_carga}.")
+    if batch_size < 1:
+        raise ValueError(f"Tamanho de lote inválido: {batch_size}. Use um inteiro maior que zero.")
 
-    print("\n--- Iniciando o processo de carregamento de dados para o PostgreSQL... ---")
+    print(f"\n--- Iniciando o processo de carregamento de dados para o PostgreSQL (modo: {modo})... ---")
 
     # Coleta apenas arquivos .csv na pasta de processados
     files_to_load = [f for f in os.listdir(data_processed_path) if f.endswith('.csv')]
@@ -54,10 +204,18 @@ def load_data_to_db():
     # Contador agregado de linhas carregadas.
     total_rows_processed = 0
 
+    # Manifesto: arquivos já carregados são ignorados e o checkpoint evita linhas duplicadas
+    manifesto = manifest.carregar_manifesto()
+
     # Abre uma sessão transacional
     with Session() as session:
         successfully_processed_file_paths = []  # manterá (origem, destino) para mover após commit
+        registros_manifesto = []  # (arquivo, campos) a gravar no manifesto após commit
+        intervalos_carga = []  # intervalo de 'time' inserido por arquivo nesta carga (para atualizar os rollups)
         try:
+            # Esquema (e índice em 'time', se a tabela já existir) antes de inserir
+            preparar_esquema(session.connection())
+
             # Itera sobre cada arquivo a ser carregado
             for file_name in files_to_load:
                 file_path = os.path.join(data_processed_path, file_name)  # caminho completo de origem
@@ -65,28 +223,78 @@ def load_data_to_db():
                 print(f"\n--- Processando e Carregando: {file_name} ---")
 
                 try:
-                    # Lê o CSV; 'parse_dates' converte a coluna 'time' para datetime
-                    dados = pd.read_csv(file_path, parse_dates=['time'])  # type: ignore
-
-                    # Número de linhas do arquivo atual
-                    num_rows = len(dados)
-
-                    # Insere em modo append na tabela alvo dentro da transação da sessão
-                    dados.to_sql(
-                        nome_tabela,
-                        session.connection(),
-                        schema=schema,
-                        if_exists='append',
-                        index=False
-                    )
+                    inicio = time.perf_counter()
+
+                    # Mesmo conteúdo já carregado: nada a inserir, apenas arquiva o arquivo repetido
+                    hash_processado = manifest.hash_arquivo(file_path)
+                    entrada = manifesto.get(file_name, {})
+                    if entrada.get("status") == manifest.STATUS_CARREGADO and entrada.get("hash_processado") == hash_processado:
+                        print("Arquivo já carregado anteriormente (mesmo conteúdo). Será apenas movido.")
+                        successfully_processed_file_paths.append((file_path, destination_file_path))
+                        continue
+
+                    # Checkpoint: apenas linhas posteriores ao último 'time' já carregado deste arquivo
+                    desde = entrada.get("ultimo_time_carregado")
+                    if desde:
+                        print(f"Checkpoint encontrado: carregando apenas linhas após {desde}.")
+
+                    # Inserção do arquivo na transação (tempo, linhas e bytes registrados em metricas)
+                    with metricas.contexto(arquivo=file_name):
+                        if modo == "copy":
+                            # Envia o arquivo em lotes via COPY, sem materializar o DataFrame inteiro
+                            # (a leitura do arquivo é intercalada com o envio e faz parte da inserção)
+                            with metricas.etapa("insercao", tamanho_bytes=os.path.getsize(file_path), modo=modo) as medida:
+                                num_rows, time_min, time_max = copiar_arquivo(session, file_path, batch_size=batch_size, desde=desde)
+                                medida["linhas"] = num_rows
+                        else:
+                            # Lê o CSV antes da inserção, em uma etapa própria (tempo e bytes da leitura não entram
+                            # na inserção); 'parse_dates' converte a coluna 'time' para datetime
+                            with metricas.etapa("leitura", tamanho_bytes=os.path.getsize(file_path)) as leitura:
+                                dados = pd.read_csv(file_path, parse_dates=['time'])  # type: ignore
+                                leitura["linhas"] = len(dados)
+                            if desde:
+                                dados = dados[dados["time"] > pd.Timestamp(desde)]
+
+                            # Número de linhas do arquivo atual
+                            num_rows = len(dados)
+                            time_min = str(dados["time"].min()) if num_rows else None
+                            time_max = str(dados["time"].max()) if num_rows else None
+
+                            with metricas.etapa("insercao", linhas=num_rows, modo=modo):
+                                # Tabela (particionada) e partições mensais necessárias para estas linhas
+                                garantir_tabela(session, amostra=dados)
+                                particoes.garantir_particoes(session.connection(), time_min, time_max)
+
+                                # Insere em modo append na tabela alvo dentro da transação da sessão
+                                dados.to_sql(
+                                    nome_tabela,
+                                    session.connection(),
+                                    schema=schema,
+                                    if_exists='append',
+                                    index=False,
+                                    chunksize=batch_size
+                                )
+
+                    # Vazão da carga deste arquivo (linhas por segundo)
+                    duracao = time.perf_counter() - inicio
+                    vazao = num_rows / duracao if duracao > 0 else float("inf")
 
                     print(f"\nDados do arquivo '{file_name}' adicionados à transação do banco de dados.")
 
                     # Registra o par (origem, destino) para mover apenas se tudo der certo
                     successfully_processed_file_paths.append((file_path, destination_file_path))  # type: ignore
+                    registros_manifesto.append((file_name, {
+                        "hash_processado": hash_processado,
+                        "status": manifest.STATUS_CARREGADO,
+                        "ultimo_time_carregado": manifest.maior_time(desde, time_max),
+                        "linhas_carregadas": entrada.get("linhas_carregadas", 0) + num_rows,
+                        "time_min": entrada.get("time_min") or time_min,
+                    }))
+                    if num_rows:
+                        intervalos_carga.append((time_min, time_max))
                     # Atualiza contadores e logs
                     total_rows_processed += num_rows
-                    print(f"Total de linhas processadas deste arquivo: {num_rows}")
+                    print(f"Total de linhas processadas deste arquivo: {num_rows} ({duracao:.2f}s, {vazao:,.0f} linhas/s)")
                     print(f"Total de linhas processadas até agora: {total_rows_processed}")
 
                 except Exception as e:
@@ -95,13 +303,30 @@ def load_data_to_db():
                     print("!!! Este arquivo causou uma falha. Toda a transação será revertida.")
                     raise  # propaga para o bloco externo fazer rollback
 
+            # Garante o índice também quando a tabela acabou de ser criada por esta carga
+            preparar_esquema(session.connection())
+
+            # Atualiza os rollups (e a tabela por núcleo) dos dias afetados na mesma transação
+            # (dados e derivados confirmados juntos)
+            if intervalos_carga:
+                with metricas.etapa("derivados", linhas=total_rows_processed):
+                    nucleos.manter_nucleos(session.connection(), intervalos_carga, criar=formato_longo)
+                    rollups.manter_rollups(session.connection(), intervalos_carga)
+
             # Caso toda a iteração tenha sido bem-sucedida, confirma a transação
-            session.commit()
+            with metricas.etapa("commit", linhas=total_rows_processed):
+                session.commit()
             print("\n--- Todos os dados foram carregados com sucesso no banco de dados! ---")
 
+            # Registra no manifesto o que foi confirmado no banco
+            for nome_arquivo, campos in registros_manifesto:
+                manifest.registrar(manifesto, nome_arquivo, **campos)
+            manifest.salvar_manifesto(manifesto)
+            manifest.marcar_atualizacao()  # invalida o cache do dashboard
+
             # Move os arquivos SOMENTE após o commit bem-sucedido
             for original_path, dest_path in successfully_processed_file_paths:  # type: ignore
-                shutil.move(original_path, dest_path)  # type: ignore
+                dest_path = manifest.mover(original_path, dest_path)  # type: ignore
                 print(f"Arquivo original '{os.path.basename(original_path)}' movido para: {dest_path}")  # type: ignore
 
         except Exception as e:
@@ -112,3 +337,45 @@ def load_data_to_db():
             print("!!! Nenhum arquivo foi movido para a pasta 'data/loaded_processed'.")
 
     print("\n--- Processo de carregamento finalizado! ---")
+
+
+def reconstruir_rollups():
+    # Recalcula (ou cria e popula) os rollups a partir de todo o histórico de coretemp.raw_data
+    print("\n--- Reconstruindo rollups... ---")
+    with Session() as session:
+        try:
+            rollups.criar_rollups(session.connection())
+            rollups.reconstruir_rollups(session.connection())
+            session.commit()
+            manifest.marcar_atualizacao()
+            print("--- Rollups reconstruídos com sucesso! ---")
+        except Exception as e:
+            session.rollback()
+            print(f"!!! ERRO ao reconstruir os rollups: {e}")
+
+
+def configurar_esquema(tipo_indice=tipo_indice_padrao):
+    # Passo avulso de configuração: esquema e índice em 'time' da tabela bruta
+    print(f"\n--- Preparando o esquema {schema} (índice {tipo_indice})... ---")
+    with Session() as session:
+        try:
+            preparar_esquema(session.connection(), tipo_indice)
+            session.commit()
+            print("--- Esquema preparado com sucesso! ---")
+        except Exception as e:
+            session.rollback()
+            print(f"!!! ERRO ao preparar o esquema: {e}")
+
+
+def particionar_tabela():
+    # Passo avulso: converte uma coretemp.raw_data antiga (não particionada) para partições mensais
+    print(f"\n--- Migrando {schema}.{nome_tabela} para partições mensais... ---")
+    with Session() as session:
+        try:
+            if particoes.migrar_para_particionado(session.connection()):
+                preparar_esquema(session.connection())
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"!!! ERRO ao migrar a tabela: {e}")
+            print("!!! Nenhuma alteração foi aplicada.")
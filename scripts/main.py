@@ -4,12 +4,17 @@
 #   3) Carregar os dados no banco
 
 import os 
+import argparse
 import pipeline as pipeline
 import load as load
+import daemon
+import fundido
+import metricas
+import arquivo_binario
 
 print("---Iniciando aplicação ---")
 
-def files():
+def files(args):
     # Garante que as pastas usadas pelo processo existam
     files = ["data/loaded_processed", "data/loaded_raw", "data/processed", "data/raw"]
     for arquivos in files:
@@ -18,19 +23,95 @@ def files():
             print(f'Pasta {arquivos} criada com sucesso!')
         else:
             print(f'Pasta {arquivos} OK!')
-    main()  # chama o fluxo principal após preparar as pastas
+    main(args)  # chama o fluxo principal após preparar as pastas
 
 
-def main():
+def main(args):
     # Executa o pipeline e, na sequência, a carga para o banco com confirmações via Enter
     print('\n--- Executando pipeline ---')
     input("\nPressione Enter para iniciar o processo de ETL.")  # pausa antes do pipeline
-    pipeline.pipeline()  # executa o pipeline de ETL
+
+    # Modo fundido: transformação e carga em uma etapa, sem o CSV intermediário em data/processed
+    if args.fundido:
+        fundido.transformar_e_carregar(batch_size=args.batch_size, arquivar=args.arquivar_processado,
+                                       formato_longo=args.formato_longo)
+        input("\nPressione Enter para sair...")
+        return
+
+    # executa o pipeline de ETL
+    pipeline.pipeline(workers=args.workers, chunksize=args.chunksize, formato=args.formato, arquivo=args.arquivo_binario)
+
+    # No formato Parquet o dashboard lê os arquivos diretamente; não há carga no banco
+    if args.formato == "parquet":
+        input("\nDados gravados em data/parquet. Pressione Enter para sair...")
+        return
 
     input("\nPressione Enter para subir os arquivos para o banco de dados.")  # pausa antes da carga
-    load.load_data_to_db()  # realiza a carga para o banco
+    load.load_data_to_db(modo=args.modo_carga, batch_size=args.batch_size, formato_longo=args.formato_longo)  # realiza a carga para o banco
 
     input("\nPressione Enter para sair...")  # pausa final antes de encerrar
 
+
+def inteiro_positivo(valor):
+    # Tipo do argparse para opções que exigem um inteiro >= 1 (ex.: --batch-size)
+    numero = int(valor)
+    if numero < 1:
+        raise argparse.ArgumentTypeError(f"deve ser um inteiro maior que zero (recebido: {valor})")
+    return numero
+
+
+def parse_args():
+    # Opções de linha de comando (todas opcionais; os padrões reproduzem o fluxo usual)
+    parser = argparse.ArgumentParser(description="Pipeline ETL dos logs do Core Temp.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Número de processos usados na transformação (1 = sequencial).")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Lê e grava cada arquivo bruto em blocos dessas linhas (para logs muito grandes).")
+    parser.add_argument("--formato", choices=pipeline.formatos_saida, default="csv",
+                        help="Saída do processado: CSV para carga no banco (padrão) ou Parquet particionado por data.")
+    parser.add_argument("--arquivo-binario", nargs="?", const=arquivo_binario.caminho_padrao, default=None,
+                        help="Também acrescenta as linhas limpas ao arquivo binário de telemetria "
+                             f"(padrão: {arquivo_binario.caminho_padrao}; ver scripts/arquivo_binario.py).")
+    parser.add_argument("--modo-carga", choices=load.modos_carga, default="copy",
+                        help="Forma de inserir no PostgreSQL: COPY em lotes (padrão) ou DataFrame.to_sql.")
+    parser.add_argument("--batch-size", type=inteiro_positivo, default=load.batch_size_padrao,
+                        help="Linhas enviadas por lote durante a carga.")
+    parser.add_argument("--fundido", action="store_true",
+                        help="Transforma e carrega em uma etapa, passando o DataFrame direto ao COPY (sem data/processed).")
+    parser.add_argument("--arquivar-processado", action="store_true",
+                        help="No modo --fundido, também grava o processado em data/loaded_processed após o commit.")
+    parser.add_argument("--formato-longo", action="store_true",
+                        help="Cria e mantém coretemp.core_data (uma linha por núcleo) para as consultas por núcleo.")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Ingestão contínua: observa data/raw e carrega as linhas novas em micro-lotes (sem pausas).")
+    parser.add_argument("--intervalo", type=float, default=daemon.intervalo_padrao,
+                        help="No modo --daemon, segundos entre verificações da pasta.")
+    parser.add_argument("--preparar-esquema", choices=load.tipos_indice, nargs="?", const=load.tipo_indice_padrao,
+                        help="Apenas cria o esquema e o índice em time (btree ou brin) e encerra.")
+    parser.add_argument("--particionar", action="store_true",
+                        help="Apenas migra coretemp.raw_data (não particionada) para partições mensais e encerra.")
+    parser.add_argument("--reconstruir-rollups", action="store_true",
+                        help="Apenas recalcula as tabelas de rollup a partir de todo o histórico e encerra.")
+    parser.add_argument("--metricas-prom", default=metricas.prom_path,
+                        help="Também grava os totais por etapa no formato do Prometheus neste arquivo "
+                             "(o log JSON das etapas fica em data/metricas/etapas.jsonl).")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    files()
+    args = parse_args()
+    metricas.prom_path = args.metricas_prom
+    if args.preparar_esquema:
+        # Manutenção: cria esquema e índice em time
+        load.configurar_esquema(args.preparar_esquema)
+    elif args.particionar:
+        # Manutenção: converte a tabela bruta antiga para partições mensais
+        load.particionar_tabela()
+    elif args.reconstruir_rollups:
+        # Manutenção: apenas recalcula os agregados do dashboard
+        load.reconstruir_rollups()
+    elif args.daemon:
+        # Execução contínua, sem as confirmações via Enter
+        daemon.executar(intervalo=args.intervalo, batch_size=args.batch_size)
+    else:
+        files(args)
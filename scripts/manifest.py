@@ -0,0 +1,87 @@
+# Objetivo: Manter o manifesto de ingestão (data/manifest.json), usado pelo pipeline e pela carga para:
+#   - Saber o que já foi processado/carregado (hash do conteúdo, linhas, intervalo de 'time', status)
+#   - Ignorar arquivos repetidos em novas execuções (mesmo conteúdo, com o mesmo nome ou com outro)
+#   - Guardar o checkpoint (último 'time') para acrescentar apenas linhas novas de logs que continuam crescendo
+
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+
+# Local do manifesto
+manifest_path = "data/manifest.json"
+
+# Marcador atualizado a cada nova gravação de dados (o dashboard invalida seu cache quando ele muda)
+marcador_carga_path = "data/ultima_carga.txt"
+
+# Status possíveis de um arquivo
+STATUS_PROCESSADO = "processado"  # bruto transformado; processado ainda não carregado no banco
+STATUS_CARREGADO = "carregado"    # processado confirmado (commit) no banco
+
+
+def carregar_manifesto():
+    # Lê o manifesto do disco; inexistente => manifesto vazio
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def salvar_manifesto(manifesto):
+    # Grava o manifesto de forma atômica (arquivo temporário + rename), evitando um JSON pela metade
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    caminho_temp = manifest_path + ".tmp"
+    with open(caminho_temp, "w", encoding="utf-8") as arquivo:
+        json.dump(manifesto, arquivo, indent=2, ensure_ascii=False)
+    os.replace(caminho_temp, manifest_path)
+
+
+def hash_arquivo(caminho, tamanho_bloco=1024 * 1024):
+    # SHA-256 do conteúdo do arquivo, lido em blocos
+    h = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def nome_com_hash(manifesto, campo, valor, exceto=None):
+    # Nome de outra entrada com o mesmo hash de conteúdo (ex.: o mesmo log copiado com outro nome), ou None.
+    # Só o conteúdo atual de cada entrada é conhecido: a cópia de uma versão anterior de um log que cresceu
+    # não é reconhecida.
+    for nome, entrada in manifesto.items():
+        if nome != exceto and entrada.get(campo) == valor:
+            return nome
+    return None
+
+
+def registrar(manifesto, nome_arquivo, **campos):
+    # Atualiza (ou cria) a entrada de um arquivo com os campos informados
+    entrada = manifesto.setdefault(nome_arquivo, {})
+    entrada.update(campos)
+    entrada["atualizado_em"] = datetime.now().isoformat(timespec="seconds")
+    return entrada
+
+
+def maior_time(*valores):
+    # Maior entre timestamps em texto ISO ("YYYY-MM-DD HH:MM:SS"), ignorando None
+    valores = [v for v in valores if v]
+    return max(valores) if valores else None
+
+
+def mover(origem, destino):
+    # Move o arquivo sem sobrescrever um homônimo já arquivado (ex.: log que cresceu e foi reprocessado):
+    # nesse caso o destino recebe um sufixo com data/hora.
+    if os.path.exists(destino):
+        base, extensao = os.path.splitext(destino)
+        destino = f"{base}.{datetime.now().strftime('%Y%m%d%H%M%S')}{extensao}"
+    shutil.move(origem, destino)
+    return destino
+
+
+def marcar_atualizacao():
+    # Registra que novos dados ficaram disponíveis para o dashboard
+    os.makedirs(os.path.dirname(marcador_carga_path), exist_ok=True)
+    with open(marcador_carga_path, "w", encoding="utf-8") as arquivo:
+        arquivo.write(datetime.now().isoformat(timespec="seconds"))
@@ -0,0 +1,169 @@
+# Objetivo: Instrumentação leve das etapas do ETL (leitura, conversão do horário, limpeza, gravação, carga, commit):
+#   - Cada etapa medida registra tempo de parede, linhas/s, bytes e o pico de memória (RSS) do processo
+#   - Registros em JSON, um por linha, em data/metricas/etapas.jsonl (CORETEMP_METRICAS_LOG)
+#   - Opcionalmente, totais por etapa no formato de texto do Prometheus (CORETEMP_METRICAS_PROM ou --metricas-prom)
+#   - CORETEMP_METRICAS=0 desliga a instrumentação
+#
+# Uso:
+#   with metricas.contexto(arquivo="log.csv"):          # campos repetidos em todos os registros internos
+#       with metricas.etapa("gravacao") as medida:
+#           dados.to_csv(...)
+#           medida["linhas"] = len(dados)
+
+import json
+import os
+import sys
+import threading
+import time
+import multiprocessing
+from contextlib import contextmanager
+from datetime import datetime
+
+# Pico de memória: resource (Linux/macOS) ou psutil (Windows, se instalado)
+try:
+    import resource
+except ImportError:
+    resource = None
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Configuração (variáveis de ambiente; o caminho do Prometheus também pode ser definido por main.py)
+HABILITADO = os.environ.get("CORETEMP_METRICAS", "1") != "0"
+log_path = os.environ.get("CORETEMP_METRICAS_LOG", "data/metricas/etapas.jsonl")
+prom_path = os.environ.get("CORETEMP_METRICAS_PROM") or None
+
+# Totais por etapa neste processo (para o arquivo do Prometheus) e campos de contexto por thread
+_totais = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def pico_rss():
+    # Pico de memória residente do processo até agora (bytes); None se não houver como medir
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa em KB; macOS, em bytes
+        return pico if sys.platform == "darwin" else pico * 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    return None
+
+
+@contextmanager
+def contexto(**campos):
+    # Campos acrescentados a todos os registros das etapas internas (ex.: arquivo, bloco)
+    anterior = getattr(_local, "campos", {})
+    _local.campos = {**anterior, **campos}
+    try:
+        yield
+    finally:
+        _local.campos = anterior
+
+
+@contextmanager
+def etapa(nome, linhas=0, tamanho_bytes=0, **campos):
+    # Mede o bloco 'with' como a etapa 'nome'. O dicionário entregue pode ser completado dentro do bloco
+    # (ex.: medida["linhas"] = len(dados), medida["bytes"] = tamanho). Uma exceção é registrada com status "erro"
+    # e propagada.
+    medida = {"linhas": linhas, "bytes": tamanho_bytes, **campos}
+    if not HABILITADO:
+        yield medida
+        return
+    inicio = time.perf_counter()
+    status = "ok"
+    try:
+        yield medida
+    except BaseException:
+        status = "erro"
+        raise
+    finally:
+        registrar(nome, time.perf_counter() - inicio, status, medida)
+
+
+def registrar(nome, segundos, status, medida):
+    # Grava o registro JSON da etapa e atualiza os totais (e o arquivo do Prometheus, se configurado)
+    linhas = int(medida.pop("linhas") or 0)
+    bytes_etapa = int(medida.pop("bytes") or 0)
+    rss = pico_rss()
+    registro = {
+        "instante": datetime.now().isoformat(timespec="milliseconds"),
+        "etapa": nome,
+        "status": status,
+        "segundos": round(segundos, 6),
+        "linhas": linhas,
+        "linhas_por_segundo": round(linhas / segundos, 1) if segundos > 0 and linhas else None,
+        "bytes": bytes_etapa,
+        "mb_por_segundo": round(bytes_etapa / 1024 ** 2 / segundos, 3) if segundos > 0 and bytes_etapa else None,
+        "pico_rss_mb": round(rss / 1024 ** 2, 1) if rss is not None else None,
+        "pid": os.getpid(),
+        **getattr(_local, "campos", {}),
+        **medida,
+    }
+
+    with _lock:
+        total = _totais.setdefault(nome, {"execucoes": 0, "erros": 0, "segundos": 0.0, "linhas": 0, "bytes": 0})
+        total["execucoes"] += 1
+        total["erros"] += status != "ok"
+        total["segundos"] += segundos
+        total["linhas"] += linhas
+        total["bytes"] += bytes_etapa
+        total["ultima"] = segundos
+
+        if log_path:
+            os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+            # Uma única escrita por linha (modo append), para não intercalar registros de processos paralelos
+            with open(log_path, "a", encoding="utf-8") as arquivo:
+                arquivo.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+
+        # Processos auxiliares (pipeline paralelo) só gravam o JSON: o arquivo do Prometheus é do processo principal
+        if prom_path and multiprocessing.parent_process() is None:
+            gravar_prometheus(prom_path, metricas_etapas(rss))
+
+
+def metricas_etapas(rss=None):
+    # Totais por etapa como métricas do Prometheus: lista de (nome, tipo, ajuda, [(rótulos, valor)])
+    def por_etapa(campo):
+        return [({"etapa": nome}, total[campo]) for nome, total in sorted(_totais.items())]
+
+    metricas = [
+        ("coretemp_etl_etapa_execucoes_total", "counter", "Execuções de cada etapa do ETL.", por_etapa("execucoes")),
+        ("coretemp_etl_etapa_erros_total", "counter", "Execuções de cada etapa que terminaram em erro.", por_etapa("erros")),
+        ("coretemp_etl_etapa_segundos_total", "counter", "Tempo de parede acumulado por etapa.", por_etapa("segundos")),
+        ("coretemp_etl_etapa_linhas_total", "counter", "Linhas tratadas por etapa.", por_etapa("linhas")),
+        ("coretemp_etl_etapa_bytes_total", "counter", "Bytes lidos ou gravados por etapa.", por_etapa("bytes")),
+        ("coretemp_etl_etapa_ultima_duracao_segundos", "gauge", "Duração da execução mais recente de cada etapa.",
+         por_etapa("ultima")),
+    ]
+    if rss is not None:
+        metricas.append(("coretemp_etl_pico_rss_bytes", "gauge", "Pico de memória residente do processo.", [({}, rss)]))
+    return metricas
+
+
+def formatar_rotulos(rotulos):
+    # {"etapa": "leitura"} -> '{etapa="leitura"}'
+    if not rotulos:
+        return ""
+    pares = ",".join(f'{chave}="{valor}"' for chave, valor in rotulos.items())
+    return "{" + pares + "}"
+
+
+def gravar_prometheus(caminho, metricas):
+    # Grava métricas no formato de texto do Prometheus (textfile collector do node_exporter), de forma atômica.
+    # metricas: lista de (nome, tipo, ajuda, valor) ou (nome, tipo, ajuda, [(rótulos, valor), ...])
+    linhas = []
+    for nome, tipo, ajuda, valores in metricas:
+        if not isinstance(valores, list):
+            valores = [({}, valores)]
+        linhas.append(f"# HELP {nome} {ajuda}")
+        linhas.append(f"# TYPE {nome} {tipo}")
+        for rotulos, valor in valores:
+            linhas.append(f"{nome}{formatar_rotulos(rotulos)} {valor}")
+
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    caminho_temp = caminho + ".tmp"
+    with open(caminho_temp, "w", encoding="utf-8") as arquivo:
+        arquivo.write("\n".join(linhas) + "\n")
+    os.replace(caminho_temp, caminho)
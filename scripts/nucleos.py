@@ -0,0 +1,113 @@
+# Objetivo: Manter a tabela opcional coretemp.core_data, com uma linha por (time, núcleo):
+#   time, core, temp, low, high, load, speed
+# Ela é derivada das colunas largas de coretemp.raw_data (core_temp_N, low_temp_N, ...), de modo que a análise
+# de qualquer núcleo (ou de todos) seja uma única consulta indexada, e não uma consulta por coluna.
+
+from sqlalchemy import text
+import re
+import pandas as pd
+import rollups
+
+schema = "coretemp"
+tabela = "core_data"
+tabela_origem = "raw_data"
+
+# Métricas por núcleo: coluna em core_data -> prefixo da coluna larga em raw_data (tipos compactos)
+metricas = {
+    "temp": ("core_temp", "SMALLINT"),
+    "low": ("low_temp", "SMALLINT"),
+    "high": ("high_temp", "SMALLINT"),
+    "load": ("core_load", "SMALLINT"),
+    "speed": ("core_speed", "REAL"),
+}
+
+padrao_nucleo = re.compile(r"^core_temp_(\d+)$")
+
+
+def tabela_existe(conn):
+    return conn.execute(text(f"SELECT to_regclass('{schema}.{tabela}') IS NOT NULL")).scalar()
+
+
+def criar_tabela(conn):
+    # Cria coretemp.core_data e seu índice (núcleo, time), que atende "um núcleo em um período"
+    colunas = ",\n        ".join(f"{nome} {tipo}" for nome, (_, tipo) in metricas.items())
+    conn.execute(text(f"""
+        CREATE TABLE {schema}.{tabela} (
+        time TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        core SMALLINT NOT NULL,
+        {colunas}
+        )
+    """))
+    conn.execute(text(f"CREATE INDEX {tabela}_core_time_idx ON {schema}.{tabela} (core, time)"))
+    conn.execute(text(f"CREATE INDEX {tabela}_time_idx ON {schema}.{tabela} (time)"))
+    print(f"Tabela {schema}.{tabela} criada.")
+
+
+def colunas_origem(conn):
+    # Nomes das colunas atuais de coretemp.raw_data
+    return set(conn.execute(text(f"""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = '{schema}' AND table_name = '{tabela_origem}'
+    """)).scalars())
+
+
+def sql_valores(colunas):
+    # Linhas do VALUES que transformam as colunas largas em uma linha por núcleo, ex.:
+    # (0, core_temp_0, low_temp_0, high_temp_0, core_load_0, core_speed_0), (1, core_temp_1, ...)
+    # Métricas ausentes na tabela bruta (ex.: sensor que não existe) viram NULL do tipo certo.
+    nucleos = sorted(int(m.group(1)) for m in map(padrao_nucleo.match, colunas) if m)
+    linhas = []
+    for nucleo in nucleos:
+        valores = [str(nucleo)]
+        for prefixo, tipo in metricas.values():
+            coluna = f"{prefixo}_{nucleo}"
+            valores.append(f'"{coluna}"' if coluna in colunas else f"NULL::{tipo}")
+        linhas.append(f"({', '.join(valores)})")
+    return ",\n            ".join(linhas)
+
+
+def atualizar_nucleos(conn, inicio, fim):
+    # Recalcula core_data para os dias afetados por uma carga (de 'inicio' a 'fim', inclusive), como nos rollups:
+    # os dias inteiros são refeitos a partir da tabela bruta, então a operação pode ser repetida sem duplicar.
+    valores = sql_valores(colunas_origem(conn))
+    if not valores:
+        return
+    params = {
+        "inicio": pd.Timestamp(inicio).normalize().to_pydatetime(),
+        "fim": (pd.Timestamp(fim).normalize() + pd.Timedelta(days=1)).to_pydatetime(),
+    }
+    nomes = ", ".join(metricas)
+    conn.execute(text(f"DELETE FROM {schema}.{tabela} WHERE time >= :inicio AND time < :fim"), params)
+    conn.execute(text(f"""
+        INSERT INTO {schema}.{tabela} (time, core, {nomes})
+        SELECT r.time, v.core, {", ".join(f"v.{nome}" for nome in metricas)}
+        FROM {schema}.{tabela_origem} r
+        CROSS JOIN LATERAL (VALUES
+            {valores}
+        ) AS v(core, {nomes})
+        WHERE r.time >= :inicio AND r.time < :fim AND v.temp IS NOT NULL
+    """), params)
+
+
+def reconstruir_nucleos(conn):
+    # Recalcula core_data para todo o histórico da tabela bruta
+    inicio, fim = conn.execute(text(f"SELECT MIN(time), MAX(time) FROM {schema}.{tabela_origem}")).one()
+    if inicio is None:
+        return
+    atualizar_nucleos(conn, inicio, fim)
+
+
+def manter_nucleos(conn, intervalos, criar=False):
+    # Chamado pela carga, na mesma transação dos dados (intervalos (inicio, fim) de 'time' carregados, um por
+    # arquivo). A tabela é opcional:
+    #   - já existe => atualiza apenas os dias carregados (mesmos períodos dos rollups)
+    #   - não existe e criar=True => cria e popula com todo o histórico
+    #   - não existe e criar=False => nada a fazer
+    if tabela_existe(conn):
+        for inicio, fim in rollups.periodos_afetados(intervalos):
+            atualizar_nucleos(conn, inicio, fim)
+            print(f"Dados por núcleo atualizados para o período de {inicio:%Y-%m-%d} a {fim:%Y-%m-%d}.")
+    elif criar:
+        criar_tabela(conn)
+        print(f"Calculando {schema}.{tabela} para todo o histórico.")
+        reconstruir_nucleos(conn)
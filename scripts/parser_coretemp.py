@@ -0,0 +1,242 @@
+# Objetivo: Ler logs brutos do Core Temp de forma direta, sem a sequência genérica read_csv -> drop -> dropna:
+#   - Localiza a linha de cabeçalho ("Time,...") em vez de pular um número fixo de linhas
+#   - Reconhece as colunas úteis pelo cabeçalho, para qualquer número de núcleos
+#   - Converte o horário ("HH:MM:SS mm/dd/yy", largura fixa) de forma vetorizada, direto dos bytes do arquivo
+#   - Lê apenas as colunas úteis, já com os tipos finais (inteiros para temperatura/carga)
+
+import io
+import re
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+import metricas
+
+# Reconhece, em uma única expressão, as colunas úteis do cabeçalho do Core Temp para qualquer número de núcleos:
+#   "Time", "Core N Temp. (°)", "Low temp. (°)[.N]", "High temp. (°)[.N]", "Core load (%)[.N]",
+#   "Core speed (MHz)[.N]" e "CPU N Power". O sufixo ".N" é o que o pandas acrescenta a nomes repetidos,
+#   e corresponde ao núcleo N (sem sufixo => núcleo 0). Demais colunas ("Core X", "Unnamed*") são ignoradas.
+padrao_colunas = re.compile(
+    r"^(?:"
+    r"(?P<time>Time)"
+    r"|Core (?P<nucleo>\d+) Temp\. \(°[CF]?\)"
+    r"|(?P<grupo>Low temp\.|High temp\.|Core load|Core speed) \((?:°[CF]?|%|MHz)\)(?:\.(?P<sufixo>\d+))?"
+    r"|CPU (?P<cpu>\d+) Power"
+    r")$"
+)
+
+# Prefixo snake_case de cada grupo de colunas por núcleo
+prefixos_grupo = {
+    "Low temp.": "low_temp",
+    "High temp.": "high_temp",
+    "Core load": "core_load",
+    "Core speed": "core_speed",
+}
+
+# Ordem das métricas de cada núcleo no processado
+ordem_metricas = ["core_temp", "low_temp", "high_temp", "core_load", "core_speed"]
+
+
+@lru_cache(maxsize=32)
+def mapear_colunas(colunas):
+    # Monta, a partir do cabeçalho (tupla de nomes), o mapa {nome original: nome snake_case}
+    # na ordem de saída: time, métricas de cada núcleo (0..N) e energia.
+    # Exemplo: "Core speed (MHz).3" -> "core_speed_3"; "CPU 0 Power" -> "cpu_power".
+    por_nucleo = {}
+    energia = {}
+    tempo = None
+    for coluna in colunas:
+        encontrado = padrao_colunas.match(coluna)
+        if not encontrado:
+            continue
+        if encontrado.group("time"):
+            tempo = coluna
+        elif encontrado.group("nucleo") is not None:
+            por_nucleo.setdefault(int(encontrado.group("nucleo")), {})["core_temp"] = coluna
+        elif encontrado.group("grupo"):
+            nucleo = int(encontrado.group("sufixo") or 0)
+            por_nucleo.setdefault(nucleo, {})[prefixos_grupo[encontrado.group("grupo")]] = coluna
+        else:
+            cpu = int(encontrado.group("cpu"))
+            energia[cpu] = coluna
+
+    # Sem 'Time' ou sem a temperatura do núcleo 0 não há o que aproveitar do arquivo
+    if tempo is None or "core_temp" not in por_nucleo.get(0, {}):
+        raise ValueError(
+            "Cabeçalho não reconhecido como log do Core Temp (colunas 'Time' e 'Core 0 Temp. (°)' são obrigatórias)."
+        )
+
+    mapa = {tempo: "time"}
+    for nucleo in sorted(por_nucleo):
+        for metrica in ordem_metricas:
+            if metrica in por_nucleo[nucleo]:
+                mapa[por_nucleo[nucleo][metrica]] = f"{metrica}_{nucleo}"
+    for cpu in sorted(energia):
+        mapa[energia[cpu]] = "cpu_power" if cpu == 0 else f"cpu_power_{cpu}"
+    return mapa
+
+
+# Prefixos das métricas inteiras no log do Core Temp (as demais, velocidade e energia, são decimais)
+prefixos_inteiros = ("core_temp_", "low_temp_", "high_temp_", "core_load_")
+
+# Largura do horário no início de cada linha de dados ("HH:MM:SS mm/dd/yy") e o separador que vem depois
+largura_time = 17
+
+# Posições dos dígitos e dos separadores no horário
+posicoes_digitos = np.array([0, 1, 3, 4, 6, 7, 9, 10, 12, 13, 15, 16])
+separadores = {2: b":", 5: b":", 8: b" ", 11: b"/", 14: b"/", 17: b","}
+
+# Dias de cada mês em ano não bissexto (índice = mês)
+dias_por_mes = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+def localizar_cabecalho(conteudo):
+    # Posição (em bytes) do início da linha de cabeçalho, a primeira que começa com "Time,"
+    if conteudo.startswith(b"Time,"):
+        return 0
+    posicao = conteudo.find(b"\nTime,")
+    if posicao < 0:
+        raise ValueError("Linha de cabeçalho ('Time,...') não encontrada no log do Core Temp.")
+    return posicao + 1
+
+
+def linha_cabecalho(file_path, limite=1024 * 1024):
+    # Número da linha (0 = primeira) do cabeçalho, lendo apenas o início do arquivo.
+    # Usado como skiprows na leitura em blocos.
+    with open(file_path, "rb") as arquivo:
+        inicio = arquivo.read(limite)
+    return inicio.count(b"\n", 0, localizar_cabecalho(inicio))
+
+
+def nomes_unicos(nomes):
+    # Mesmo tratamento do pandas para nomes repetidos: a 2ª ocorrência vira "nome.1", a 3ª "nome.2"...
+    vistos = {}
+    unicos = []
+    for nome in nomes:
+        if nome in vistos:
+            vistos[nome] += 1
+            unicos.append(f"{nome}.{vistos[nome]}")
+        else:
+            vistos[nome] = 0
+            unicos.append(nome)
+    return unicos
+
+
+def inicios_de_linha(buffer):
+    # Posição do primeiro byte de cada linha (uma entrada por linha, inclusive as vazias)
+    quebras = np.flatnonzero(buffer == ord("\n"))
+    inicios = np.concatenate(([0], quebras + 1))
+    # A quebra de linha final não abre uma nova linha
+    return inicios[inicios < len(buffer)]
+
+
+def converter_time(buffer, inicios):
+    # Converte o horário no início de cada linha para datetime64[ns] (NaT quando a linha não é de dados).
+    # Monta uma matriz de bytes (linhas x 18) e faz a validação e a aritmética de datas em bloco, sem strings.
+    # Ano com 2 dígitos segue o %y do strptime: 69-99 => 1900, 00-68 => 2000.
+    preenchido = np.concatenate((buffer, np.zeros(largura_time + 1, dtype=np.uint8)))
+    matriz = preenchido[inicios[:, None] + np.arange(largura_time + 1)]
+
+    digitos = matriz[:, posicoes_digitos].astype(np.int16) - ord("0")
+    valido = ((digitos >= 0) & (digitos <= 9)).all(axis=1)
+    for posicao, caractere in separadores.items():
+        valido &= matriz[:, posicao] == caractere[0]
+
+    pares = digitos[:, 0::2].astype(np.int64) * 10 + digitos[:, 1::2]
+    hora, minuto, segundo, mes, dia, ano = (pares[:, i] for i in range(6))
+    ano = np.where(ano < 69, 2000 + ano, 1900 + ano)
+
+    # Validação de faixas, inclusive dias do mês (29/02 apenas em ano bissexto)
+    bissexto = (ano % 4 == 0) & ((ano % 100 != 0) | (ano % 400 == 0))
+    mes_seguro = np.clip(mes, 1, 12)
+    limite_dia = dias_por_mes[mes_seguro] + ((mes_seguro == 2) & bissexto)
+    valido &= (hora < 24) & (minuto < 60) & (segundo < 60)
+    valido &= (mes >= 1) & (mes <= 12) & (dia >= 1) & (dia <= limite_dia)
+
+    # Dias desde 1970-01-01 (algoritmo "days from civil" de H. Hinnant)
+    a = ano - (mes_seguro <= 2)
+    era = a // 400
+    ano_da_era = a - era * 400
+    dia_do_ano = (153 * ((mes_seguro + 9) % 12) + 2) // 5 + dia - 1
+    dia_da_era = ano_da_era * 365 + ano_da_era // 4 - ano_da_era // 100 + dia_do_ano
+    dias = era * 146097 + dia_da_era - 719468
+
+    segundos = dias * 86400 + hora * 3600 + minuto * 60 + segundo
+    tempos = (segundos * 1_000_000_000).astype("datetime64[ns]")
+    tempos[~valido] = np.datetime64("NaT")
+    return tempos
+
+
+def ler_metricas(dados_bytes, posicoes):
+    # Lê apenas as colunas numéricas indicadas (posições no cabeçalho) de todas as linhas de dados.
+    # skip_blank_lines=False mantém uma linha de resultado por linha do arquivo (alinhada com o horário).
+    opcoes = dict(header=None, usecols=posicoes, skip_blank_lines=False, encoding="latin1")
+    try:
+        return pd.read_csv(io.BytesIO(dados_bytes), dtype="float64", **opcoes)
+    except ValueError:
+        # Algum texto no meio dos dados (ex.: cabeçalho repetido após reinício do Core Temp): valores inválidos viram NaN
+        valores = pd.read_csv(io.BytesIO(dados_bytes), dtype=str, **opcoes)
+        return valores.apply(pd.to_numeric, errors="coerce")
+
+
+def ler_cabecalho(conteudo):
+    # Nomes das colunas (já sem repetições) e posição do primeiro byte após a linha de cabeçalho
+    inicio = localizar_cabecalho(conteudo)
+    fim = conteudo.find(b"\n", inicio)
+    fim = len(conteudo) if fim < 0 else fim
+    nomes = nomes_unicos(conteudo[inicio:fim].decode("latin1").rstrip("\r").split(","))
+    return nomes, fim + 1
+
+
+def ler_linhas(nomes, dados_bytes):
+    # Converte linhas de dados (bytes, sem o cabeçalho) para o formato processado (colunas snake_case, tipos finais).
+    # Mesmas regras do tratamento anterior: descarta colunas totalmente vazias e linhas incompletas
+    # ou com horário inválido (metadados, rodapés). Retorna (DataFrame, linhas de dados lidas).
+    mapa = mapear_colunas(tuple(nomes))
+    posicao = {nome: i for i, nome in enumerate(nomes)}
+
+    # Horários de todas as linhas; o que vem depois da última linha válida (rodapé) é ignorado
+    buffer = np.frombuffer(dados_bytes, dtype=np.uint8)
+    with metricas.etapa("conversao_time", tamanho_bytes=len(buffer)) as medida:
+        inicios = inicios_de_linha(buffer)
+        tempos = converter_time(buffer, inicios)
+        medida["linhas"] = len(inicios)
+    validas = np.flatnonzero(~np.isnat(tempos))
+    if len(validas) == 0:
+        return pd.DataFrame(columns=list(mapa.values())), 0
+    ultima = validas[-1]
+    tempos = tempos[:ultima + 1]
+    fim_dados = inicios[ultima + 1] if ultima + 1 < len(inicios) else len(buffer)
+
+    # Métricas das mesmas linhas, já numéricas
+    colunas_metricas = [nome for nome in mapa if mapa[nome] != "time"]
+    with metricas.etapa("leitura_metricas", linhas=len(tempos), tamanho_bytes=int(fim_dados)):
+        valores = ler_metricas(buffer[:fim_dados].tobytes(), [posicao[nome] for nome in colunas_metricas])
+    if len(valores) != len(tempos):
+        raise ValueError("Linhas de dados desalinhadas no log do Core Temp (quebras de linha inesperadas).")
+    # read_csv devolve as colunas na ordem do arquivo: reordena pela posição de cada nome
+    valores.columns = [nomes[i] for i in valores.columns]
+
+    with metricas.etapa("limpeza", linhas=len(tempos)):
+        dados = pd.DataFrame({"time": tempos})
+        for nome in colunas_metricas:
+            dados[mapa[nome]] = valores[nome].to_numpy()
+        linhas_lidas = len(dados)
+
+        # Colunas totalmente vazias (sensor sem leitura) e linhas incompletas ou sem horário válido
+        dados = dados.dropna(axis=1, how="all").dropna(axis=0, how="any")
+
+        # Tipos finais: inteiros para temperaturas e carga
+        for coluna in dados.columns:
+            if coluna.startswith(prefixos_inteiros):
+                dados[coluna] = dados[coluna].round().astype("int64")
+    return dados.reset_index(drop=True), linhas_lidas
+
+
+def ler_log(file_path):
+    # Lê um log bruto do Core Temp inteiro já no formato processado. Retorna (DataFrame, linhas de dados lidas).
+    with metricas.etapa("leitura") as medida:
+        with open(file_path, "rb") as arquivo:
+            conteudo = arquivo.read()
+        medida["bytes"] = len(conteudo)
+    nomes, inicio_dados = ler_cabecalho(conteudo)
+    return ler_linhas(nomes, memoryview(conteudo)[inicio_dados:])
@@ -0,0 +1,103 @@
+# Objetivo: Gerenciar o particionamento mensal (RANGE em time) da tabela coretemp.raw_data:
+#   - Criar a tabela já particionada quando ela ainda não existe
+#   - Criar, sob demanda, as partições mensais que cobrem o intervalo de cada carga
+#   - Migrar uma tabela antiga (não particionada) para o novo layout
+
+from sqlalchemy import text
+import pandas as pd
+
+schema = "coretemp"
+tabela = "raw_data"
+
+
+def tipo_sql(dtype):
+    # Tipo PostgreSQL de uma coluna a partir do dtype do pandas (mesmos tipos que o to_sql usaria)
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "TIMESTAMP WITHOUT TIME ZONE"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "BIGINT"
+    if pd.api.types.is_float_dtype(dtype):
+        return "DOUBLE PRECISION"
+    return "TEXT"
+
+
+def tabela_existe(conn, nome=tabela):
+    return conn.execute(text(f"SELECT to_regclass('{schema}.{nome}') IS NOT NULL")).scalar()
+
+
+def tabela_particionada(conn):
+    # True se coretemp.raw_data existe e é uma tabela particionada (relkind 'p')
+    return conn.execute(text(f"""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = '{schema}' AND c.relname = '{tabela}' AND c.relkind = 'p'
+        )
+    """)).scalar()
+
+
+def criar_tabela_particionada(conn, amostra):
+    # Cria coretemp.raw_data particionada por mês, com as colunas/tipos de um DataFrame de amostra
+    colunas = ",\n        ".join(f'"{nome}" {tipo_sql(dtype)}' for nome, dtype in amostra.dtypes.items())
+    conn.execute(text(f"""
+        CREATE TABLE {schema}.{tabela} (
+        {colunas}
+        ) PARTITION BY RANGE (time)
+    """))
+    print(f"Tabela {schema}.{tabela} criada com particionamento mensal por time.")
+
+
+def garantir_colunas(conn, amostra):
+    # Acrescenta a coretemp.raw_data as colunas do DataFrame de amostra que ela ainda não tem.
+    # Em tabela particionada o ALTER TABLE propaga a coluna para todas as partições.
+    existentes = set(conn.execute(text(f"""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = '{schema}' AND table_name = '{tabela}'
+    """)).scalars())
+    for nome, dtype in amostra.dtypes.items():
+        if nome not in existentes:
+            conn.execute(text(f'ALTER TABLE {schema}.{tabela} ADD COLUMN "{nome}" {tipo_sql(dtype)}'))
+            print(f"Coluna {nome} adicionada a {schema}.{tabela}.")
+
+
+def meses(inicio, fim):
+    # Primeiros dias de cada mês entre 'inicio' e 'fim' (inclusive)
+    atual = pd.Timestamp(inicio).to_period("M")
+    ultimo = pd.Timestamp(fim).to_period("M")
+    while atual <= ultimo:
+        yield atual.start_time, (atual + 1).start_time
+        atual += 1
+
+
+def garantir_particoes(conn, inicio, fim):
+    # Cria as partições mensais ausentes que cobrem [inicio, fim]. Sem efeito em tabela não particionada.
+    if inicio is None or not tabela_particionada(conn):
+        return
+    for comeco, termino in meses(inicio, fim):
+        nome = f"{tabela}_{comeco:%Y_%m}"
+        if not tabela_existe(conn, nome):
+            conn.execute(text(f"""
+                CREATE TABLE {schema}.{nome} PARTITION OF {schema}.{tabela}
+                FOR VALUES FROM ('{comeco:%Y-%m-%d}') TO ('{termino:%Y-%m-%d}')
+            """))
+            print(f"Partição {schema}.{nome} criada.")
+
+
+def migrar_para_particionado(conn):
+    # Converte uma coretemp.raw_data comum em particionada: renomeia a antiga, cria a nova com as mesmas
+    # colunas, cria as partições do intervalo existente, copia os dados e remove a antiga.
+    # Deve rodar dentro de uma transação: qualquer falha desfaz tudo.
+    if not tabela_existe(conn) or tabela_particionada(conn):
+        print(f"Nada a migrar: {schema}.{tabela} não existe ou já é particionada.")
+        return False
+
+    antiga = f"{tabela}_legado"
+    conn.execute(text(f"ALTER TABLE {schema}.{tabela} RENAME TO {antiga}"))
+    conn.execute(text(f"CREATE TABLE {schema}.{tabela} (LIKE {schema}.{antiga}) PARTITION BY RANGE (time)"))
+
+    inicio, fim = conn.execute(text(f"SELECT MIN(time), MAX(time) FROM {schema}.{antiga}")).one()
+    garantir_particoes(conn, inicio, fim)
+
+    conn.execute(text(f"INSERT INTO {schema}.{tabela} SELECT * FROM {schema}.{antiga}"))
+    conn.execute(text(f"DROP TABLE {schema}.{antiga}"))
+    print(f"Tabela {schema}.{tabela} migrada para particionamento mensal ({inicio} a {fim}).")
+    return True
@@ -5,87 +5,316 @@
 
 import pandas as pd
 import os
-import shutil
+import re
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import arquivo_binario
+import manifest
+import metricas
+import parser_coretemp
 
 # Pastas de entrada/saída do processo
 raw_data_path = "data/raw"
 loaded_data_path = "data/loaded_raw"
 processed_data_path = "data/processed"
+parquet_data_path = "data/parquet"  # dataset Parquet particionado por ano/mes/dia (formato="parquet")
 
 # Garante que diretórios-alvo existam
 os.makedirs(loaded_data_path, exist_ok=True)
 os.makedirs(processed_data_path, exist_ok=True)
 
 
-def process_file(file_path, output_path):
-    # Lê e transforma um arquivo individual, salvando o resultado em output_path
-    print(f"\nLendo o arquivo: {os.path.basename(file_path)}")
+# Formatos de saída suportados para o processado
+formatos_saida = ("csv", "parquet")
 
-    # Leitura do CSV (codificação latin1) ignorando as 7 primeiras linhas (metadados/cabeçalhos estendidos)
-    dados = pd.read_csv(file_path, encoding="latin1", skiprows=7)
+# Tipos compactos por prefixo de coluna no Parquet (temperaturas e carga são inteiras no log do Core Temp)
+tipos_parquet = {
+    "core_temp_": "int16",
+    "low_temp_": "int16",
+    "high_temp_": "int16",
+    "core_load_": "int16",
+    "core_speed_": "float32",
+    "cpu_power": "float32",
+}
 
-    # Captura o total de linhas antes de qualquer tratamento (para métricas)
-    linhas_iniciais = len(dados)
-    print(f"\nQtd. linhas antes do processamento: {linhas_iniciais}")
+# Tamanho padrão do bloco (linhas) no modo de leitura em blocos
+chunksize_padrao = 200000
 
-    # Remove colunas com rótulo gerado automaticamente ("Unnamed*"), típicas de separadores extras
-    dados = dados.loc[:, ~dados.columns.str.startswith("Unnamed")]
 
-    # Remove colunas agregadas "Core X"
-    cols_to_drop = ["Core 0", "Core 1", "Core 2", "Core 3", "Core 4", "Core 5"]
-    dados = dados.drop(columns=cols_to_drop)
+def acrescentar_arquivo(arquivo, dados):
+    # Acrescenta as linhas limpas ao arquivo binário de telemetria. É uma saída opcional: uma falha (ex.: log com
+    # núcleos que o cabeçalho do arquivo não tem, lock de escrita ocupado) é informada e não interrompe o ETL.
+    # Retorna False se as linhas não foram acrescentadas.
+    try:
+        with metricas.etapa("arquivo_binario", linhas=len(dados)):
+            arquivo_binario.acrescentar(arquivo, dados)
+    except (OSError, ValueError) as e:
+        print(f"Aviso: linhas não acrescentadas ao arquivo binário: {e}")
+        return False
+    return True
 
-    # Descarta colunas completamente vazias
-    dados = dados.dropna(axis=1, how='all')
 
-    # Converte a coluna 'Time' para datetime (formato: HH:MM:SS mm/dd/yy), inválidos viram NaT
-    dados["Time"] = pd.to_datetime(dados["Time"], format="%H:%M:%S %m/%d/%y", errors="coerce")
+def resultado_processamento(linhas_iniciais, linhas_finais, time_min, time_max):
+    # Resumo devolvido por process_file (contagens e intervalo de 'time' em texto ISO, usado no manifesto)
+    return {
+        "linhas_iniciais": linhas_iniciais,
+        "linhas_finais": linhas_finais,
+        "time_min": None if time_min is None or pd.isna(time_min) else str(time_min),
+        "time_max": None if time_max is None or pd.isna(time_max) else str(time_max),
+    }
 
-    # Remove linhas completamente vazias
-    dados = dados.dropna(axis=0, how='all')
 
-    # Remove linhas com qualquer valor ausente (mantém apenas registros completos)
-    dados = dados.dropna(axis=0, how='any')
+def process_file(file_path, output_path, chunksize=None, formato="csv", desde=None, arquivo=None):
+    # Lê e transforma um arquivo individual, salvando o resultado em output_path
+    # As colunas (e o número de núcleos) são descobertas pelo cabeçalho; layout não reconhecido gera ValueError
+    # chunksize: se informado, lê e grava o arquivo em blocos desse tamanho (memória constante)
+    # formato="parquet": grava no dataset data/parquet (o nome de output_path vira o prefixo dos arquivos)
+    # desde: checkpoint (texto ISO); mantém apenas linhas com 'time' posterior (logs que continuam crescendo)
+    # arquivo: caminho do arquivo binário de telemetria (ver arquivo_binario); as linhas limpas também são
+    # acrescentadas a ele
+    # Retorna um dicionário com as contagens e o intervalo de 'time' gravado (ver resultado_processamento)
+    # Cada etapa (leitura, conversão do horário, limpeza, gravação) é registrada em metricas, com o nome do arquivo
+    with metricas.contexto(arquivo=os.path.basename(file_path)):
+        with metricas.etapa("process_file", tamanho_bytes=os.path.getsize(file_path), formato=formato) as medida:
+            if chunksize:
+                resultado = process_file_em_blocos(file_path, output_path, chunksize, formato, desde, arquivo)
+            else:
+                resultado = process_file_inteiro(file_path, output_path, formato, desde, arquivo)
+            medida["linhas"] = resultado["linhas_finais"]
+    return resultado
 
-    try:
-        # Reordena um conjunto específico de colunas
-        dados = dados[['Time',
-                       'Core 0 Temp. (°)', 'Low temp. (°)', 'High temp. (°)', 'Core load (%)', 'Core speed (MHz)',
-                       'Core 1 Temp. (°)', 'Low temp. (°).1', 'High temp. (°).1', 'Core load (%).1', 'Core speed (MHz).1',
-                       'Core 2 Temp. (°)', 'Low temp. (°).2', 'High temp. (°).2', 'Core load (%).2', 'Core speed (MHz).2',
-                       'Core 3 Temp. (°)', 'Low temp. (°).3', 'High temp. (°).3', 'Core load (%).3', 'Core speed (MHz).3',
-                       'Core 4 Temp. (°)', 'Low temp. (°).4', 'High temp. (°).4', 'Core load (%).4', 'Core speed (MHz).4',
-                       'Core 5 Temp. (°)', 'Low temp. (°).5', 'High temp. (°).5', 'Core load (%).5', 'Core speed (MHz).5',
-                       'CPU 0 Power']]
-    except KeyError as e:
-        # Se o layout variar e alguma coluna faltar, apenas informa e segue com o que existir
-        print(f" Aviso: Coluna não encontrada durante a reordenação: {e}. O arquivo pode ter um formato diferente.")
-        input("Pressione Enter para sair.")
-
-    # Mapeia nomes originais para nomes padronizados em snake_case
-    renomear_colunas = {
-        "Time": "time",
-        "Core 0 Temp. (°)": "core_temp_0", "Low temp. (°)": "low_temp_0", "High temp. (°)": "high_temp_0", "Core load (%)": "core_load_0", "Core speed (MHz)": "core_speed_0",
-        "Core 1 Temp. (°)": "core_temp_1", "Low temp. (°).1": "low_temp_1", "High temp. (°).1": "high_temp_1", "Core load (%).1": "core_load_1", "Core speed (MHz).1": "core_speed_1",
-        "Core 2 Temp. (°)": "core_temp_2", "Low temp. (°).2": "low_temp_2", "High temp. (°).2": "high_temp_2", "Core load (%).2": "core_load_2", "Core speed (MHz).2": "core_speed_2",
-        "Core 3 Temp. (°)": "core_temp_3", "Low temp. (°).3": "low_temp_3", "High temp. (°).3": "high_temp_3", "Core load (%).3": "core_load_3", "Core speed (MHz).3": "core_speed_3",
-        "Core 4 Temp. (°)": "core_temp_4", "Low temp. (°).4": "low_temp_4", "High temp. (°).4": "high_temp_4", "Core load (%).4": "core_load_4", "Core speed (MHz).4": "core_speed_4",
-        "Core 5 Temp. (°)": "core_temp_5", "Low temp. (°).5": "low_temp_5", "High temp. (°).5": "high_temp_5", "Core load (%).5": "core_load_5", "Core speed (MHz).5": "core_speed_5",
-        "CPU 0 Power": "cpu_power"
-    }
-    dados.rename(columns=renomear_colunas, inplace=True)
+
+def process_file_inteiro(file_path, output_path, formato="csv", desde=None, arquivo=None):
+    # Versão de process_file que lê o arquivo inteiro de uma vez (padrão, sem chunksize)
+    print(f"\nLendo o arquivo: {os.path.basename(file_path)}")
+
+    # Leitura dedicada do log do Core Temp (ver parser_coretemp): localiza o cabeçalho, seleciona e renomeia
+    # as colunas, converte o horário e descarta colunas vazias e linhas incompletas em uma única passada
+    dados, linhas_iniciais = parser_coretemp.ler_log(file_path)
+    print(f"\nQtd. linhas antes do processamento: {linhas_iniciais}")
+
+    # Mantém apenas o que é posterior ao checkpoint
+    if desde is not None:
+        dados = dados[dados["time"] > pd.Timestamp(desde)]
 
     # Métricas finais pós-tratamento
     linhas_finais = len(dados)
     print(f"\nLinhas após o processamento: {linhas_finais} (removidas {linhas_iniciais - linhas_finais} linhas)")
 
-    # Salva o CSV processado sem índice
-    dados.to_csv(output_path, index=False)
+    with metricas.etapa("gravacao", linhas=linhas_finais) as medida:
+        if formato == "parquet":
+            # Salva no dataset Parquet particionado por data
+            nome_base = os.path.splitext(os.path.basename(output_path))[0]
+            remover_parquet(nome_base)
+            salvar_parquet(dados, nome_base)
+            print(f"\nArquivo processado e salvo em: {parquet_data_path} ({nome_base}-*.parquet)")
+        else:
+            # Salva o CSV processado sem índice
+            dados.to_csv(output_path, index=False)
+            medida["bytes"] = os.path.getsize(output_path)
+            print(f"\nArquivo processado e salvo em: {output_path}")
+
+    if arquivo and acrescentar_arquivo(arquivo, dados):
+        print(f"\nLinhas acrescentadas ao arquivo binário: {arquivo}")
+
+    # Retorna as contagens e o intervalo de tempo para o relatório e o manifesto
+    return resultado_processamento(linhas_iniciais, linhas_finais, dados["time"].min(), dados["time"].max())
+
+
+def limpar_bloco(dados):
+    # Aplica a um bloco do log bruto a mesma seleção, conversão de tempo, filtro e renomeação do process_file.
+    # A seleção das colunas vem antes do dropna: a decisão "coluna vazia" não faz sentido bloco a bloco.
+    # O mapa de colunas é calculado uma vez por cabeçalho (cache), não a cada bloco.
+    mapa = parser_coretemp.mapear_colunas(tuple(dados.columns))
+    dados = dados[list(mapa)].copy()
+
+    # Converte a coluna 'Time' para datetime; inválidos (rodapés, linhas quebradas) viram NaT
+    with metricas.etapa("conversao_time", linhas=len(dados)):
+        dados["Time"] = pd.to_datetime(dados["Time"], format="%H:%M:%S %m/%d/%y", errors="coerce")
+
+    # O pandas escolhe os tipos de cada bloco separadamente: texto no meio dos dados (ex.: cabeçalho repetido
+    # após reinício) deixa a coluna como texto e vira NaN aqui, como em parser_coretemp.ler_metricas
+    for coluna in dados.columns.drop("Time"):
+        if dados[coluna].dtype == object:
+            dados[coluna] = pd.to_numeric(dados[coluna], errors="coerce")
+
+    # Mantém apenas registros completos
+    dados = dados.dropna(axis=0, how='any').rename(columns=mapa)
+
+    # Tipos finais iguais aos da leitura do arquivo inteiro (parser_coretemp.ler_linhas): um bloco com NaN
+    # (ex.: o rodapé "Session end:") teria as temperaturas em float ("50.0"), que o COPY não aceita em BIGINT
+    for coluna in dados.columns:
+        if coluna.startswith(parser_coretemp.prefixos_inteiros):
+            dados[coluna] = dados[coluna].round().astype("int64")
+    return dados
+
+
+def tipar_colunas(dados):
+    # Converte as métricas para tipos compactos (int16/float32) conforme o prefixo da coluna
+    tipos = {}
+    for coluna in dados.columns:
+        for prefixo, tipo in tipos_parquet.items():
+            if coluna.startswith(prefixo):
+                tipos[coluna] = tipo
+                break
+    # Inteiros são arredondados antes da conversão para não truncar valores como 45.0000001
+    for coluna, tipo in tipos.items():
+        if tipo.startswith("int"):
+            dados[coluna] = dados[coluna].round()
+    return dados.astype(tipos)
+
+
+def salvar_parquet(dados, nome_base, parte=0):
+    # Grava um DataFrame processado no dataset Parquet (zstd), particionado em ano=/mes=/dia=.
+    # 'time' fica como timestamp; as métricas em int16/float32.
+    # O nome dos arquivos leva o nome do bruto e a parte, então reprocessar o mesmo arquivo sobrescreve a saída.
+    dados = tipar_colunas(dados.copy())
+    dados["ano"] = dados["time"].dt.year.astype("int16")
+    dados["mes"] = dados["time"].dt.month.astype("int16")
+    dados["dia"] = dados["time"].dt.day.astype("int16")
+    dados.to_parquet(
+        parquet_data_path,
+        engine="pyarrow",
+        compression="zstd",
+        index=False,
+        partition_cols=["ano", "mes", "dia"],
+        basename_template=f"{nome_base}-{parte}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+def remover_parquet(nome_base):
+    # Remove do dataset os arquivos gerados anteriormente a partir do mesmo bruto. O nome precisa seguir
+    # exatamente o modelo de salvar_parquet ("<nome_base>-<parte>-<i>.parquet"): um prefixo comum (ex.: "X" e
+    # "X-2") ou caracteres especiais do glob no nome do bruto não podem atingir arquivos de outro bruto.
+    modelo = re.compile(re.escape(nome_base) + r"-\d+-\d+\.parquet")
+    for pasta, _, arquivos in os.walk(parquet_data_path):
+        for nome in arquivos:
+            if modelo.fullmatch(nome):
+                os.remove(os.path.join(pasta, nome))
+
+
+def process_file_em_blocos(file_path, output_path, chunksize=chunksize_padrao, formato="csv", desde=None, arquivo=None):
+    # Versão em blocos do process_file: lê o bruto em blocos de 'chunksize' linhas, limpa cada bloco
+    # e grava incrementalmente, de modo que o pico de memória não depende do tamanho do arquivo.
+    # A saída é escrita em um arquivo temporário e só ganha o nome final ao término sem erros.
+    # No arquivo binário cada bloco é acrescentado ao ser gravado; após uma falha, os blocos já acrescentados
+    # voltam a ser gravados no reprocessamento e a compactação remove os horários repetidos.
+    print(f"\nLendo o arquivo em blocos de {chunksize} linhas: {os.path.basename(file_path)}")
+
+    caminho_temp = output_path + ".tmp"
+    nome_base = os.path.splitext(os.path.basename(output_path))[0]
+    linhas_iniciais = 0
+    linhas_finais = 0
+    time_min = None
+    time_max = None
+
+    if formato == "parquet":
+        remover_parquet(nome_base)
+
+    try:
+        # Pula os metadados até a linha de cabeçalho, onde quer que ela esteja
+        leitor = pd.read_csv(file_path, encoding="latin1", skiprows=parser_coretemp.linha_cabecalho(file_path), chunksize=chunksize)
+        for i in itertools.count():
+            # Etapas de cada bloco registradas com o número do bloco (a última leitura é a que encontra o fim)
+            with metricas.contexto(bloco=i):
+                with metricas.etapa("leitura") as medida:
+                    bloco = next(leitor, None)
+                    medida["linhas"] = 0 if bloco is None else len(bloco)
+                if bloco is None:
+                    break
+
+                linhas_iniciais += len(bloco)
+                with metricas.etapa("limpeza", linhas=len(bloco)):
+                    bloco = limpar_bloco(bloco)
+                    if desde is not None:
+                        bloco = bloco[bloco["time"] > pd.Timestamp(desde)]
+                linhas_finais += len(bloco)
+
+                # Intervalo de tempo acumulado entre os blocos
+                if len(bloco):
+                    time_min = bloco["time"].min() if time_min is None else min(time_min, bloco["time"].min())
+                    time_max = bloco["time"].max() if time_max is None else max(time_max, bloco["time"].max())
+
+                with metricas.etapa("gravacao", linhas=len(bloco)):
+                    if formato == "parquet":
+                        # Cada bloco vira uma parte do dataset
+                        salvar_parquet(bloco, nome_base, parte=i)
+                    else:
+                        # Primeiro bloco cria o arquivo com cabeçalho; os seguintes apenas acrescentam linhas
+                        bloco.to_csv(caminho_temp, index=False, mode="w" if i == 0 else "a", header=(i == 0))
+
+                # Após uma falha, os blocos seguintes deste log não são acrescentados
+                if arquivo and not acrescentar_arquivo(arquivo, bloco):
+                    arquivo = None
+
+        # Publica a saída completa com o nome definitivo
+        if formato != "parquet":
+            os.replace(caminho_temp, output_path)
+    except Exception:
+        # Não deixa saída parcial para trás
+        if os.path.exists(caminho_temp):
+            os.remove(caminho_temp)
+        if formato == "parquet":
+            remover_parquet(nome_base)
+        raise
+
+    print(f"\nQtd. linhas antes do processamento: {linhas_iniciais}")
+    print(f"\nLinhas após o processamento: {linhas_finais} (removidas {linhas_iniciais - linhas_finais} linhas)")
     print(f"\nArquivo processado e salvo em: {output_path}")
 
+    return resultado_processamento(linhas_iniciais, linhas_finais, time_min, time_max)
 
-def pipeline():
+
+def resumo_vazao(arquivos_ok, linhas, inicio):
+    # Imprime o resumo agregado de vazão do pipeline (arquivos, linhas e linhas/s)
+    duracao = time.perf_counter() - inicio
+    vazao = linhas / duracao if duracao > 0 else float("inf")
+    print(f"\nResumo: {arquivos_ok} arquivo(s), {linhas} linhas em {duracao:.2f}s ({vazao:,.0f} linhas/s)")
+
+
+def verificar_manifesto(manifesto, file_name, source_file_path, vistos=None):
+    # Consulta o manifesto para um bruto: devolve (hash, checkpoint) ou (hash, None) para processar tudo.
+    # Conteúdo idêntico a um já registrado, com este ou outro nome => devolve checkpoint False (arquivo deve ser
+    # apenas ignorado). vistos: hash -> nome dos brutos já aceitos nesta execução e ainda não registrados no
+    # manifesto (processamento paralelo, carga fundida); o bruto aceito agora é acrescentado a ele.
+    hash_raw = manifest.hash_arquivo(source_file_path)
+    entrada = manifesto.get(file_name, {})
+    if entrada.get("hash_raw") == hash_raw:
+        return hash_raw, False
+    # Mesmo log copiado com outro nome: as linhas já foram (ou serão, nesta execução) processadas pelo original
+    original = manifest.nome_com_hash(manifesto, "hash_raw", hash_raw, exceto=file_name)
+    if original is None and vistos is not None:
+        original = vistos.get(hash_raw)
+    if original is not None:
+        print(f"Mesmo conteúdo de '{original}'.")
+        return hash_raw, False
+    if vistos is not None:
+        vistos[hash_raw] = file_name
+    # Log que cresceu (mesmo nome, conteúdo novo): apenas o que vier depois do último 'time' carregado
+    return hash_raw, entrada.get("ultimo_time_carregado")
+
+
+def registrar_processado(manifesto, file_name, hash_raw, resultado):
+    # Registra no manifesto o bruto processado com sucesso
+    manifest.registrar(
+        manifesto, file_name,
+        hash_raw=hash_raw,
+        linhas=resultado["linhas_finais"],
+        time_min=resultado["time_min"],
+        time_max=resultado["time_max"],
+        status=manifest.STATUS_PROCESSADO,
+    )
+    manifest.salvar_manifesto(manifesto)
+
+
+def pipeline(workers=1, chunksize=None, formato="csv", arquivo=None):
     # Orquestra o processamento de todos os arquivos em data/raw
+    # workers > 1: processa os arquivos em paralelo, em processos separados
+    # chunksize: lê/grava cada arquivo em blocos (ver process_file_em_blocos)
+    # formato: "csv" (data/processed, para carga no banco) ou "parquet" (data/parquet, leitura direta pelo dashboard)
+    # arquivo: também acrescenta as linhas limpas a este arquivo binário de telemetria (ver arquivo_binario)
     print("\n--- Iniciando o processo de ETL para os arquivos CSV ---")
 
     # Coleta apenas arquivos .csv na pasta de origem
@@ -98,6 +327,18 @@ def pipeline():
 
     print(f"Encontrados {len(files_to_process)} arquivos para processar.")
 
+    # Manifesto: evita reprocessar arquivos repetidos e guarda o checkpoint de logs que crescem
+    manifesto = manifest.carregar_manifesto()
+
+    if workers > 1:
+        pipeline_paralelo(files_to_process, workers, chunksize, formato, manifesto, arquivo)
+        return
+
+    # Contadores para o resumo de vazão
+    inicio = time.perf_counter()
+    total_linhas = 0
+    ignorados = 0
+
     # Processa cada arquivo individualmente
     for file_name in files_to_process:
         source_file_path = os.path.join(raw_data_path, file_name)               # caminho do arquivo bruto
@@ -105,12 +346,25 @@ def pipeline():
         output_file_path = os.path.join(processed_data_path, file_name)         # saída do CSV processado
         print(f"\n--- Processando: {file_name} ---")
         try:
+            hash_raw, desde = verificar_manifesto(manifesto, file_name, source_file_path)
+            if desde is False:
+                # Mesmo conteúdo já processado antes: apenas arquiva o bruto repetido
+                destino = manifest.mover(source_file_path, destination_file_path)
+                print(f"Arquivo já processado anteriormente (mesmo conteúdo). Ignorado e movido para: {destino}")
+                ignorados += 1
+                continue
+            if desde:
+                print(f"Arquivo já conhecido; processando apenas linhas após {desde}.")
+
             # Processa e grava o CSV
-            process_file(source_file_path, output_file_path)
+            resultado = process_file(source_file_path, output_file_path, chunksize=chunksize, formato=formato, desde=desde,
+                                     arquivo=arquivo)
+            total_linhas += resultado["linhas_finais"]
+            registrar_processado(manifesto, file_name, hash_raw, resultado)
 
             # Move o arquivo original para loaded_raw apenas após processamento bem-sucedido
-            shutil.move(source_file_path, destination_file_path)
-            print(f"Arquivo original movido para: {destination_file_path}")
+            destino = manifest.mover(source_file_path, destination_file_path)
+            print(f"Arquivo original movido para: {destino}")
 
         except Exception as e:
             # Em caso de erro, reporta e encerra o pipeline
@@ -118,5 +372,74 @@ def pipeline():
             print("!!! O arquivo não será movido.")
             return  # encerra o pipeline na primeira falha
 
+    resumo_vazao(len(files_to_process) - ignorados, total_linhas, inicio)
+
+    # No formato Parquet os dados já ficam visíveis ao dashboard
+    if formato == "parquet":
+        manifest.marcar_atualizacao()
+
     # Conclusão do processo (executa somente se todos os arquivos forem processados sem erros)
     print("\n--- Processo finalizado! ---")
+
+
+def pipeline_paralelo(files_to_process, workers, chunksize=None, formato="csv", manifesto=None, arquivo=None):
+    # Distribui process_file entre 'workers' processos.
+    # Cada arquivo é tratado de forma independente: uma falha não interrompe os demais,
+    # e o bruto só é movido para loaded_raw depois que a saída dele foi gravada.
+    # No arquivo binário, os processos acrescentam um de cada vez (lock de escrita), na ordem em que terminam.
+    print(f"Processando em paralelo com {workers} processos.")
+
+    inicio = time.perf_counter()
+    total_linhas = 0
+    falhas = []
+    ignorados = 0
+    manifesto = manifesto if manifesto is not None else manifest.carregar_manifesto()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Submete um processamento por arquivo e guarda o nome associado a cada tarefa
+        # (o manifesto é consultado e atualizado apenas neste processo)
+        tarefas = {}
+        hashes = {}
+        vistos = {}  # cópias com outro nome no mesmo lote também são ignoradas
+        for file_name in files_to_process:
+            source_file_path = os.path.join(raw_data_path, file_name)
+            output_file_path = os.path.join(processed_data_path, file_name)
+            hash_raw, desde = verificar_manifesto(manifesto, file_name, source_file_path, vistos)
+            if desde is False:
+                # Mesmo conteúdo já processado antes: apenas arquiva o bruto repetido
+                destino = manifest.mover(source_file_path, os.path.join(loaded_data_path, file_name))
+                print(f"Ignorado (já processado): {file_name} -> {destino}")
+                ignorados += 1
+                continue
+            hashes[file_name] = hash_raw
+            tarefas[executor.submit(process_file, source_file_path, output_file_path, chunksize, formato, desde, arquivo)] = file_name
+
+        # Trata os resultados na ordem em que terminam
+        for tarefa in as_completed(tarefas):
+            file_name = tarefas[tarefa]
+            source_file_path = os.path.join(raw_data_path, file_name)
+            destination_file_path = os.path.join(loaded_data_path, file_name)
+            try:
+                resultado = tarefa.result()
+                total_linhas += resultado["linhas_finais"]
+                registrar_processado(manifesto, file_name, hashes[file_name], resultado)
+
+                # Saída gravada com sucesso: move o bruto para loaded_raw
+                destino = manifest.mover(source_file_path, destination_file_path)
+                print(f"OK: {file_name} ({resultado['linhas_finais']} de {resultado['linhas_iniciais']} linhas) -> {destino}")
+
+            except Exception as e:
+                # Falha isolada: registra e segue com os demais arquivos
+                falhas.append(file_name)
+                print(f"!!! ERRO ao processar o arquivo {file_name}: {e}")
+                print("!!! O arquivo não será movido.")
+
+    resumo_vazao(len(files_to_process) - len(falhas) - ignorados, total_linhas, inicio)
+
+    if formato == "parquet":
+        manifest.marcar_atualizacao()
+
+    if falhas:
+        print(f"\n--- Processo finalizado com {len(falhas)} falha(s): {', '.join(falhas)} ---")
+    else:
+        print("\n--- Processo finalizado! ---")
@@ -0,0 +1,151 @@
+# Objetivo: Manter tabelas de agregados (rollups) no esquema coretemp, usadas pelas consultas do dashboard:
+#   - rollup_hora:     MIN/SOMA/MAX/contagem por hora e minutos por faixa de temperatura
+#   - rollup_dia:      idem, por dia
+#   - rollup_temp_dia: idem, por dia e valor de core_temp_0 (para as relações temperatura x velocidade/energia)
+# As somas e contagens permitem recompor a média de qualquer período (SOMA / contagem).
+# Também mantém coretemp.calendario (dias com dados e linhas por dia), lido pelos filtros de data do dashboard.
+
+from sqlalchemy import text
+import pandas as pd
+
+schema = "coretemp"
+tabela_origem = "raw_data"
+
+# Métricas calculadas para cada grupo (mesmas colunas em todos os rollups).
+# As faixas seguem exatamente as condições de faixas_temp (a última é "> 90").
+metricas_rollup = """
+        COUNT(*) AS n,
+        MIN(core_temp_0) AS temp_min, SUM(core_temp_0) AS temp_soma, MAX(core_temp_0) AS temp_max,
+        MIN(core_speed_0) AS speed_min, SUM(core_speed_0) AS speed_soma, MAX(core_speed_0) AS speed_max,
+        MIN(cpu_power) AS power_min, SUM(cpu_power) AS power_soma, MAX(cpu_power) AS power_max,
+        COUNT(*) FILTER (WHERE core_temp_0 < 60) AS n_faixa_1,
+        COUNT(*) FILTER (WHERE core_temp_0 >= 60 AND core_temp_0 < 70) AS n_faixa_2,
+        COUNT(*) FILTER (WHERE core_temp_0 >= 70 AND core_temp_0 < 80) AS n_faixa_3,
+        COUNT(*) FILTER (WHERE core_temp_0 >= 80 AND core_temp_0 < 90) AS n_faixa_4,
+        COUNT(*) FILTER (WHERE core_temp_0 > 90) AS n_faixa_5
+"""
+
+# nome do rollup -> (colunas-chave no SELECT, GROUP BY, colunas da chave única, coluna de tempo)
+rollups = {
+    "rollup_hora": ("date_trunc('hour', time) AS hora", "1", "hora", "hora"),
+    "rollup_dia": ("DATE(time) AS dia", "1", "dia", "dia"),
+    "rollup_temp_dia": ("DATE(time) AS dia, core_temp_0 AS core_temp", "1, 2", "dia, core_temp", "dia"),
+}
+
+
+def sql_rollup(nome, where_sql=""):
+    # SELECT que calcula um rollup a partir da tabela bruta
+    chaves, grupo, _, _ = rollups[nome]
+    return f"""
+    SELECT {chaves}, {metricas_rollup}
+    FROM {schema}.{tabela_origem}
+    {where_sql}
+    GROUP BY {grupo}
+    """
+
+
+def criar_rollups(conn):
+    # Cria as tabelas de rollup ausentes. Os tipos das colunas vêm da própria tabela bruta (CREATE TABLE AS).
+    # Retorna True se alguma tabela foi criada agora (e, portanto, precisa ser populada com o histórico).
+    criou = False
+    for nome, (_, _, chave_unica, _) in rollups.items():
+        existe = conn.execute(text(f"SELECT to_regclass('{schema}.{nome}') IS NOT NULL")).scalar()
+        if not existe:
+            conn.execute(text(f"CREATE TABLE {schema}.{nome} AS {sql_rollup(nome)} WITH NO DATA"))
+            conn.execute(text(f"CREATE UNIQUE INDEX {nome}_chave ON {schema}.{nome} ({chave_unica})"))
+            criou = True
+    return criou
+
+
+def atualizar_rollups(conn, inicio, fim):
+    # Recalcula os rollups apenas para os dias afetados por uma carga (de 'inicio' a 'fim', inclusive).
+    # Os dias inteiros são recalculados a partir da tabela bruta, então a operação pode ser repetida sem duplicar.
+    params = {
+        "inicio": pd.Timestamp(inicio).normalize().to_pydatetime(),
+        "fim": (pd.Timestamp(fim).normalize() + pd.Timedelta(days=1)).to_pydatetime(),
+    }
+    for nome, (_, _, _, coluna_tempo) in rollups.items():
+        conn.execute(
+            text(f"DELETE FROM {schema}.{nome} WHERE {coluna_tempo} >= :inicio AND {coluna_tempo} < :fim"),
+            params,
+        )
+        conn.execute(
+            text(f"INSERT INTO {schema}.{nome} {sql_rollup(nome, 'WHERE time >= :inicio AND time < :fim')}"),
+            params,
+        )
+
+
+def criar_calendario(conn):
+    # Cria a dimensão de calendário (um registro por dia com dados), se ainda não existir.
+    # Retorna True se a tabela foi criada agora (e, portanto, precisa ser populada com o histórico).
+    existe = conn.execute(text(f"SELECT to_regclass('{schema}.calendario') IS NOT NULL")).scalar()
+    if existe:
+        return False
+    conn.execute(text(f"CREATE TABLE {schema}.calendario (dia DATE PRIMARY KEY, linhas BIGINT NOT NULL)"))
+    return True
+
+
+def atualizar_calendario(conn, inicio=None, fim=None):
+    # Recalcula o calendário a partir de rollup_dia (já atualizado), para os dias de 'inicio' a 'fim'
+    # ou, sem intervalo, para todo o histórico. Lê apenas o rollup diário, nunca a tabela bruta.
+    where_sql = ""
+    params = {}
+    if inicio is not None:
+        where_sql = "WHERE dia >= :inicio AND dia < :fim"
+        params = {
+            "inicio": pd.Timestamp(inicio).normalize().to_pydatetime(),
+            "fim": (pd.Timestamp(fim).normalize() + pd.Timedelta(days=1)).to_pydatetime(),
+        }
+    conn.execute(text(f"DELETE FROM {schema}.calendario {where_sql}"), params)
+    conn.execute(
+        text(f"INSERT INTO {schema}.calendario (dia, linhas) SELECT dia, n FROM {schema}.rollup_dia {where_sql}"),
+        params,
+    )
+
+
+def reconstruir_rollups(conn):
+    # Recalcula os rollups (e o calendário) para todo o histórico da tabela bruta
+    criar_calendario(conn)
+    inicio, fim = conn.execute(text(f"SELECT MIN(time), MAX(time) FROM {schema}.{tabela_origem}")).one()
+    if inicio is None:
+        return
+    atualizar_rollups(conn, inicio, fim)
+    atualizar_calendario(conn)
+
+
+def periodos_afetados(intervalos):
+    # Junta os intervalos (inicio, fim) de 'time' carregados (um por arquivo) em períodos de dias inteiros,
+    # disjuntos e em ordem; dias seguidos ou sobrepostos viram um período só. Assim, um log antigo carregado
+    # junto com o de hoje atualiza os dois períodos, e não todos os dias entre eles.
+    # Retorna [(primeiro dia, último dia), ...] (Timestamps à meia-noite).
+    dias = sorted(
+        (pd.Timestamp(inicio).normalize(), pd.Timestamp(fim).normalize())
+        for inicio, fim in intervalos
+        if inicio is not None
+    )
+    periodos = []
+    for inicio, fim in dias:
+        if periodos and inicio <= periodos[-1][1] + pd.Timedelta(days=1):
+            periodos[-1] = (periodos[-1][0], max(periodos[-1][1], fim))
+        else:
+            periodos.append((inicio, fim))
+    return periodos
+
+
+def manter_rollups(conn, intervalos):
+    # Chamado pela carga, na mesma transação dos dados: cria os rollups se preciso
+    # (populando todo o histórico) ou atualiza apenas os dias carregados (intervalos (inicio, fim) de 'time').
+    periodos = periodos_afetados(intervalos)
+    if criar_rollups(conn):
+        print("Tabelas de rollup criadas; calculando agregados de todo o histórico.")
+        reconstruir_rollups(conn)
+        return
+    # Calendário recém-criado (banco com rollups anteriores a ele): preenchido com todo o histórico
+    calendario_novo = criar_calendario(conn)
+    for inicio, fim in periodos:
+        atualizar_rollups(conn, inicio, fim)
+        if not calendario_novo:
+            atualizar_calendario(conn, inicio, fim)
+        print(f"Rollups atualizados para o período de {inicio:%Y-%m-%d} a {fim:%Y-%m-%d}.")
+    if calendario_novo:
+        atualizar_calendario(conn)
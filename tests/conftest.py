@@ -0,0 +1,13 @@
+# Configuração comum dos testes: módulos de scripts/, dashboard/ e benchmarks/ (gerador de logs) importáveis
+# e métricas do ETL desligadas (os testes não gravam data/metricas/etapas.jsonl)
+
+import os
+import sys
+
+os.environ.setdefault("CORETEMP_METRICAS", "0")
+
+raiz_projeto = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+for pasta in ("scripts", "dashboard", "benchmarks"):
+    caminho = os.path.join(raiz_projeto, pasta)
+    if caminho not in sys.path:
+        sys.path.append(caminho)
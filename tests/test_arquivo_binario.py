@@ -0,0 +1,154 @@
+# Testes do arquivo binário de telemetria (scripts/arquivo_binario.py): cabeçalho, acréscimo sob o lock,
+# índice de dias com CRC32 e compactação (ordem por horário, horário repetido => fica o último gravado).
+
+import json
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import arquivo_binario
+
+
+# DataFrame processado de 2 núcleos com 'linhas' registros a cada 'passo' a partir de 'inicio'
+def processado(inicio, linhas, passo="1h", temp=50):
+    tempos = pd.date_range(inicio, periods=linhas, freq=passo)
+    return pd.DataFrame({
+        "time": tempos,
+        "core_temp_0": np.arange(linhas) + temp,
+        "core_temp_1": np.arange(linhas) + temp + 1,
+        "core_speed_0": np.full(linhas, 2500.5),
+        "cpu_power": np.full(linhas, 12.25),
+    })
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    return str(tmp_path / "arquivo" / "telemetria.bin")
+
+
+def test_acrescentar_e_ler(caminho):
+    primeiro = processado("2024-01-01 22:00", 4)
+    segundo = processado("2024-01-02 02:00", 3, temp=60)
+    assert arquivo_binario.acrescentar(caminho, primeiro) == 4
+    assert arquivo_binario.acrescentar(caminho, segundo) == 3
+    assert not os.path.exists(caminho + ".lock")
+
+    cabecalho, registros = arquivo_binario.abrir(caminho)
+    assert cabecalho["colunas"] == ["core_temp_0", "core_temp_1", "core_speed_0", "cpu_power"]
+    assert cabecalho["nucleos"] == 2 and cabecalho["ordenado"]
+    assert isinstance(registros, np.memmap)
+    assert os.path.getsize(caminho) == arquivo_binario.TAMANHO_CABECALHO + 7 * registros.dtype.itemsize
+
+    lido = arquivo_binario.para_dataframe(registros)
+    esperado = pd.concat([primeiro, segundo], ignore_index=True)
+    pd.testing.assert_frame_equal(lido, esperado, check_dtype=False)
+
+    # Intervalo [inicio, fim) por busca binária e dia pelo índice
+    intervalo = arquivo_binario.ler_intervalo(caminho, "2024-01-01 23:00", "2024-01-02 02:00")
+    assert len(intervalo) == 3
+    dia = arquivo_binario.para_dataframe(arquivo_binario.ler_dia(caminho, "2024-01-02"))
+    assert dia["time"].tolist() == list(pd.date_range("2024-01-02 00:00", periods=5, freq="1h"))
+    assert len(arquivo_binario.ler_dia(caminho, "2024-01-05")) == 0
+
+
+def test_colunas_novas_rejeitadas(caminho):
+    arquivo_binario.acrescentar(caminho, processado("2024-01-01", 2))
+    mais_nucleos = processado("2024-01-02", 2).assign(core_temp_2=70)
+    with pytest.raises(ValueError, match="core_temp_2"):
+        arquivo_binario.acrescentar(caminho, mais_nucleos)
+    # Menos colunas: as ausentes ficam NaN
+    arquivo_binario.acrescentar(caminho, processado("2024-01-03", 1).drop(columns=["core_temp_1"]))
+    _, registros = arquivo_binario.abrir(caminho)
+    assert len(registros) == 3 and np.isnan(registros["core_temp_1"][-1])
+
+
+def test_indice_com_crc_invalido_e_refeito(caminho):
+    arquivo_binario.acrescentar(caminho, processado("2024-01-01 12:00", 48))
+    indice = arquivo_binario.ler_indice(caminho, 48)
+    assert indice["dias"] == [19723, 19724, 19725] and indice["inicios"] == [0, 12, 36]
+
+    # Entrada alterada sem atualizar o CRC: índice rejeitado
+    indice["inicios"][1] = 5
+    with open(arquivo_binario.caminho_indice(caminho), "w", encoding="utf-8") as arquivo:
+        json.dump(indice, arquivo)
+    assert arquivo_binario.ler_indice(caminho, 48) is None
+    # A leitura por dia refaz o índice a partir do arquivo
+    assert len(arquivo_binario.ler_dia(caminho, "2024-01-02")) == 24
+    assert arquivo_binario.ler_indice(caminho, 48)["inicios"] == [0, 12, 36]
+
+
+def test_indice_desatualizado_apos_editar_os_dados(caminho):
+    arquivo_binario.acrescentar(caminho, processado("2024-01-01 12:00", 24))
+    # Registro gravado por fora do acrescentar: o total do índice deixa de bater com o arquivo
+    _, registros = arquivo_binario.abrir(caminho)
+    extra = np.asarray(registros[-1:]).copy()
+    extra["time"] += 86400
+    del registros
+    with open(caminho, "ab") as arquivo:
+        arquivo.write(extra.tobytes())
+    assert arquivo_binario.ler_indice(caminho, 25) is None
+    assert len(arquivo_binario.ler_dia(caminho, "2024-01-03")) == 1
+    assert arquivo_binario.ler_indice(caminho, 25)["dias"] == [19723, 19724, 19725]
+
+
+def test_registro_incompleto_no_fim_ignorado(caminho):
+    arquivo_binario.acrescentar(caminho, processado("2024-01-01", 3))
+    with open(caminho, "ab") as arquivo:
+        arquivo.write(b"\x01\x02\x03")
+    _, registros = arquivo_binario.abrir(caminho)
+    assert len(registros) == 3
+    del registros
+    # O próximo acréscimo descarta os bytes soltos
+    arquivo_binario.acrescentar(caminho, processado("2024-01-01 03:00", 1))
+    _, registros = arquivo_binario.abrir(caminho)
+    assert len(registros) == 4 and registros["time"][-1] - registros["time"][0] == 3 * 3600
+
+
+def test_compactar_ordena_e_mantem_o_ultimo(caminho):
+    arquivo_binario.acrescentar(caminho, processado("2024-01-02 00:00", 3, temp=70))
+    # Dia anterior chegando depois (pipeline paralelo): arquivo deixa de estar ordenado e perde o índice
+    arquivo_binario.acrescentar(caminho, processado("2024-01-01 00:00", 3, temp=50))
+    cabecalho, _ = arquivo_binario.abrir(caminho)
+    assert not cabecalho["ordenado"]
+    assert not os.path.exists(arquivo_binario.caminho_indice(caminho))
+    assert arquivo_binario.indice_dias(caminho) is None
+    # Leitura por intervalo ainda correta (por máscara)
+    assert len(arquivo_binario.ler_intervalo(caminho, "2024-01-01", "2024-01-02")) == 3
+
+    # Mesmos horários gravados de novo com outros valores (ex.: log reprocessado): fica o último
+    arquivo_binario.acrescentar(caminho, processado("2024-01-01 01:00", 2, temp=90))
+
+    assert arquivo_binario.compactar(caminho) == (8, 6)
+    cabecalho, registros = arquivo_binario.abrir(caminho)
+    assert cabecalho["ordenado"]
+    lido = arquivo_binario.para_dataframe(registros)
+    assert lido["time"].tolist() == list(pd.date_range("2024-01-01 00:00", periods=3, freq="1h")) + \
+        list(pd.date_range("2024-01-02 00:00", periods=3, freq="1h"))
+    assert lido["core_temp_0"].tolist() == [50, 90, 91, 70, 71, 72]
+    assert arquivo_binario.ler_indice(caminho, 6)["inicios"] == [0, 3]
+    assert not os.path.exists(caminho + ".tmp") and not os.path.exists(caminho + ".lock")
+
+
+def test_assinatura_invalida(tmp_path):
+    caminho = tmp_path / "outro.bin"
+    caminho.write_bytes(b"NAOEBIN!" + b" " * arquivo_binario.TAMANHO_CABECALHO)
+    with pytest.raises(ValueError, match="não é um arquivo binário"):
+        arquivo_binario.abrir(str(caminho))
+    # Arquivo menor que o cabeçalho
+    curto = tmp_path / "curto.bin"
+    curto.write_bytes(arquivo_binario.ASSINATURA)
+    with pytest.raises(ValueError, match="não é um arquivo binário"):
+        arquivo_binario.abrir(str(curto))
+
+
+def test_versao_nao_suportada(caminho):
+    arquivo_binario.acrescentar(caminho, processado("2024-01-01", 2))
+    with open(caminho, "r+b") as arquivo:
+        bruto = arquivo.read(arquivo_binario.TAMANHO_CABECALHO)
+        cabecalho = json.loads(bruto[len(arquivo_binario.ASSINATURA):].decode("utf-8"))
+        cabecalho["versao"] = arquivo_binario.VERSAO + 1
+        arquivo.seek(0)
+        arquivo.write((arquivo_binario.ASSINATURA + json.dumps(cabecalho).encode("utf-8"))
+                      .ljust(arquivo_binario.TAMANHO_CABECALHO, b" "))
+    with pytest.raises(ValueError, match="Versão 2"):
+        arquivo_binario.abrir(caminho)
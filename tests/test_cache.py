@@ -0,0 +1,153 @@
+# Testes do cache das consultas do dashboard (dashboard/src/queries/cache.py): validade (TTL), limite de itens
+# (remove o menos usado), descarte a cada nova carga (data de modificação do marcador) e geração do cache,
+# com um marcador temporário e um relógio falso.
+
+import os
+import types
+import pytest
+from src.queries import cache
+
+
+# Relógio controlado pelo teste no lugar de time.monotonic
+class Relogio:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def monotonic(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(tmp_path, monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(cache, "time", types.SimpleNamespace(monotonic=relogio.monotonic))
+    monkeypatch.setattr(cache, "marcador_carga", str(tmp_path / "ultima_carga.txt"))
+    monkeypatch.setattr(cache, "_versao_vista", None)
+    cache.invalidar()
+    yield relogio
+    cache.invalidar()
+
+
+# Consulta de teste: conta as execuções de verdade (as que não vieram do cache)
+def consulta_contada(**opcoes):
+    chamadas = []
+
+    @cache.em_cache(**opcoes)
+    def consulta(year, month=None):
+        chamadas.append((year, month))
+        return [year, month]
+
+    return consulta, chamadas
+
+
+# Nova carga: o loader regrava o marcador; a data de modificação é definida para não depender da resolução
+# do sistema de arquivos
+def nova_carga(instante):
+    with open(cache.marcador_carga, "w") as arquivo:
+        arquivo.write("carga")
+    os.utime(cache.marcador_carga, (instante, instante))
+
+
+def test_resultado_reaproveitado_ate_o_ttl(relogio):
+    consulta, chamadas = consulta_contada(ttl=60)
+    assert consulta(2024) == [2024, None]
+    # Mesma chave por argumento posicional, nomeado ou padrão
+    assert consulta(year=2024, month=None) == [2024, None]
+    relogio.agora += 59.9
+    consulta(2024)
+    assert chamadas == [(2024, None)]
+    # Venceu a validade: consulta de novo e regrava o instante
+    relogio.agora += 0.1
+    consulta(2024)
+    relogio.agora += 30
+    consulta(2024)
+    assert chamadas == [(2024, None), (2024, None)]
+
+
+def test_copia_defensiva(relogio):
+    consulta, _ = consulta_contada()
+    consulta(2024).append("alterado")
+    assert consulta(2024) == [2024, None]
+
+
+def test_remove_o_menos_usado(relogio, monkeypatch):
+    monkeypatch.setattr(cache, "MAX_ITENS", 2)
+    consulta, chamadas = consulta_contada()
+    consulta(2022)
+    consulta(2023)
+    consulta(2022)  # 2022 passa a ser o mais recente; 2023 é o menos usado
+    consulta(2024)  # passa do limite: sai 2023
+    assert len(cache._itens) == 2
+    chamadas.clear()
+    consulta(2022)
+    consulta(2024)
+    assert chamadas == []
+    consulta(2023)
+    assert chamadas == [(2023, None)]
+
+
+def test_nova_carga_descarta_o_cache(relogio):
+    consulta, chamadas = consulta_contada()
+    consulta(2024)  # ainda sem marcador (nenhuma carga)
+    geracao = cache._geracao
+
+    nova_carga(1_700_000_000)
+    consulta(2024)
+    assert chamadas == [(2024, None), (2024, None)]
+    assert cache._geracao == geracao + 1
+    consulta(2024)
+    assert len(chamadas) == 2
+
+    # Outra carga (marcador com nova data): descarta de novo
+    nova_carga(1_700_000_060)
+    consulta(2024)
+    assert len(chamadas) == 3 and cache._geracao == geracao + 2
+
+
+def test_invalidar_incrementa_a_geracao(relogio):
+    consulta, chamadas = consulta_contada()
+    consulta(2024)
+    geracao = cache._geracao
+    cache.invalidar()
+    assert cache._geracao == geracao + 1 and not cache._itens
+    consulta(2024)
+    assert len(chamadas) == 2
+
+
+def test_resultado_de_consulta_durante_descarte_nao_e_guardado(relogio):
+    # Cache descartado enquanto a consulta rodava (outra thread viu nova carga ou chamou invalidar()):
+    # o resultado pode ser dos dados antigos, então é devolvido mas não guardado
+    chamadas = []
+
+    @cache.em_cache
+    def consulta(year):
+        chamadas.append(year)
+        if len(chamadas) == 1:
+            cache.invalidar()
+        return year
+
+    assert consulta(2024) == 2024
+    assert not cache._itens
+    consulta(2024)
+    consulta(2024)
+    assert chamadas == [2024, 2024]
+
+
+def test_falha_nao_e_guardada(relogio):
+    chamadas = []
+
+    @cache.em_cache
+    def consulta(year):
+        chamadas.append(year)
+        return None
+
+    consulta(2024)
+    consulta(2024)
+    assert chamadas == [2024, 2024]
+
+
+def test_wrapped_ignora_o_cache(relogio):
+    consulta, chamadas = consulta_contada()
+    consulta(2024)
+    consulta.__wrapped__(2024)
+    assert chamadas == [(2024, None), (2024, None)]
@@ -0,0 +1,47 @@
+# Testes do daemon de ingestão (scripts/daemon.py): um log com layout não reconhecido é registrado no estado
+# e ignorado nas verificações seguintes, até o arquivo mudar.
+
+import os
+import time
+import pytest
+
+CABECALHO_INVALIDO = "Time,Core 1 Temp. (°),CPU 0 Power,\n"
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    # Caminhos relativos (data/raw, data/daemon_estado.json) dentro da pasta temporária
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data/raw")
+    import daemon
+    return daemon
+
+
+def gravar(caminho, texto, mtime):
+    with open(caminho, "a", encoding="latin1", newline="") as arquivo:
+        arquivo.write(texto)
+    os.utime(caminho, (mtime, mtime))
+
+
+def test_layout_invalido_ignorado_ate_mudar(daemon):
+    caminho = os.path.join(daemon.raw_data_path, "ruim.csv")
+    antigo = time.time() - 60
+    gravar(caminho, CABECALHO_INVALIDO + "10:00:00 03/01/24,50,12.5,\n", antigo)
+
+    estado, pendentes = {}, {}
+    prontos = daemon.verificar_arquivos(estado, pendentes, debounce=2, espera_maxima=30)
+    assert prontos == ["ruim.csv"]
+    assert daemon.processar(prontos, estado, pendentes, batch_size=1000) == (0, None)
+
+    # Falha gravada no estado (também no disco), sem avançar a posição
+    falha = estado["ruim.csv"]["falha"]
+    assert falha["tamanho"] == os.path.getsize(caminho) and "Core 0 Temp" in falha["erro"]
+    assert "posicao" not in estado["ruim.csv"]
+    assert daemon.carregar_estado() == estado
+    # Verificações seguintes não o leem de novo (nem o mantêm pendente)
+    assert daemon.verificar_arquivos(estado, pendentes, debounce=2, espera_maxima=30) == []
+    assert pendentes == {}
+
+    # O arquivo mudou: volta a ser lido
+    gravar(caminho, "10:00:01 03/01/24,51,12.5,\n", antigo + 1)
+    assert daemon.verificar_arquivos(estado, pendentes, debounce=2, espera_maxima=30) == ["ruim.csv"]
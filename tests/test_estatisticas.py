@@ -0,0 +1,94 @@
+# Testes das estatísticas de temperatura (dashboard/src/queries/estatisticas.py) contra valores calculados à mão.
+# Percentis no sentido de percentile_disc do PostgreSQL: a amostra de posição ceil(p/100 * N) na ordem crescente.
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.queries import estatisticas
+
+# Distribuição com empates: 40 (2 amostras), 50 (5) e 60 (3); em ordem: 40 40 50 50 50 50 50 60 60 60
+VALORES = np.array([40.0, 50.0, 60.0])
+CONTAGENS = np.array([2.0, 5.0, 3.0])
+
+
+@pytest.mark.parametrize("p, esperado", [
+    (0, 40),    # primeira amostra
+    (10, 40),   # posição 1
+    (20, 40),   # posição 2: exatamente a última amostra de 40
+    (21, 50),   # posição ceil(2,1) = 3
+    (50, 50),   # posição 5
+    (70, 50),   # posição 7: última amostra de 50
+    (71, 60),   # posição 8
+    (95, 60),
+    (99, 60),
+    (100, 60),  # última amostra
+])
+def test_percentil_com_empates(p, esperado):
+    assert estatisticas.percentil(VALORES, CONTAGENS, p) == esperado
+
+
+@pytest.mark.parametrize("p", [0, 50, 95, 99, 100])
+def test_percentil_de_um_elemento(p):
+    assert estatisticas.percentil(np.array([72.0]), np.array([1.0]), p) == 72
+    assert estatisticas.percentil(np.array([72.0]), np.array([4.0]), p) == 72
+
+
+def test_percentil_sem_amostras():
+    assert np.isnan(estatisticas.percentil(np.array([]), np.array([]), 50))
+
+
+def test_percentil_igual_a_expandir_as_amostras():
+    # Mesmo resultado que percentile_disc sobre as amostras expandidas, para todos os p inteiros
+    valores = np.array([35.0, 41.0, 41.5, 60.0, 88.0])
+    contagens = np.array([7.0, 1.0, 13.0, 2.0, 29.0])
+    amostras = np.repeat(valores, contagens.astype(int))
+    for p in range(101):
+        posicao = max(int(np.ceil(p / 100 * len(amostras))), 1)
+        assert estatisticas.percentil(valores, contagens, p) == amostras[posicao - 1], p
+
+
+def test_histograma():
+    valores = np.array([58.0, 60.0, 64.5, 65.0, 71.0])
+    contagens = np.array([1.0, 2.0, 1.0, 4.0, 2.0])
+    # Faixas [inicio, inicio + largura): 60 entra em 60-65 e 65 em 65-70
+    hist = estatisticas.histograma(valores, contagens)
+    assert hist["faixa"].tolist() == ["55-60", "60-65", "65-70", "70-75"]
+    assert hist["inicio"].tolist() == [55, 60, 65, 70]
+    assert hist["amostras"].tolist() == [1, 3, 4, 2]
+    assert hist["percentual"].tolist() == pytest.approx([10.0, 30.0, 40.0, 20.0])
+
+    hist = estatisticas.histograma(valores, contagens, largura=10)
+    assert hist["faixa"].tolist() == ["50-60", "60-70", "70-80"]
+    assert hist["amostras"].tolist() == [1, 7, 2]
+
+
+def test_histograma_de_um_elemento_e_vazio():
+    hist = estatisticas.histograma(np.array([72.0]), np.array([3.0]))
+    assert hist[["faixa", "amostras", "percentual"]].values.tolist() == [["70-75", 3, 100.0]]
+    assert estatisticas.histograma(np.array([]), np.array([])).empty
+
+
+def test_resumir():
+    # Fora de ordem, com valor ausente e valor sem amostras (descartados)
+    distribuicao = pd.DataFrame({"temp": [60, 40, None, 50, 55], "n": [3, 2, 4, 5, 0]})
+    resumo = estatisticas.resumir(distribuicao)
+    assert resumo["amostras"] == 10
+    assert (resumo["minima"], resumo["maxima"]) == (40, 60)
+    assert resumo["media"] == pytest.approx((40 * 2 + 50 * 5 + 60 * 3) / 10)
+    assert (resumo["p50"], resumo["p95"], resumo["p99"]) == (50, 60, 60)
+    assert resumo["histograma"]["amostras"].tolist() == [2, 5, 3]
+
+
+def test_resumir_um_elemento():
+    resumo = estatisticas.resumir(pd.DataFrame({"temp": [66], "n": [1]}))
+    assert resumo["amostras"] == 1
+    assert resumo["minima"] == resumo["maxima"] == resumo["media"] == 66
+    assert resumo["p50"] == resumo["p95"] == resumo["p99"] == 66
+
+
+def test_resumir_sem_amostras():
+    for distribuicao in (pd.DataFrame({"temp": [], "n": []}), pd.DataFrame({"temp": [50], "n": [0]})):
+        resumo = estatisticas.resumir(distribuicao)
+        assert resumo["amostras"] == 0
+        assert all(np.isnan(resumo[chave]) for chave in ("minima", "maxima", "media", "p50", "p95", "p99"))
+        assert resumo["histograma"].empty
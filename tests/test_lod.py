@@ -0,0 +1,59 @@
+# Testes do nível de detalhe dos gráficos (dashboard/src/charts/lod.py)
+
+import numpy as np
+import pandas as pd
+from src.charts import lod
+
+
+# Séries MIN/AVG/MAX por minuto ao longo de um dia, no formato longo das consultas (coluna "type")
+def series_dia(dia="2024-03-01"):
+    tempos = pd.date_range(dia, periods=1440, freq="1min")
+    base = 50 + 10 * np.sin(np.arange(1440) / 60)
+    partes = [pd.DataFrame({"data": tempos, "type": tipo, "core temp": base + desvio})
+              for tipo, desvio in (("MIN", -5.0), ("AVG", 0.0), ("MAX", 5.0))]
+    partes[0].loc[700, "core temp"] = 10.0   # vale isolado
+    partes[2].loc[800, "core temp"] = 99.0   # pico isolado
+    return pd.concat(partes, ignore_index=True)
+
+
+def test_balde_de_tempo_mantem_os_extremos():
+    df = series_dia()
+    reduzido, razao = lod.reduzir(df, "data", "core temp", "type", max_pontos=300)
+    assert razao > 1 and len(reduzido) <= 300
+    por_tipo = reduzido.groupby("type")["core temp"]
+    # MIN e MAX agregados pela própria estatística: o vale e o pico continuam no gráfico
+    assert por_tipo.min()["MIN"] == 10.0
+    assert por_tipo.max()["MAX"] == 99.0
+    # AVG agregado pela média: mesma média do período
+    assert np.isclose(por_tipo.mean()["AVG"], df.loc[df["type"] == "AVG", "core temp"].mean())
+
+
+def test_agregacao_explicita():
+    df = series_dia()
+    reduzido, _ = lod.reduzir(df, "data", "core temp", "type", max_pontos=300, agregacao="mean")
+    assert reduzido.loc[reduzido["type"] == "MAX", "core temp"].max() < 99.0
+
+
+def test_balde_pelo_periodo_selecionado():
+    df = series_dia()
+    # Sem período: o balde vem do dia dos dados (100 pontos por série => baldes de 15 min)
+    pelo_dado, _ = lod.reduzir(df, "data", "core temp", "type", max_pontos=300)
+    assert (pelo_dado.groupby("type").size() == 96).all()
+    # Período selecionado de um ano: baldes de 7 dias, o mesmo tamanho de qualquer dia desse ano
+    periodo = (pd.Timestamp("2024-01-01"), pd.Timestamp("2025-01-01"))
+    pelo_periodo, _ = lod.reduzir(df, "data", "core temp", "type", max_pontos=300, periodo=periodo)
+    assert (pelo_periodo.groupby("type").size() == 1).all()
+    assert lod.escolher_balde(*periodo, 100) == "7D"
+
+
+def test_eixo_numerico_usa_lttb():
+    x = np.arange(5000)
+    df = pd.DataFrame({"core temp": x % 100, "core speed": np.where(x == 2500, 9000.0, 1000.0), "type": "MAX"})
+    reduzido, _ = lod.reduzir(df, "core temp", "core speed", "type", max_pontos=100)
+    assert len(reduzido) == 100 and reduzido["core speed"].max() == 9000.0
+
+
+def test_abaixo_do_orcamento_sem_reducao():
+    df = series_dia().head(100)
+    reduzido, razao = lod.reduzir(df, "data", "core temp", "type")
+    assert razao == 1.0 and reduzido is df
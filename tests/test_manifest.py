@@ -0,0 +1,97 @@
+# Testes do manifesto de ingestão no pipeline (scripts/manifest.py e pipeline.verificar_manifesto): arquivo
+# repetido ignorado (com o mesmo nome ou copiado com outro), log que cresceu retomado a partir do checkpoint
+# e conteúdo novo sem checkpoint processado por inteiro.
+
+import os
+import shutil
+import pandas as pd
+import pytest
+import gerar_logs
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    # Pastas de trabalho relativas (data/...) dentro da pasta temporária
+    monkeypatch.chdir(tmp_path)
+    import pipeline
+    for pasta in (pipeline.raw_data_path, pipeline.loaded_data_path, pipeline.processed_data_path):
+        os.makedirs(pasta, exist_ok=True)
+    return pipeline
+
+
+# Log de 2 núcleos, uma linha por minuto, gravado em data/raw
+def log(pipeline, nome, horas=1, inicio="2024-01-01 00:00:00", semente=0):
+    caminho = os.path.join(pipeline.raw_data_path, nome)
+    gerar_logs.gerar_log(caminho, nucleos=2, horas=horas, intervalo=60, inicio=inicio, semente=semente)
+    return caminho
+
+
+def processado(pipeline, nome):
+    return pd.read_csv(os.path.join(pipeline.processed_data_path, nome), parse_dates=["time"])
+
+
+def test_mesmo_conteudo_ignorado(pipeline):
+    caminho = log(pipeline, "A.csv")
+    conteudo = open(caminho, "rb").read()
+    pipeline.pipeline()
+    assert len(processado(pipeline, "A.csv")) == 60
+    os.remove(os.path.join(pipeline.processed_data_path, "A.csv"))
+
+    # O mesmo arquivo de novo e uma cópia com outro nome: apenas arquivados, sem processado novo
+    for nome in ("A.csv", "copia de A.csv"):
+        with open(os.path.join(pipeline.raw_data_path, nome), "wb") as arquivo:
+            arquivo.write(conteudo)
+    pipeline.pipeline()
+    assert os.listdir(pipeline.processed_data_path) == []
+    assert os.listdir(pipeline.raw_data_path) == []
+    assert sorted(pipeline.manifest.carregar_manifesto()) == ["A.csv"]
+
+
+def test_copia_com_outro_nome_no_mesmo_lote(pipeline):
+    manifesto = {}
+    original = log(pipeline, "A.csv")
+    copia = os.path.join(pipeline.raw_data_path, "B.csv")
+    shutil.copy(original, copia)
+    outro = log(pipeline, "C.csv", semente=1)
+
+    vistos = {}
+    hash_a, desde = pipeline.verificar_manifesto(manifesto, "A.csv", original, vistos)
+    assert desde is None
+    assert pipeline.verificar_manifesto(manifesto, "B.csv", copia, vistos) == (hash_a, False)
+    assert pipeline.verificar_manifesto(manifesto, "C.csv", outro, vistos)[1] is None
+    assert vistos == {hash_a: "A.csv", pipeline.manifest.hash_arquivo(outro): "C.csv"}
+
+
+def test_log_que_cresceu_retoma_do_checkpoint(pipeline):
+    caminho = log(pipeline, "A.csv")
+    pipeline.pipeline()
+    # Carga no banco registra o checkpoint (último 'time' carregado)
+    manifesto = pipeline.manifest.carregar_manifesto()
+    pipeline.manifest.registrar(manifesto, "A.csv", ultimo_time_carregado="2024-01-01 00:59:00")
+    pipeline.manifest.salvar_manifesto(manifesto)
+
+    # O Core Temp continuou escrevendo: mesmo nome, duas horas de log
+    log(pipeline, "A.csv", horas=2)
+    hash_novo = pipeline.manifest.hash_arquivo(caminho)
+    pipeline.pipeline()
+
+    dados = processado(pipeline, "A.csv")
+    assert len(dados) == 60
+    assert dados["time"].min() == pd.Timestamp("2024-01-01 01:00:00")
+    entrada = pipeline.manifest.carregar_manifesto()["A.csv"]
+    assert entrada["hash_raw"] == hash_novo and entrada["linhas"] == 60
+
+
+def test_conteudo_novo_sem_checkpoint_processado_por_inteiro(pipeline):
+    caminho = log(pipeline, "A.csv")
+    pipeline.pipeline()
+    hash_antigo = pipeline.manifest.carregar_manifesto()["A.csv"]["hash_raw"]
+
+    # Processado mas ainda não carregado (sem checkpoint) e regravado com outro conteúdo
+    log(pipeline, "A.csv", semente=1)
+    assert pipeline.verificar_manifesto(pipeline.manifest.carregar_manifesto(), "A.csv", caminho)[1] is None
+    pipeline.pipeline()
+
+    assert len(processado(pipeline, "A.csv")) == 60
+    entrada = pipeline.manifest.carregar_manifesto()["A.csv"]
+    assert entrada["hash_raw"] != hash_antigo and entrada["status"] == pipeline.manifest.STATUS_PROCESSADO
@@ -0,0 +1,144 @@
+# Testes do leitor dedicado do Core Temp (scripts/parser_coretemp.py): horário convertido direto dos bytes,
+# mapa de colunas para qualquer número de núcleos e descarte de metadados, rodapés e linhas inválidas.
+
+import numpy as np
+import pandas as pd
+import pytest
+import parser_coretemp
+
+PREAMBULO = "CPU Model:,Intel Core i7\nCPU Speed:,3600\n\nTj. Max:,100\nSession start:,10:00:00 03/01/24\n\n\n"
+
+
+# Cabeçalho do Core Temp para 'nucleos' núcleos (grupos repetidos por núcleo, "Core N" vazias e vírgula final)
+def cabecalho(nucleos):
+    colunas = ["Time"] + [f"Core {n} Temp. (°)" for n in range(nucleos)]
+    colunas += ["Low temp. (°)", "High temp. (°)", "Core load (%)", "Core speed (MHz)"] * nucleos
+    colunas += [f"Core {n}" for n in range(nucleos)] + ["CPU 0 Power", ""]
+    return ",".join(colunas)
+
+
+# Linha de dados com a mesma temperatura em todos os núcleos
+def linha(horario, temp, nucleos=2):
+    valores = [horario] + [str(temp)] * nucleos
+    valores += [str(temp - 5), str(temp + 5), "30", "2500.5"] * nucleos
+    valores += [""] * nucleos + ["12.25", ""]
+    return ",".join(valores)
+
+
+# Grava o log (latin1, como o Core Temp) e devolve o resultado de ler_log
+def ler(tmp_path, texto, nome="log.csv"):
+    caminho = tmp_path / nome
+    caminho.write_bytes(texto.encode("latin1"))
+    return parser_coretemp.ler_log(str(caminho))
+
+
+def test_log_simples(tmp_path):
+    texto = PREAMBULO + cabecalho(2) + "\n" + linha("10:00:00 03/01/24", 50) + "\n" + linha("10:00:01 03/01/24", 51) + "\n"
+    dados, lidas = ler(tmp_path, texto)
+    assert lidas == 2
+    assert list(dados.columns) == [
+        "time",
+        "core_temp_0", "low_temp_0", "high_temp_0", "core_load_0", "core_speed_0",
+        "core_temp_1", "low_temp_1", "high_temp_1", "core_load_1", "core_speed_1",
+        "cpu_power",
+    ]
+    assert dados["time"].tolist() == [pd.Timestamp("2024-03-01 10:00:00"), pd.Timestamp("2024-03-01 10:00:01")]
+    assert dados["core_temp_0"].dtype == np.int64
+    assert dados["core_temp_1"].tolist() == [50, 51]
+    assert dados["core_speed_0"].tolist() == [2500.5, 2500.5]
+    assert dados["cpu_power"].tolist() == [12.25, 12.25]
+
+
+def test_quebras_de_linha_crlf(tmp_path):
+    linhas = [cabecalho(2), linha("10:00:00 03/01/24", 50), linha("10:00:01 03/01/24", 51)]
+    lf, _ = ler(tmp_path, PREAMBULO + "\n".join(linhas) + "\n", "lf.csv")
+    crlf, lidas = ler(tmp_path, (PREAMBULO + "\n".join(linhas) + "\n").replace("\n", "\r\n"), "crlf.csv")
+    assert lidas == 2
+    pd.testing.assert_frame_equal(crlf, lf)
+
+
+def test_rodape_e_reinicio(tmp_path):
+    # Reinício do Core Temp no meio do arquivo (preâmbulo e cabeçalho de novo) e rodapé no fim
+    texto = (
+        PREAMBULO + cabecalho(2) + "\n"
+        + linha("10:00:00 03/01/24", 50) + "\n"
+        + "\n" + PREAMBULO + cabecalho(2) + "\n"
+        + linha("11:00:00 03/01/24", 60) + "\n"
+        + "Session end:,11:00:01 03/01/24\n"
+    )
+    dados, _ = ler(tmp_path, texto)
+    assert dados["time"].tolist() == [pd.Timestamp("2024-03-01 10:00:00"), pd.Timestamp("2024-03-01 11:00:00")]
+    assert dados["core_temp_0"].tolist() == [50, 60]
+    assert dados["core_temp_0"].dtype == np.int64
+
+
+def test_datas_invalidas_descartadas(tmp_path):
+    # 30/02 não existe; 29/02 só em ano bissexto (2024 sim, 2023 não); 24:00:00 não é horário válido
+    texto = PREAMBULO + cabecalho(2) + "\n" + "\n".join([
+        linha("10:00:00 02/30/24", 40),
+        linha("10:00:00 02/29/24", 50),
+        linha("10:00:00 02/29/23", 41),
+        linha("24:00:00 03/01/24", 42),
+        linha("10:00:00 03/01/24", 51),
+    ]) + "\n"
+    dados, _ = ler(tmp_path, texto)
+    assert dados["time"].tolist() == [pd.Timestamp("2024-02-29 10:00:00"), pd.Timestamp("2024-03-01 10:00:00")]
+    assert dados["core_temp_0"].tolist() == [50, 51]
+
+
+def converter(horarios):
+    buffer = np.frombuffer("\n".join(horarios).encode() + b"\n", dtype=np.uint8)
+    return parser_coretemp.converter_time(buffer, parser_coretemp.inicios_de_linha(buffer))
+
+
+@pytest.mark.parametrize("horario, esperado", [
+    ("00:00:00 01/01/00,", "2000-01-01 00:00:00"),
+    ("12:34:56 02/29/00,", "2000-02-29 12:34:56"),
+    ("23:59:59 12/31/68,", "2068-12-31 23:59:59"),
+    ("00:00:00 01/01/69,", "1969-01-01 00:00:00"),
+    ("23:59:59 12/31/99,", "1999-12-31 23:59:59"),
+])
+def test_ano_com_dois_digitos(horario, esperado):
+    # Mesmo pivô do %y do strptime: 00-68 => 2000-2068, 69-99 => 1969-1999
+    assert converter([horario])[0] == np.datetime64(esperado)
+
+
+def test_todos_os_anos_iguais_ao_pandas():
+    horarios = [f"06:07:08 {mes:02d}/{dia:02d}/{ano:02d}" for ano in range(100) for mes, dia in ((1, 1), (2, 28), (2, 29), (12, 31))]
+    esperado = pd.to_datetime(pd.Series(horarios), format="%H:%M:%S %m/%d/%y", errors="coerce").to_numpy()
+    obtido = converter([h + "," for h in horarios])
+    np.testing.assert_array_equal(obtido, esperado)
+
+
+def test_linhas_que_nao_sao_dados_viram_nat():
+    tempos = converter(["Time,Core 0 Temp. (°)", "", "Session end:,10:00:00 03/01/24", "10:00:00 13/01/24,", "1:00:00 03/01/24,"])
+    assert np.isnat(tempos).all()
+
+
+@pytest.mark.parametrize("nucleos", [1, 2, 8])
+def test_layouts_de_nucleos(nucleos):
+    nomes = parser_coretemp.nomes_unicos(cabecalho(nucleos).split(","))
+    mapa = parser_coretemp.mapear_colunas(tuple(nomes))
+    esperado = ["time"] + [f"{m}_{n}" for n in range(nucleos) for m in parser_coretemp.ordem_metricas] + ["cpu_power"]
+    assert list(mapa.values()) == esperado
+    # Colunas "Core N" (vazias) e a vírgula final não entram
+    assert all(not nome.startswith("Unnamed") and nome != "" for nome in mapa)
+
+
+def test_layout_estreito_e_largo_no_mesmo_leitor(tmp_path):
+    um, _ = ler(tmp_path, PREAMBULO + cabecalho(1) + "\n" + linha("10:00:00 03/01/24", 50, nucleos=1) + "\n", "um.csv")
+    oito, _ = ler(tmp_path, PREAMBULO + cabecalho(8) + "\n" + linha("10:00:00 03/01/24", 70, nucleos=8) + "\n", "oito.csv")
+    assert [c for c in um.columns if c.startswith("core_temp_")] == ["core_temp_0"]
+    assert [c for c in oito.columns if c.startswith("core_temp_")] == [f"core_temp_{n}" for n in range(8)]
+    assert oito["core_temp_7"].tolist() == [70]
+
+
+def test_sem_temperatura_do_nucleo_0():
+    nomes = ["Time", "Core 1 Temp. (°)", "Low temp. (°)", "CPU 0 Power"]
+    with pytest.raises(ValueError, match="Core 0 Temp"):
+        parser_coretemp.mapear_colunas(tuple(nomes))
+
+
+def test_sem_cabecalho(tmp_path):
+    with pytest.raises(ValueError, match="cabeçalho"):
+        ler(tmp_path, PREAMBULO + linha("10:00:00 03/01/24", 50) + "\n")
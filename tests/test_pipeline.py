@@ -0,0 +1,46 @@
+# Testes do ETL (scripts/pipeline.py): a leitura em blocos (--chunksize) precisa gravar exatamente o mesmo
+# processado que a leitura do arquivo inteiro (parser_coretemp), inclusive nos blocos com rodapé ou reinício.
+
+import os
+import pytest
+import gerar_logs
+
+
+# Log sintético de 2 núcleos com um reinício do Core Temp no meio (preâmbulo e cabeçalho repetidos)
+# e o rodapé "Session end:" no fim
+@pytest.fixture
+def log_bruto(tmp_path):
+    caminho = os.path.join(tmp_path, "CT-Log 2024-01-01 00-00-00.csv")
+    gerar_logs.gerar_log(caminho, nucleos=2, horas=1, intervalo=60, inicio="2024-01-01 00:00:00")
+    reinicio = os.path.join(tmp_path, "reinicio.csv")
+    gerar_logs.gerar_log(reinicio, nucleos=2, horas=1, intervalo=60, inicio="2024-01-01 01:00:00", semente=1)
+    with open(reinicio, "r", encoding="latin1") as arquivo:
+        continuacao = arquivo.read()
+    with open(caminho, "a", encoding="latin1", newline="") as arquivo:
+        arquivo.write(continuacao)
+        arquivo.write("\nSession end:,02:00:00 01/01/24\n")
+    return caminho
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    # O módulo cria as pastas de trabalho (data/...) no diretório atual
+    monkeypatch.chdir(tmp_path)
+    import pipeline
+    return pipeline
+
+
+@pytest.mark.parametrize("chunksize", [7, 10, 1000])
+def test_blocos_igual_arquivo_inteiro(pipeline, log_bruto, tmp_path, chunksize):
+    inteiro = os.path.join(tmp_path, "inteiro.csv")
+    blocos = os.path.join(tmp_path, "blocos.csv")
+    resultado_inteiro = pipeline.process_file(log_bruto, inteiro)
+    resultado_blocos = pipeline.process_file(log_bruto, blocos, chunksize=chunksize)
+
+    with open(inteiro, "rb") as a, open(blocos, "rb") as b:
+        conteudo_inteiro = a.read()
+        assert conteudo_inteiro == b.read()
+    # 60 linhas de cada sessão; temperaturas inteiras (sem "50.0")
+    assert resultado_inteiro["linhas_finais"] == resultado_blocos["linhas_finais"] == 120
+    primeira = conteudo_inteiro.decode().splitlines()[1].split(",")
+    assert primeira[1].isdigit()
@@ -0,0 +1,29 @@
+# Testes dos dias recalculados pela carga (scripts/rollups.py): intervalos de cada arquivo unidos apenas
+# quando os dias se tocam, sem cobrir os dias entre um log antigo e o de hoje.
+
+import pandas as pd
+import rollups
+
+
+def dias(*pares):
+    return [(pd.Timestamp(inicio), pd.Timestamp(fim)) for inicio, fim in pares]
+
+
+def test_log_antigo_e_log_de_hoje_ficam_separados():
+    intervalos = [("2024-06-10 08:00:00", "2024-06-10 23:59:59"), ("2023-01-05 22:00:00", "2023-01-06 01:00:00")]
+    assert rollups.periodos_afetados(intervalos) == dias(("2023-01-05", "2023-01-06"), ("2024-06-10", "2024-06-10"))
+
+
+def test_dias_seguidos_ou_sobrepostos_unidos():
+    intervalos = [
+        ("2024-01-01 10:00:00", "2024-01-02 03:00:00"),
+        ("2024-01-03 00:00:00", "2024-01-03 05:00:00"),  # dia seguinte: mesmo período
+        ("2024-01-02 12:00:00", "2024-01-02 13:00:00"),  # dentro do período
+        ("2024-01-05 00:00:00", "2024-01-05 01:00:00"),  # 04/01 sem dados: outro período
+    ]
+    assert rollups.periodos_afetados(intervalos) == dias(("2024-01-01", "2024-01-03"), ("2024-01-05", "2024-01-05"))
+
+
+def test_sem_intervalos():
+    assert rollups.periodos_afetados([]) == []
+    assert rollups.periodos_afetados([(None, None)]) == []